@@ -0,0 +1,192 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+from config.settings import settings
+from utils.startup import startup
+
+class AgentPool:
+    """Per-session MealPlanningAgents sharing the stateless services of one process"""
+
+    def __init__(self, max_sessions: int = None, idle_timeout: float = None,
+                 max_memory_bytes: int = None, max_concurrent_llm_calls: int = None, shared: Dict = None):
+        self.max_sessions = max_sessions or settings.AGENT_POOL_MAX_SESSIONS
+        self.idle_timeout = idle_timeout or settings.AGENT_POOL_IDLE_TIMEOUT
+        self.max_memory_bytes = max_memory_bytes or settings.AGENT_POOL_MAX_MEMORY_BYTES
+        self.llm_limiter = threading.BoundedSemaphore(
+            max_concurrent_llm_calls or settings.MAX_CONCURRENT_LLM_CALLS
+        )
+
+        self._sessions = OrderedDict()  # session_id -> (agent, last_used)
+        self._sizes = {}  # session_id -> agent size as of its last turn
+        self._total_size = 0
+        self._lock = threading.Lock()
+        self._shared = dict(shared or {})  # Pre-built resources by name, e.g. a VectorDB with a local embedder
+        self._shared_lock = threading.RLock()
+        self._spare = None  # Agent built by warm_up() for the first session
+        self._evictions = 0
+
+    def warm_up(self) -> threading.Thread:
+        """Import heavy modules, open shared clients and build a spare agent in a background thread"""
+        thread = threading.Thread(target=self._warm_up, name="agent-pool-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def get(self, session_id: str):
+        """Return the agent for a session, creating it on first use"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                agent = entry[0]
+                self._sessions[session_id] = (agent, now)
+                self._sessions.move_to_end(session_id)
+                self._evict(now, keep=session_id)
+                return agent
+
+        # Build outside the pool lock; agent construction can be slow
+        with self._lock:
+            agent, self._spare = self._spare, None
+        if agent is None:
+            agent = self._create_agent()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                agent.close()
+                agent = entry[0]
+            else:
+                agent.session_id = session_id
+                agent.add_turn_listener(lambda turned: self._resize(session_id, turned))
+                self._sizes[session_id] = agent.size
+                self._total_size += agent.size
+            self._sessions[session_id] = (agent, now)
+            self._sessions.move_to_end(session_id)
+            self._evict(now, keep=session_id)
+            return agent
+
+    def remove(self, session_id: str):
+        with self._lock:
+            agent = self._pop(session_id) if session_id in self._sessions else None
+        if agent is not None:
+            agent.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "approx_memory_bytes": self._total_size,
+                "evictions": self._evictions
+            }
+
+    def _create_agent(self):
+        from agents.meal_plan_agent import MealPlanningAgent
+        from agents.agent_tool import AgentTools
+
+        agent_tools = AgentTools(
+            recipe_service=self._get_shared("recipe_service"),
+            vector_db=self._get_shared("vector_db"),
+            ingredient_parser=self._get_shared("ingredient_parser"),
+            local_engine=self._get_shared("local_engine")
+        )
+        return MealPlanningAgent(
+            groq_service=self._get_shared("groq_service"),
+            agent_tools=agent_tools,
+            llm_limiter=self.llm_limiter,
+            answer_cache=self._get_shared("answer_cache")
+        )
+
+    def _warm_up(self):
+        try:
+            with startup.phase("warm_up"):
+                from agents.meal_plan_agent import MealPlanningAgent
+                MealPlanningAgent.preload()
+                # Request-path resources first; Chroma and the embedding model come last
+                for name in ("groq_service", "local_engine", "recipe_service", "vector_db", "answer_cache"):
+                    resource = self._get_shared(name)
+                    if hasattr(resource, "warm_up"):
+                        resource.warm_up()
+                spare = self._create_agent()
+            with self._lock:
+                if self._spare is None:
+                    self._spare, spare = spare, None
+            if spare is not None:
+                spare.close()
+        except Exception as e:
+            print(f"Error warming up agent pool: {e}")
+
+    def _get_shared(self, name: str):
+        """Create shared stateless resources on first use"""
+        with self._shared_lock:
+            if name not in self._shared:
+                self._shared[name] = self._build_shared(name)
+            return self._shared[name]
+
+    def _build_shared(self, name: str):
+        if name == "groq_service":
+            from services.groq_service import GroqService
+            return GroqService()
+        if name == "recipe_service":
+            from services.recipe_service import RecipeService
+            return RecipeService(index_writer=self._get_shared("index_writer"))
+        if name == "answer_cache":
+            from agents.answer_cache import AnswerCache
+            answer_cache = AnswerCache(
+                vector_db=self._get_shared("vector_db"), ingredient_parser=self._get_shared("ingredient_parser")
+            )
+            # Cached answers showing a recipe go when revalidation finds its data changed
+            self._get_shared("recipe_service").add_change_listener(answer_cache.invalidate)
+            return answer_cache
+        if name == "index_writer":
+            from database.recipe_indexer import RecipeIndexWriter
+            return RecipeIndexWriter(self._get_shared("vector_db"), self._get_shared("local_engine"))
+        if name == "vector_db":
+            from database.vector_db import VectorDB
+            return VectorDB()
+        if name == "ingredient_parser":
+            from utils.ingreadient_parser import IngredientParser
+            return IngredientParser()
+        if name == "local_engine":
+            from database.local_recipe_engine import LocalRecipeEngine
+            return LocalRecipeEngine(ingredient_parser=self._get_shared("ingredient_parser"))
+        raise KeyError(name)
+
+    def _resize(self, session_id: str, agent):
+        """Turn listener: swap a session's size in the running total"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry[0] is not agent:
+                return
+            self._total_size += agent.size - self._sizes[session_id]
+            self._sizes[session_id] = agent.size
+
+    def _pop(self, session_id: str):
+        self._total_size -= self._sizes.pop(session_id)
+        return self._sessions.pop(session_id)[0]
+
+    def _evict(self, now: float, keep: str):
+        """Drop idle sessions, then least recently used ones over the count or memory cap
+
+        Sessions are kept in last-used order, so every pass stops at the first one it keeps.
+        """
+        evicted = []
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if session_id == keep or now - last_used <= self.idle_timeout:
+                break
+            evicted.append(self._pop(session_id))
+
+        while len(self._sessions) > self.max_sessions:
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                break
+            evicted.append(self._pop(session_id))
+
+        while self._total_size > self.max_memory_bytes and len(self._sessions) > 1:
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                break
+            evicted.append(self._pop(session_id))
+
+        self._evictions += len(evicted)
+        for agent in evicted:
+            agent.close()
@@ -1,34 +1,203 @@
-from langchain.tools import Tool
+import asyncio
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from services.recipe_records import RecipeDetail
 from services.recipe_service import RecipeService
 from database.vector_db import VectorDB
+from database.local_recipe_engine import LocalRecipeEngine
+from database.recipe_indexer import RecipeIndexWriter
 from utils.ingreadient_parser import IngredientParser
+from utils.recipe_filters import RecipeFilters
+from agents.meal_planner import MealPlanner
+from agents.prefetcher import RecipePrefetcher
+from utils.tracing import tracer
 
 class AgentTools:
-    def __init__(self):
-        self.recipe_service = RecipeService()
-        self.vector_db = VectorDB()
-        self.ingredient_parser = IngredientParser()
+    NO_INGREDIENTS_MESSAGE = "I couldn't identify any ingredients. Please list your available ingredients clearly."
+    _RECIPE_ID = re.compile(r'\d+')
+    _RECIPE_ID_LIST = re.compile(r'^\s*#?\d+(?:\s*(?:,|;|&|\band\b)?\s*#?\d+)*\s*$', re.IGNORECASE)
+    
+    def __init__(self, recipe_service: RecipeService = None, vector_db: VectorDB = None,
+                 ingredient_parser: IngredientParser = None, local_engine: LocalRecipeEngine = None):
+        self.vector_db = vector_db or VectorDB()
+        self.ingredient_parser = ingredient_parser or IngredientParser()
+        self.local_engine = local_engine if local_engine is not None else LocalRecipeEngine(ingredient_parser=self.ingredient_parser)
+        self.recipe_service = recipe_service or RecipeService(
+            index_writer=RecipeIndexWriter(self.vector_db, self.local_engine)
+        )
         self.current_recipes = []  # Store current search results
+        self.shown_recipe_ids = set()  # Recipes shown this turn, for answer cache invalidation
+        self.filters = RecipeFilters()  # Sidebar preferences applied to retrieval
+        self.prefetcher = RecipePrefetcher(self.recipe_service)
+        self.meal_planner = MealPlanner(self.recipe_service, self.local_engine, self.ingredient_parser)
+        self._output_references = OrderedDict()  # Long tool outputs -> short memory references
     
     def search_recipes_tool(self, ingredients_input: str) -> str:
         """Tool to search recipes based on available ingredients"""
         # Parse ingredients
-        ingredients = self.ingredient_parser.parse_ingredients(ingredients_input)
+        with tracer.span("parse_ingredients"):
+            ingredients = self.ingredient_parser.parse_ingredients(ingredients_input)
         
         if not ingredients:
-            return "I couldn't identify any ingredients. Please list your available ingredients clearly."
+            return self.NO_INGREDIENTS_MESSAGE
+        
+        # Answer from the local index when it covers the request, otherwise use Spoonacular
+        recipes, offline = self._search_locally(ingredients)
+        if recipes is None:
+            recipes = self.recipe_service.search_recipes_by_ingredients(ingredients, number=5, filters=self.filters)
+            recipes, offline = self._or_local_fallback(ingredients, recipes)
+        return self._search_response(ingredients, recipes, offline)
+    
+    async def asearch_recipes_tool(self, ingredients_input: str) -> str:
+        """Async variant of search_recipes_tool; only the Spoonacular call is awaited"""
+        with tracer.span("parse_ingredients"):
+            ingredients = self.ingredient_parser.parse_ingredients(ingredients_input)
+        
+        if not ingredients:
+            return self.NO_INGREDIENTS_MESSAGE
+        
+        recipes, offline = self._search_locally(ingredients)
+        if recipes is None:
+            recipes = await self.recipe_service.asearch_recipes_by_ingredients(ingredients, number=5, filters=self.filters)
+            recipes, offline = self._or_local_fallback(ingredients, recipes)
+        return self._search_response(ingredients, recipes, offline)
+    
+    def get_recipe_details_tool(self, recipe_id_or_name: str) -> str:
+        """Tool to get detailed recipe instructions for one or more recipe IDs"""
+        recipe_ids = self._parse_recipe_ids(recipe_id_or_name)
+        if not recipe_ids:
+            # If it's a recipe name, we'll provide a general cooking method
+            return self._provide_general_cooking_method(recipe_id_or_name)
         
-        # Search recipes using Spoonacular API
-        recipes = self.recipe_service.search_recipes_by_ingredients(ingredients, number=5)
+        if len(recipe_ids) == 1:
+            recipe_details = self.prefetcher.get(recipe_ids[0])
+            if recipe_details is None:
+                recipe_details = self.recipe_service.get_recipe_details(recipe_ids[0])
+            found = {recipe_ids[0]: recipe_details} if recipe_details else {}
+        else:
+            # Prefetched details first, then one bulk request for the rest
+            found = {recipe_id: self.prefetcher.get(recipe_id) for recipe_id in recipe_ids}
+            missing = [recipe_id for recipe_id, details in found.items() if details is None]
+            if missing:
+                found.update((details.id, details) for details in self.recipe_service.get_recipe_details_bulk(missing))
+        return self._details_response(recipe_ids, found)
+    
+    async def aget_recipe_details_tool(self, recipe_id_or_name: str) -> str:
+        """Async variant of get_recipe_details_tool; several IDs are looked up concurrently"""
+        recipe_ids = self._parse_recipe_ids(recipe_id_or_name)
+        if not recipe_ids:
+            return self._provide_general_cooking_method(recipe_id_or_name)
         
+        prefetched = await asyncio.gather(*(self.prefetcher.aget(recipe_id) for recipe_id in recipe_ids))
+        found = dict(zip(recipe_ids, prefetched))
+        missing = [recipe_id for recipe_id, details in found.items() if details is None]
+        if len(missing) == 1:
+            found[missing[0]] = await self.recipe_service.aget_recipe_details(missing[0])
+        elif missing:
+            found.update((details.id, details) for details in await self.recipe_service.aget_recipe_details_bulk(missing))
+        return self._details_response(recipe_ids, found)
+    
+    def plan_week_tool(self, request: str) -> str:
+        """Tool to plan several days of meals from the pantry in one optimization pass"""
+        pantry, days, meals_per_day = self.meal_planner.parse_request(request)
+        if not pantry:
+            return "I couldn't identify any ingredients for the meal plan. Please list what's in your pantry."
+        
+        plan = self.meal_planner.plan_week(pantry, self.filters, days=days, meals_per_day=meals_per_day)
+        if not plan["days"]:
+            return f"I couldn't find enough recipes to plan meals with: {', '.join(pantry)}. Try adding a few more ingredients."
+        
+        meal_ids = list(dict.fromkeys(meal["id"] for meals in plan["days"] for meal in meals))
+        self.shown_recipe_ids.update(meal_ids)
+        
+        with tracer.span("format_markdown", tool="plan_week"):
+            result = self._format_meal_plan(pantry, plan)
+        
+        shopping = ', '.join(name for name, _ in plan["shopping_list"]) or 'nothing'
+        reference = f"[Showed a {len(plan['days'])}-day meal plan for {', '.join(pantry)}: recipes {', '.join(map(str, meal_ids))}; shopping list: {shopping}]"
+        return self._remember_output(result, reference)
+    
+    async def aplan_week_tool(self, request: str) -> str:
+        """Async variant of plan_week_tool; planning is CPU-bound, so it runs in a worker thread"""
+        return await asyncio.to_thread(self.plan_week_tool, request)
+    
+    def _parse_recipe_ids(self, text: str) -> List[int]:
+        """IDs from "123", "123, 456" or "#123 and #456"; empty for a recipe name"""
+        if not self._RECIPE_ID_LIST.match(text):
+            return []
+        return list(dict.fromkeys(int(recipe_id) for recipe_id in self._RECIPE_ID.findall(text)))
+    
+    def _search_locally(self, ingredients) -> Tuple[Optional[List[Dict]], bool]:
+        """(recipes, offline) from the local index, or (None, False) when Spoonacular should be asked"""
+        with tracer.span("local_search") as span:
+            recipes = self.local_engine.search_if_covered(ingredients, number=5, filters=self.filters)
+            span.set(covered=recipes is not None)
+        if recipes is not None:
+            return recipes, False
+        # Keep the last Spoonacular points for requests the local index can't answer at all
+        if self.recipe_service.quota.is_low():
+            recipes = self._local_fallback(ingredients)
+            if recipes:
+                return recipes, True
+        return None, False
+    
+    def _or_local_fallback(self, ingredients, recipes) -> Tuple[List[Dict], bool]:
+        if recipes:
+            return recipes, False
+        recipes = self._local_fallback(ingredients)
+        return recipes, bool(recipes)
+    
+    def _search_response(self, ingredients, recipes, offline) -> str:
         if not recipes:
             return f"I couldn't find recipes with ingredients: {', '.join(ingredients)}. Try different ingredients."
         
         # Store recipes for potential detailed lookup
         self.current_recipes = recipes
+        self.shown_recipe_ids.update(recipe.get('id') for recipe in recipes[:3] if recipe.get('id') is not None)
+        
+        # Load details for the top results while the user reads them
+        self.prefetcher.prefetch([recipe.get('id') for recipe in recipes])
+        
+        with tracer.span("format_markdown", tool="search_recipes"):
+            result = self._format_search_results(ingredients, recipes, offline=offline)
+        
+        shown = '; '.join(f"{recipe.get('id')} {recipe.get('title')}" for recipe in recipes[:3])
+        return self._remember_output(result, f"[Showed recipes for {', '.join(ingredients)}: {shown}]")
+    
+    def _details_response(self, recipe_ids, found) -> str:
+        recipes = [found[recipe_id] for recipe_id in recipe_ids if found.get(recipe_id)]
+        if not recipes:
+            return f"I couldn't find detailed instructions for that recipe. Let me provide some general cooking guidance instead."
         
-        # Format results with more detail
-        result = f"Great! I found some delicious recipes using: **{', '.join(ingredients)}**\n\n"
+        self.shown_recipe_ids.update(recipe_details.id for recipe_details in recipes)
+        
+        with tracer.span("format_markdown", tool="get_recipe_details"):
+            result = "\n\n---\n\n".join(self._format_recipe_details(recipe_details) for recipe_details in recipes)
+        missing = [str(recipe_id) for recipe_id in recipe_ids if not found.get(recipe_id)]
+        if missing:
+            result += f"\n\nI couldn't find detailed instructions for recipe {', '.join(missing)}."
+        
+        shown = '; '.join(
+            f"{recipe_details.id}: {recipe_details.title}, {recipe_details.ready_in_minutes or 'N/A'} minutes, "
+            f"serves {recipe_details.servings or 'N/A'}"
+            for recipe_details in recipes
+        )
+        return self._remember_output(result, f"[Showed full recipe {shown}]")
+    
+    def _local_fallback(self, ingredients):
+        """Best partial matches from the local index when Spoonacular can't be used"""
+        with tracer.span("local_search", fallback=True):
+            return self.local_engine.search(ingredients, number=5, filters=self.filters)
+    
+    def _format_search_results(self, ingredients, recipes, offline=False) -> str:
+        """Markdown summary of the top search results"""
+        result = f"Great! I found some delicious recipes using: **{', '.join(ingredients)}**\n"
+        if offline:
+            result += "📴 **Live recipe search is limited right now**, so these come from my offline collection.\n"
+        if not self.filters.is_empty():
+            result += f"✅ **Matching your preferences:** {self.filters.describe()}\n"
+        result += "\n"
         
         for i, recipe in enumerate(recipes[:3], 1):
             title = recipe.get('title', 'Unknown Recipe')
@@ -46,61 +215,65 @@ class AgentTools:
         
         result += "🍳 **Want the full recipe?** Just ask me: 'Give me detailed instructions for recipe [ID]' or 'How do I make [recipe name]?'\n"
         result += f"💡 **My recommendation:** Try recipe {recipes[0].get('id')} - **{recipes[0].get('title')}** as it uses most of your ingredients!"
-        
         return result
     
-    def get_recipe_details_tool(self, recipe_id_or_name: str) -> str:
-        """Tool to get detailed recipe instructions"""
-        # If it's a recipe ID (numeric), fetch details directly
-        if recipe_id_or_name.isdigit():
-            recipe_details = self.recipe_service.get_recipe_details(int(recipe_id_or_name))
-        else:
-            # If it's a recipe name, we'll provide a general cooking method
-            return self._provide_general_cooking_method(recipe_id_or_name)
+    def _format_meal_plan(self, pantry, plan) -> str:
+        """Markdown day-by-day plan followed by the merged shopping list"""
+        result = f"Here's your {len(plan['days'])}-day meal plan built around: **{', '.join(pantry)}**\n"
+        if not self.filters.is_empty():
+            result += f"✅ **Matching your preferences:** {self.filters.describe()}\n"
+        result += "\n"
         
-        if not recipe_details:
-            return f"I couldn't find detailed instructions for that recipe. Let me provide some general cooking guidance instead."
+        for day, meals in enumerate(plan["days"], 1):
+            result += f"## Day {day}\n"
+            for meal in meals:
+                result += f"- **{meal['title']}** (Recipe ID: {meal['id']})"
+                if meal["uses"]:
+                    result += f" 🟢 uses {', '.join(meal['uses'])}"
+                result += "\n"
+            result += "\n"
         
-        # Format the detailed recipe
-        result = f"## {recipe_details.get('title', 'Recipe')}\n\n"
+        result += "### 🛒 Shopping list:\n"
+        if plan["shopping_list"]:
+            for name, meals in plan["shopping_list"]:
+                result += f"- {name}" + (f" (for {meals} meals)" if meals > 1 else "") + "\n"
+        else:
+            result += "- Nothing extra, everything comes from your pantry!\n"
+        
+        if plan["pantry_unused"]:
+            result += f"\n🔸 **Not used this time:** {', '.join(plan['pantry_unused'])}\n"
+        result += "\n🍳 **Want the full recipe for any meal?** Just ask: 'Give me detailed instructions for recipe [ID]'"
+        return result
+    
+    def _format_recipe_details(self, recipe_details: RecipeDetail) -> str:
+        """Markdown recipe card with ingredients, steps and tips"""
+        result = f"## {recipe_details.title}\n\n"
         
         # Cooking time and servings
-        ready_in_minutes = recipe_details.get('readyInMinutes', 'N/A')
-        servings = recipe_details.get('servings', 'N/A')
+        ready_in_minutes = recipe_details.ready_in_minutes or 'N/A'
+        servings = recipe_details.servings or 'N/A'
         result += f"⏱️ **Prep Time:** {ready_in_minutes} minutes | 👥 **Serves:** {servings}\n\n"
         
         # Ingredients
         result += "### 📝 Ingredients:\n"
-        ingredients = recipe_details.get('extendedIngredients', [])
-        for ingredient in ingredients:
-            amount = ingredient.get('amount', '')
-            unit = ingredient.get('unit', '')
-            name = ingredient.get('name', '')
-            result += f"- {amount} {unit} {name}\n"
+        for ingredient in recipe_details.ingredients:
+            result += f"- {ingredient.line()}\n"
         
         result += "\n### 🍳 Instructions:\n"
         
         # Instructions
-        instructions = recipe_details.get('analyzedInstructions', [])
-        if instructions and len(instructions) > 0:
-            steps = instructions[0].get('steps', [])
-            for i, step in enumerate(steps, 1):
-                step_text = step.get('step', '')
-                result += f"{i}. {step_text}\n\n"
+        if recipe_details.steps:
+            for i, step in enumerate(recipe_details.steps, 1):
+                result += f"{i}. {step}\n\n"
         else:
             # Fallback if no detailed instructions
             result += "Detailed step-by-step instructions are not available for this recipe. Here's what I can tell you:\n"
             result += f"This recipe takes about {ready_in_minutes} minutes to prepare and serves {servings} people.\n"
             result += "Follow standard cooking methods for the main ingredients listed above.\n"
         
-        # Additional tips
-        if recipe_details.get('summary'):
-            summary = recipe_details.get('summary', '').replace('<b>', '**').replace('</b>', '**')
-            # Remove HTML tags
-            import re
-            summary = re.sub('<.*?>', '', summary)
-            result += f"\n### 💡 Tips:\n{summary[:200]}...\n"
-        
+        # Additional tips; the summary was cleaned of HTML and shortened when it was fetched
+        if recipe_details.summary:
+            result += f"\n### 💡 Tips:\n{recipe_details.summary}...\n"
         return result
     
     def _provide_general_cooking_method(self, recipe_name: str) -> str:
@@ -145,17 +318,78 @@ class AgentTools:
         
         return f"I can provide general cooking guidance for {recipe_name}, but I'd need the specific recipe ID to get detailed instructions. Would you like me to search for more specific recipes instead?"
     
+    def compact_output(self, text: str) -> str:
+        """Replace tool outputs embedded in a response with their short references"""
+        for output, reference in reversed(self._output_references.items()):
+            if output in text:
+                text = text.replace(output, reference)
+        return text
+    
+    def approx_size(self) -> int:
+        """Rough size in bytes of the per-session state held by the tools"""
+        size = sum(len(str(recipe)) for recipe in self.current_recipes)
+        size += sum(len(output) + len(reference) for output, reference in self._output_references.items())
+        return size + self.prefetcher.approx_size()
+    
+    def close(self):
+        """Cancel background work for this session"""
+        self.prefetcher.clear()
+    
+    def _remember_output(self, output: str, reference: str) -> str:
+        self._output_references[output] = reference
+        self._output_references.move_to_end(output)
+        while len(self._output_references) > 10:
+            self._output_references.popitem(last=False)
+        return output
+    
+    @staticmethod
+    def _traced_tool(name, func):
+        def run(tool_input: str) -> str:
+            with tracer.span("tool", tool=name):
+                return func(tool_input)
+        return run
+    
+    @staticmethod
+    def _atraced_tool(name, coroutine):
+        async def run(tool_input: str) -> str:
+            with tracer.span("tool", tool=name):
+                return await coroutine(tool_input)
+        return run
+    
+    def tool_functions(self) -> Dict[str, Tuple]:
+        """Traced (sync, async) callables by tool name; the router's fast path calls these without LangChain"""
+        return {
+            name: (self._traced_tool(name, func), self._atraced_tool(name, coroutine))
+            for name, func, coroutine in (
+                ("search_recipes", self.search_recipes_tool, self.asearch_recipes_tool),
+                ("get_recipe_details", self.get_recipe_details_tool, self.aget_recipe_details_tool),
+                ("plan_week", self.plan_week_tool, self.aplan_week_tool)
+            )
+        }
+    
     def get_tools(self):
         """Return list of tools for the agent"""
+        from langchain.tools import Tool
+        functions = self.tool_functions()
         return [
             Tool(
                 name="search_recipes",
                 description="Search for recipes based on available ingredients. Input should be a list of ingredients.",
-                func=self.search_recipes_tool
+                func=functions["search_recipes"][0],
+                coroutine=functions["search_recipes"][1]
             ),
             Tool(
                 name="get_recipe_details",
-                description="Get detailed cooking instructions for a specific recipe.",
-                func=self.get_recipe_details_tool
+                description="Get detailed cooking instructions for a specific recipe. Input should be a recipe ID, "
+                            "or several IDs separated by commas to get them all at once.",
+                func=functions["get_recipe_details"][0],
+                coroutine=functions["get_recipe_details"][1]
+            ),
+            Tool(
+                name="plan_week",
+                description="Plan meals for several days and build one shopping list. Input should be the user's request, "
+                            "e.g. '5 days, 2 meals a day with chicken, rice, spinach'. Defaults to 7 days of 2 meals.",
+                func=functions["plan_week"][0],
+                coroutine=functions["plan_week"][1]
             )
         ]
\ No newline at end of file
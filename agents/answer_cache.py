@@ -0,0 +1,181 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from config.settings import settings
+from utils.recipe_filters import RecipeFilters
+
+class AnswerCache:
+    """Whole agent responses for ingredient requests, shared by every session.
+
+    The exact tier is keyed on the canonical ingredient set plus preferences. The semantic tier
+    only helps with the free-text part: items the parser kept as typed ("dragon fruits") are
+    compared by embedding, and only against answers with the same vocabulary ingredients and
+    preferences, so a different ingredient list never shares an answer. Both tiers live in
+    process memory.
+    """
+
+    def __init__(self, vector_db=None, ingredient_parser=None, ttl: float = None, max_entries: int = None,
+                 similarity_threshold: float = None):
+        self.vector_db = vector_db  # Semantic tier is off without a vector database to embed with
+        if ingredient_parser is None:
+            from utils.ingreadient_parser import IngredientParser
+            ingredient_parser = IngredientParser()
+        self.ingredient_parser = ingredient_parser
+        self.ttl = ttl or settings.ANSWER_CACHE_TTL
+        self.max_entries = max_entries or settings.ANSWER_CACHE_MAX_ENTRIES
+        self.similarity_threshold = (
+            settings.ANSWER_CACHE_SIMILARITY_THRESHOLD if similarity_threshold is None else similarity_threshold
+        )
+
+        self._entries = OrderedDict()  # entry id -> {key, group, response, created_at, recipe_ids}
+        self._by_recipe = defaultdict(set)  # recipe id -> entry ids that show it
+        self._groups = defaultdict(dict)  # vocabulary ingredients + preferences -> {entry id: free-text vector}
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+
+    @staticmethod
+    def key(ingredients: Iterable[str], filters: RecipeFilters) -> str:
+        """Order-independent key; skill is included because it changes the LLM's answer"""
+        return f"{','.join(sorted(set(ingredients)))}|{AnswerCache._preferences_key(filters)}"
+
+    def get(self, ingredients: List[str], filters: RecipeFilters) -> Optional[str]:
+        """Cached response for this request, trying the exact tier before the semantic one"""
+        key = self.key(ingredients, filters)
+        response = self._lookup(self._entry_id(key))
+        if response is None:
+            response = self._semantic_lookup(ingredients, filters)
+            tier = "semantic_hits" if response is not None else "misses"
+        else:
+            tier = "exact_hits"
+        with self._lock:
+            self._counters[tier] += 1
+        return response
+
+    def set(self, ingredients: List[str], filters: RecipeFilters, response: str, recipe_ids: Iterable[int] = ()):
+        key = self.key(ingredients, filters)
+        entry_id = self._entry_id(key)
+        recipe_ids = {int(recipe_id) for recipe_id in recipe_ids}
+        group, free_text = self._split(ingredients, filters)
+        vector = None
+        if free_text and self.vector_db is not None:
+            try:
+                vector = self._embed(free_text)
+            except Exception as e:
+                print(f"Error storing cached answer: {e}")
+
+        with self._lock:
+            self._drop(entry_id)
+            self._entries[entry_id] = {
+                "key": key, "group": group, "response": response, "created_at": time.time(),
+                "recipe_ids": recipe_ids
+            }
+            for recipe_id in recipe_ids:
+                self._by_recipe[recipe_id].add(entry_id)
+            if vector is not None:
+                self._groups[group][entry_id] = vector
+            evictions = 0
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                evictions += 1
+            self._counters["writes"] += 1
+            self._counters["evictions"] += evictions
+
+    def invalidate(self, recipe_ids: Iterable[int] = None):
+        """Drop answers showing any of these recipes, or everything when no ids are given"""
+        with self._lock:
+            if recipe_ids is None:
+                dropped = list(self._entries)
+            else:
+                dropped = {entry_id for recipe_id in recipe_ids for entry_id in self._by_recipe.get(int(recipe_id), ())}
+            for entry_id in dropped:
+                self._drop(entry_id)
+            self._counters["invalidated"] += len(dropped)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            report = dict(self._counters)
+            report["entries"] = len(self._entries)
+        hits = report.get("exact_hits", 0) + report.get("semantic_hits", 0)
+        lookups = hits + report.get("misses", 0)
+        report["hit_rate"] = hits / lookups if lookups else 0.0
+        return report
+
+    def warm_up(self):
+        """Load the embedding model ahead of the first cached answer with free-text ingredients"""
+        if self.vector_db is not None:
+            self._embed(["warm up"])
+
+    def _lookup(self, entry_id: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return None
+            if time.time() - entry["created_at"] < self.ttl:
+                self._entries.move_to_end(entry_id)
+                return entry["response"]
+            self._drop(entry_id)
+            self._counters["expired"] += 1
+        return None
+
+    def _semantic_lookup(self, ingredients: List[str], filters: RecipeFilters) -> Optional[str]:
+        group, free_text = self._split(ingredients, filters)
+        if self.vector_db is None or not free_text:
+            return None
+        with self._lock:
+            candidates = list(self._groups.get(group, {}).items())
+        if not candidates:
+            return None
+        try:
+            vector = self._embed(free_text)
+        except Exception as e:
+            print(f"Error searching cached answers: {e}")
+            return None
+
+        similarities = np.stack([candidate for _, candidate in candidates]) @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        return self._lookup(candidates[best][0])
+
+    def _split(self, ingredients: List[str], filters: RecipeFilters) -> Tuple[str, List[str]]:
+        """(group key of the vocabulary ingredients and preferences, the items kept as typed)"""
+        known, free_text = set(), set()
+        for ingredient in ingredients:
+            (known if self.ingredient_parser.in_vocabulary(ingredient) else free_text).add(ingredient)
+        return f"{','.join(sorted(known))}|{self._preferences_key(filters)}", sorted(free_text)
+
+    def _drop(self, entry_id: str):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        vectors = self._groups.get(entry["group"])
+        if vectors is not None:
+            vectors.pop(entry_id, None)
+            if not vectors:
+                del self._groups[entry["group"]]
+        for recipe_id in entry["recipe_ids"]:
+            entries = self._by_recipe.get(recipe_id)
+            if entries is not None:
+                entries.discard(entry_id)
+                if not entries:
+                    del self._by_recipe[recipe_id]
+
+    def _embed(self, free_text: List[str]) -> np.ndarray:
+        vector = np.asarray(self.vector_db.embedding_cache.embed_query(self._document(free_text)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _document(ingredients: List[str]) -> str:
+        return f"Ingredients: {', '.join(sorted(set(ingredients)))}"
+
+    @staticmethod
+    def _preferences_key(filters: RecipeFilters) -> str:
+        return f"{filters.key()}|skill={filters.cooking_skill or ''}"
+
+    @staticmethod
+    def _entry_id(key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
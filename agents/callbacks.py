@@ -0,0 +1,131 @@
+import re
+from typing import Any, Callable, Dict, List
+from langchain.callbacks.base import BaseCallbackHandler
+from utils.tracing import tracer
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Collects prompt and completion token counts for the LLM calls of one turn, one 'llm' span each"""
+
+    def __init__(self, count_tokens=None):
+        self.count_tokens = count_tokens
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._estimated_prompt_tokens = 0
+        self._spans = {}  # run id -> open span
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], **kwargs: Any) -> None:
+        self._spans[kwargs.get("run_id")] = tracer.start_span("llm", call=self.llm_calls + 1)
+        # Fallback for providers that don't report usage (e.g. while streaming)
+        self._estimated_prompt_tokens = 0
+        if self.count_tokens is not None:
+            self._estimated_prompt_tokens = sum(
+                self.count_tokens(str(message.content)) for batch in messages for message in batch
+            )
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        self.llm_calls += 1
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", self._estimated_prompt_tokens)
+        completion_tokens = usage.get("completion_tokens", 0)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+        tracer.metrics.inc("llm_tokens_total", prompt_tokens, kind="prompt")
+        tracer.metrics.inc("llm_tokens_total", completion_tokens, kind="completion")
+        span = self._spans.pop(kwargs.get("run_id"), None)
+        if span is not None:
+            span.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+            span.end()
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        span = self._spans.pop(kwargs.get("run_id"), None)
+        if span is not None:
+            span.end(error)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens
+        }
+
+class FinalAnswerStreamHandler(BaseCallbackHandler):
+    """Forwards only the Final Answer text of a ReAct JSON blob as tokens arrive"""
+
+    _FINAL_ANSWER = re.compile(r'"action"\s*:\s*"Final Answer"\s*,\s*"action_input"\s*:\s*"')
+    _OTHER_ACTION = re.compile(r'"action"\s*:\s*"(?!Final Answer")[^"]*"')
+    _ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '"': '"', '\\': '\\', '/': '/'}
+
+    def __init__(self, emit: Callable[[str], None]):
+        self.emit = emit
+        self._reset()
+
+    def _reset(self):
+        self._buffer = ""
+        self._state = "search"
+        self._position = 0
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        self._reset()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], **kwargs: Any) -> None:
+        self._reset()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if self._state in ("skip", "done"):
+            return
+        self._buffer += token
+
+        if self._state == "search":
+            match = self._FINAL_ANSWER.search(self._buffer)
+            if match:
+                self._state = "answer"
+                self._position = match.end()
+            elif self._OTHER_ACTION.search(self._buffer):
+                # Intermediate tool call: scratchpad, not for the user
+                self._state = "skip"
+                return
+            else:
+                return
+
+        text = self._decode()
+        if text:
+            self.emit(text)
+
+    def _decode(self) -> str:
+        """Decode the JSON string body up to the closing quote or an incomplete escape"""
+        buffer, position, out = self._buffer, self._position, []
+        while position < len(buffer):
+            char = buffer[position]
+            if char == '"':
+                self._state = "done"
+                position += 1
+                break
+            if char != '\\':
+                out.append(char)
+                position += 1
+                continue
+            if position + 1 >= len(buffer):
+                break
+            code = buffer[position + 1]
+            if code == 'u':
+                if position + 6 > len(buffer):
+                    break
+                code_point, length = int(buffer[position + 2:position + 6], 16), 6
+                if 0xD800 <= code_point <= 0xDBFF:
+                    # Emoji and other astral characters arrive as a surrogate pair of escapes
+                    following = buffer[position + 6:position + 12]
+                    if len(following) < 6 and '\\u'.startswith(following[:2]):
+                        break  # Wait for the low half
+                    low = int(following[2:], 16) if following.startswith('\\u') else 0
+                    if 0xDC00 <= low <= 0xDFFF:
+                        code_point, length = 0x10000 + ((code_point - 0xD800) << 10) + (low - 0xDC00), 12
+                # A lone surrogate can't be encoded as UTF-8
+                out.append('\ufffd' if 0xD800 <= code_point <= 0xDFFF else chr(code_point))
+                position += length
+            else:
+                out.append(self._ESCAPES.get(code, code))
+                position += 2
+        self._position = position
+        return "".join(out)
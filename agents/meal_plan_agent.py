@@ -1,30 +1,32 @@
-from langchain.agents import initialize_agent, AgentType
-from langchain.memory import ConversationBufferMemory
+import asyncio
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import asynccontextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional
 from services.groq_service import GroqService
 from agents.agent_tool import AgentTools
+from agents.router import IntentRouter
+from config.settings import settings
+from utils.recipe_filters import RecipeFilters
+from utils.tracing import tracer
 
 class MealPlanningAgent:
-    def __init__(self):
-        self.groq_service = GroqService()
-        self.llm = self.groq_service.get_llm()
-        self.agent_tools = AgentTools()
-        
-        # Initialize memory
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
-        )
-        
-        # Initialize agent
-        self.agent = initialize_agent(
-            tools=self.agent_tools.get_tools(),
-            llm=self.llm,
-            agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-            memory=self.memory,
-            verbose=True,
-            max_iterations=3,
-            early_stopping_method="generate"
-        )
+    ERROR_MESSAGE = "I'm having trouble processing your request. Please try again with a list of your available ingredients."
+    NO_LLM_USAGE = {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0}  # Cached and routed turns
+    
+    def __init__(self, groq_service: GroqService = None, agent_tools: AgentTools = None, llm_limiter=None,
+                 answer_cache=None):
+        self.groq_service = groq_service or GroqService()
+        self.agent_tools = agent_tools or AgentTools()
+        self.llm_limiter = llm_limiter  # Shared cap on in-flight LLM calls
+        self.answer_cache = answer_cache  # Optional cross-session cache of whole responses
+        self.session_id = None  # Set by AgentPool; tags traces so the debug panel shows only this session's
+        self._turn_lock = threading.Lock()  # One turn at a time per conversation
+        self.tool_functions = self.agent_tools.tool_functions()
+        self.router = IntentRouter(self.agent_tools.ingredient_parser)
         
         # System prompt
         self.system_prompt = """
@@ -68,13 +70,373 @@ class MealPlanningAgent:
 
         Remember: Your goal is to make cooking feel achievable and fun by providing COMPLETE, actionable information that turns ingredients into delicious meals!
         """
+        
+        # Recent turns verbatim, older ones folded into a running summary. The memory is a LangChain
+        # object, so it is built with the agent; until then turns wait in _pending_turns.
+        self.memory = None
+        self._pending_turns = []  # (user input, response)
+        self.turn_usage = deque(maxlen=100)  # Token counts per turn
+        self.size = 0  # approx_size() as of the end of the last turn
+        self._turn_listeners = []
+        
+        # Built on the first LLM turn; cached and routed turns never import the agent framework
+        self.tools = None
+        self.agent = None
+        self.streaming_agent = None
     
-    def chat(self, user_input: str) -> str:
+    @staticmethod
+    def preload():
+        """Import the agent framework ahead of the first LLM turn (used by background warm-up)"""
+        import langchain.agents
+        import agents.callbacks
+        import agents.memory
+    
+    def _build_agent(self, llm):
+        """Create the ReAct agent with the system prompt as a real system message"""
+        from langchain.agents import initialize_agent, AgentType
+        if self.tools is None:
+            self.tools = self.agent_tools.get_tools()
+        return initialize_agent(
+            tools=self.tools,
+            llm=llm,
+            agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
+            memory=self._get_memory(),
+            verbose=settings.AGENT_VERBOSE,
+            max_iterations=3,
+            early_stopping_method="generate",
+            agent_kwargs={"system_message": self.system_prompt}
+        )
+    
+    def chat(self, user_input: str, preferences: Dict = None) -> str:
         """Process user input and return agent response"""
+        started = time.perf_counter()
+        with tracer.trace("chat", streaming=False, session=self.session_id) as trace:
+            try:
+                with self._turn_lock:
+                    cache_ingredients = self._begin_turn(user_input, preferences)
+                    cached = self._cached_answer(user_input, cache_ingredients, started)
+                    if cached is not None:
+                        trace.set(path="cache")
+                        return cached
+                    
+                    # Obvious intents go straight to a tool without an LLM round trip
+                    route = self.router.route(user_input)
+                    if route is not None:
+                        trace.set(path="fast_path")
+                        response = self._run_fast_path(user_input, route, started)
+                    else:
+                        trace.set(path="llm")
+                        from agents.callbacks import TokenUsageHandler
+                        usage = TokenUsageHandler(self.groq_service.count_tokens)
+                        with self._llm_slot():
+                            response = self._get_agent().run(self._with_preferences(user_input), callbacks=[usage])
+                        latency = time.perf_counter() - started
+                        self._record_usage("llm", usage.summary(), latency, latency)
+                    self._cache_answer(cache_ingredients, response)
+                    return response
+            except Exception as e:
+                self._report_error(trace, e)
+                return self.ERROR_MESSAGE
+            finally:
+                self._end_turn()
+    
+    async def achat(self, user_input: str, preferences: Dict = None) -> str:
+        """Async variant of chat: Spoonacular, Groq and memory calls are awaited instead of holding a thread"""
+        started = time.perf_counter()
+        with tracer.trace("chat", streaming=False, mode="async", session=self.session_id) as trace:
+            try:
+                async with self._acquired(self._turn_lock):
+                    cache_ingredients = self._begin_turn(user_input, preferences)
+                    cached = None
+                    if cache_ingredients:
+                        # The semantic tier embeds the query, so it runs off the event loop
+                        cached = await asyncio.to_thread(self._cached_answer, user_input, cache_ingredients, started)
+                    if cached is not None:
+                        trace.set(path="cache")
+                        return cached
+                    
+                    route = self.router.route(user_input)
+                    if route is not None:
+                        trace.set(path="fast_path")
+                        response = await self._arun_fast_path(user_input, route, started)
+                    else:
+                        trace.set(path="llm")
+                        # Building the agent imports LangChain on first use
+                        agent = await asyncio.to_thread(self._get_agent)
+                        from agents.callbacks import TokenUsageHandler
+                        usage = TokenUsageHandler(self.groq_service.count_tokens)
+                        async with self._acquired(self.llm_limiter):
+                            response = await agent.arun(self._with_preferences(user_input), callbacks=[usage])
+                        latency = time.perf_counter() - started
+                        self._record_usage("llm", usage.summary(), latency, latency)
+                    if cache_ingredients:
+                        await asyncio.to_thread(self._cache_answer, cache_ingredients, response)
+                    return response
+            except Exception as e:
+                self._report_error(trace, e)
+                return self.ERROR_MESSAGE
+            finally:
+                self._end_turn()
+    
+    def chat_stream(self, user_input: str, preferences: Dict = None) -> Iterator[str]:
+        """Process user input, yielding final-answer text as the LLM generates it"""
+        started = time.perf_counter()
+        # A generator can't keep a trace active across yields, so it is activated per block
+        trace = tracer.start_trace("chat", streaming=True, session=self.session_id)
+        try:
+            with self._turn_lock:
+                with tracer.activate(trace):
+                    cache_ingredients = self._begin_turn(user_input, preferences)
+                    cached = self._cached_answer(user_input, cache_ingredients, started)
+                    route = self.router.route(user_input) if cached is None else None
+                if cached is not None:
+                    trace.set(path="cache")
+                    yield cached
+                    return
+                
+                if route is not None:
+                    trace.set(path="fast_path")
+                    try:
+                        with tracer.activate(trace):
+                            response = self._run_fast_path(user_input, route, started)
+                            self._cache_answer(cache_ingredients, response)
+                    except Exception as e:
+                        self._report_error(trace, e)
+                        response = self.ERROR_MESSAGE
+                    yield response
+                    return
+                
+                trace.set(path="llm_stream")
+                tokens = queue.Queue()
+                from agents.callbacks import FinalAnswerStreamHandler, TokenUsageHandler
+                usage = TokenUsageHandler(self.groq_service.count_tokens)
+                result = {}
+                
+                def run():
+                    try:
+                        with tracer.activate(trace), self._llm_slot():
+                            result["response"] = self._get_streaming_agent().run(
+                                self._with_preferences(user_input),
+                                callbacks=[usage, FinalAnswerStreamHandler(tokens.put)]
+                            )
+                    except Exception as e:
+                        result["error"] = e
+                        self._report_error(trace, e)
+                    finally:
+                        tokens.put(None)
+                
+                threading.Thread(target=run, daemon=True).start()
+                
+                streamed, first_token_at = "", None
+                while (token := tokens.get()) is not None:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        trace.set(time_to_first_token_ms=round((first_token_at - started) * 1000, 3))
+                    streamed += token
+                    yield token
+                
+                # Answers that weren't emitted as a Final Answer blob arrive only at the end
+                response = result.get("response")
+                if response is None:
+                    remainder = "" if streamed else self.ERROR_MESSAGE
+                else:
+                    remainder = response[len(streamed):] if response.startswith(streamed) else ("" if streamed else response)
+                if remainder:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    yield remainder
+                
+                if "error" not in result:
+                    finished = time.perf_counter()
+                    self._record_usage("llm_stream", usage.summary(), finished - started, (first_token_at or finished) - started)
+                    self._cache_answer(cache_ingredients, response)
+        finally:
+            self._end_turn()
+            trace.end()
+    
+    def _get_agent(self):
+        if self.agent is None:
+            self.agent = self._build_agent(self.groq_service.get_llm())
+        return self.agent
+    
+    def _get_streaming_agent(self):
+        if self.streaming_agent is None:
+            self.streaming_agent = self._build_agent(self.groq_service.get_streaming_llm())
+        return self.streaming_agent
+    
+    def _get_memory(self):
+        """Build the conversation memory, replaying the turns answered before it existed"""
+        if self.memory is None:
+            from agents.memory import CompactSummaryBufferMemory
+            memory = CompactSummaryBufferMemory(
+                llm=self.groq_service.get_llm(),
+                max_token_limit=settings.MEMORY_MAX_TOKENS,
+                memory_key="chat_history",
+                return_messages=True,
+                compactor=self.agent_tools.compact_output
+            )
+            for user_input, response in self._pending_turns:
+                memory.save_context({"input": user_input}, {"output": response})
+            self._pending_turns = []
+            self.memory = memory
+        return self.memory
+    
+    def _remember(self, user_input: str, response: str):
+        """Keep a cached or routed turn for the conversation memory without importing LangChain"""
+        if self.memory is not None:
+            self.memory.save_context({"input": user_input}, {"output": response})
+            return
+        self._pending_turns.append((user_input, response))
+        # Past the budget the memory has to summarize, which needs the LLM anyway
+        if self._memory_tokens() > settings.MEMORY_MAX_TOKENS:
+            self._get_memory()
+    
+    async def _aremember(self, user_input: str, response: str):
+        if self.memory is not None:
+            await self.memory.asave_context({"input": user_input}, {"output": response})
+            return
+        self._pending_turns.append((user_input, response))
+        if self._memory_tokens() > settings.MEMORY_MAX_TOKENS:
+            await asyncio.to_thread(self._get_memory)
+    
+    def _memory_text(self) -> str:
+        if self.memory is not None:
+            return (
+                " ".join(str(message.content) for message in self.memory.chat_memory.messages)
+                + " " + self.memory.moving_summary_buffer
+            )
+        return " ".join(
+            f"{user_input} {self.agent_tools.compact_output(response)}"
+            for user_input, response in self._pending_turns
+        )
+    
+    def _memory_tokens(self) -> int:
+        return self.groq_service.count_tokens(self._memory_text())
+    
+    def _begin_turn(self, user_input: str, preferences: Dict = None) -> Optional[List[str]]:
+        """Reset per-turn state; returns the answer cache ingredients when the answer is reusable"""
+        self._apply_preferences(preferences)
+        self.agent_tools.shown_recipe_ids.clear()
+        if self.answer_cache is None:
+            return None
+        ingredient_list = self.router.ingredient_request(user_input)
+        if ingredient_list is None:
+            return None
+        return self.agent_tools.ingredient_parser.parse_ingredients(ingredient_list) or None
+    
+    def _end_turn(self):
+        """Refresh the size snapshot once per turn and tell listeners, e.g. the session pool"""
+        self.size = self.approx_size()
+        for listener in self._turn_listeners:
+            listener(self)
+    
+    def _cached_answer(self, user_input: str, ingredients: Optional[List[str]], started: float) -> Optional[str]:
+        if not ingredients:
+            return None
+        with tracer.span("answer_cache") as span:
+            response = self.answer_cache.get(ingredients, self.agent_tools.filters)
+            span.set(hit=response is not None)
+        if response is None:
+            return None
+        self._remember(user_input, response)
+        latency = time.perf_counter() - started
+        self._record_usage("cache", self.NO_LLM_USAGE, latency, latency)
+        return response
+    
+    def _cache_answer(self, ingredients: Optional[List[str]], response: Optional[str]):
+        # Only answers that actually showed recipes are worth reusing
+        if not ingredients or not response or response == self.ERROR_MESSAGE or not self.agent_tools.shown_recipe_ids:
+            return
+        self.answer_cache.set(ingredients, self.agent_tools.filters, response, self.agent_tools.shown_recipe_ids)
+    
+    def _apply_preferences(self, preferences: Dict = None):
+        """Hand sidebar preferences to the tools as structured retrieval filters"""
+        self.agent_tools.filters = RecipeFilters.from_preferences(preferences)
+    
+    def _with_preferences(self, user_input: str) -> str:
+        # Retrieval already applies the filters; the LLM only needs a one-line reminder
+        described = self.agent_tools.filters.describe()
+        return f"(Preferences: {described}) {user_input}" if described else user_input
+    
+    def _run_fast_path(self, user_input: str, route, started: float) -> str:
+        """Call the routed tool directly and keep the turn in conversation memory"""
+        func, _ = self.tool_functions[route.tool]
+        response = func(route.argument)
+        self._remember(user_input, response)
+        latency = time.perf_counter() - started
+        self._record_usage("fast_path", self.NO_LLM_USAGE, latency, latency)
+        return response
+    
+    async def _arun_fast_path(self, user_input: str, route, started: float) -> str:
+        _, coroutine = self.tool_functions[route.tool]
+        response = await coroutine(route.argument)
+        await self._aremember(user_input, response)
+        latency = time.perf_counter() - started
+        self._record_usage("fast_path", self.NO_LLM_USAGE, latency, latency)
+        return response
+    
+    def _report_error(self, trace, error: Exception):
+        """Log a failed turn and keep the traceback on its trace; the user only sees ERROR_MESSAGE"""
+        print(f"Error processing chat request {trace.trace.trace_id}: {error}")
+        trace.set(traceback=traceback.format_exc())
+        trace.fail(error)
+    
+    def _llm_slot(self):
+        if self.llm_limiter is None:
+            return nullcontext()
+        return self.llm_limiter
+    
+    @staticmethod
+    @asynccontextmanager
+    async def _acquired(lock):
+        """Hold a threading lock or semaphore from a coroutine without parking an executor thread on it
+
+        The same lock guards sync chat() turns, so it can't be an asyncio primitive; a taken one is
+        polled with a short backoff on the loop instead. Threads blocked in acquire() would starve the
+        executor that the current holders need to finish their turns.
+        """
+        if lock is None:
+            yield
+            return
+        delay = 0.005
+        while not lock.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
         try:
-            # Add system context to user input
-            enhanced_input = f"{self.system_prompt}\n\nUser: {user_input}"
-            response = self.agent.run(enhanced_input)
-            return response
-        except Exception as e:
-            return f"I'm having trouble processing your request. Please try again with a list of your available ingredients."
\ No newline at end of file
+            yield
+        finally:
+            lock.release()
+    
+    def _record_usage(self, path: str, usage: Dict[str, int], latency: float, time_to_first_token: float):
+        turn = {"path": path, **usage}
+        turn["latency_seconds"] = round(latency, 4)
+        turn["time_to_first_token_seconds"] = round(time_to_first_token, 4)
+        turn["memory_tokens"] = self._memory_tokens()
+        self.turn_usage.append(turn)
+    
+    def usage_stats(self):
+        """Prompt/completion tokens, memory size and latency for recent turns"""
+        return list(self.turn_usage)
+    
+    def routing_stats(self):
+        """How many requests bypassed the LLM agent"""
+        return self.router.stats()
+    
+    def answer_cache_stats(self):
+        """Exact/semantic hit rates of the shared answer cache"""
+        return self.answer_cache.stats() if self.answer_cache is not None else {}
+    
+    def prefetch_stats(self):
+        """Used/wasted counts of recipe details prefetched after searches"""
+        return self.agent_tools.prefetcher.stats()
+    
+    def approx_size(self) -> int:
+        """Rough size in bytes of this conversation's state"""
+        return len(self._memory_text()) + self.agent_tools.approx_size()
+    
+    def add_turn_listener(self, listener):
+        """Call listener(agent) after every turn"""
+        self._turn_listeners.append(listener)
+    
+    def close(self):
+        self.agent_tools.close()
@@ -0,0 +1,244 @@
+import re
+import time
+from typing import Dict, List, Sequence, Tuple, Union
+import numpy as np
+from config.settings import settings
+from utils.recipe_filters import RecipeFilters
+from utils.tracing import tracer
+
+def optimize_plan(pantry_matrix: np.ndarray, buy_matrix: np.ndarray, slots: int,
+                  weights: Dict[str, float] = None, max_passes: int = None) -> Tuple[List[int], float]:
+    """Pick `slots` distinct candidate rows maximizing pantry use and minimizing distinct purchases
+
+    Rows are candidates; columns of pantry_matrix are pantry ingredients and columns of buy_matrix are
+    everything else. The objective is pantry_covered * |pantry used| + pantry_uses * (sum of pantry
+    ingredients per meal) - purchase * |ingredients to buy|. A greedy pass is refined by swapping one
+    meal at a time for the best outside candidate until no swap improves the plan.
+    """
+    weights = weights or settings.MEAL_PLAN_WEIGHTS
+    max_passes = settings.MEAL_PLAN_LOCAL_SEARCH_PASSES if max_passes is None else max_passes
+    covered_weight = weights["pantry_covered"]
+    uses_weight = weights["pantry_uses"]
+    purchase_weight = weights["purchase"]
+
+    candidates = pantry_matrix.shape[0]
+    slots = min(slots, candidates)
+    if slots <= 0:
+        return [], 0.0
+
+    pantry_sizes = pantry_matrix.sum(1, dtype=np.int32)
+    buy_sizes = buy_matrix.sum(1, dtype=np.int32)
+    # The part of a meal's value that doesn't depend on the rest of the plan
+    base = (covered_weight + uses_weight) * pantry_sizes - purchase_weight * buy_sizes
+
+    def gains(pantry_overlap: np.ndarray, buy_overlap: np.ndarray) -> np.ndarray:
+        # Overlaps with the rest of the plan: pantry already counted, purchases already made
+        return base - covered_weight * pantry_overlap + purchase_weight * buy_overlap
+
+    # Greedy: overlaps only change in the columns the last pick covered for the first time
+    pantry_count = np.zeros(pantry_matrix.shape[1], dtype=np.int32)
+    buy_count = np.zeros(buy_matrix.shape[1], dtype=np.int32)
+    pantry_overlap = np.zeros(candidates, dtype=np.int32)
+    buy_overlap = np.zeros(candidates, dtype=np.int32)
+    chosen = np.zeros(candidates, dtype=bool)
+    plan = []
+    for _ in range(slots):
+        scores = np.where(chosen, -np.inf, gains(pantry_overlap, buy_overlap))
+        row = int(np.argmax(scores))
+        plan.append(row)
+        chosen[row] = True
+        new_pantry = np.flatnonzero(pantry_matrix[row] & (pantry_count == 0))
+        new_buy = np.flatnonzero(buy_matrix[row] & (buy_count == 0))
+        pantry_overlap += pantry_matrix[:, new_pantry].sum(1, dtype=np.int32)
+        buy_overlap += buy_matrix[:, new_buy].sum(1, dtype=np.int32)
+        pantry_count += pantry_matrix[row]
+        buy_count += buy_matrix[row]
+
+    # Local search: removing a meal only uncovers the columns no other meal uses
+    for _ in range(max_passes):
+        improved = False
+        for position, row in enumerate(plan):
+            lost_pantry = np.flatnonzero(pantry_matrix[row] & (pantry_count == 1))
+            lost_buy = np.flatnonzero(buy_matrix[row] & (buy_count == 1))
+            rest_pantry = pantry_overlap - pantry_matrix[:, lost_pantry].sum(1, dtype=np.int32)
+            rest_buy = buy_overlap - buy_matrix[:, lost_buy].sum(1, dtype=np.int32)
+            scores = gains(rest_pantry, rest_buy)
+            current = scores[row]
+            scores[chosen] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] <= current + 1e-9:
+                continue
+
+            plan[position] = best
+            chosen[row], chosen[best] = False, True
+            pantry_count -= pantry_matrix[row]
+            buy_count -= buy_matrix[row]
+            new_pantry = np.flatnonzero(pantry_matrix[best] & (pantry_count == 0))
+            new_buy = np.flatnonzero(buy_matrix[best] & (buy_count == 0))
+            pantry_overlap = rest_pantry + pantry_matrix[:, new_pantry].sum(1, dtype=np.int32)
+            buy_overlap = rest_buy + buy_matrix[:, new_buy].sum(1, dtype=np.int32)
+            pantry_count += pantry_matrix[best]
+            buy_count += buy_matrix[best]
+            improved = True
+        if not improved:
+            break
+
+    objective = (
+        covered_weight * np.count_nonzero(pantry_count)
+        + uses_weight * int(pantry_sizes[plan].sum())
+        - purchase_weight * np.count_nonzero(buy_count)
+    )
+    return plan, float(objective)
+
+class MealPlanner:
+    """Plans several days of meals from one candidate retrieval and one optimization pass"""
+
+    _DAYS = re.compile(r'\b(\d{1,2})\s*-?\s*days?\b', re.IGNORECASE)
+    _WEEK = re.compile(r'\b(?:week|weekly)\b', re.IGNORECASE)
+    _MEALS_PER_DAY = re.compile(r'\b(\d)\s*(?:meals?|dinners?|dishes)\s*(?:a|per|each|every)\s*day\b', re.IGNORECASE)
+    _PANTRY_SEPARATOR = re.compile(r'\b(?:with|using|from)\b|:', re.IGNORECASE)
+
+    def __init__(self, recipe_service=None, local_engine=None, ingredient_parser=None):
+        self.recipe_service = recipe_service
+        self.local_engine = local_engine
+        if ingredient_parser is None:
+            from utils.ingreadient_parser import IngredientParser
+            ingredient_parser = IngredientParser()
+        self.ingredient_parser = ingredient_parser
+
+    def parse_request(self, request: str) -> Tuple[List[str], int, int]:
+        """Pantry ingredients, days and meals per day from e.g. "5-day plan, 2 meals a day with chicken, rice" """
+        days = settings.MEAL_PLAN_DAYS
+        match = self._DAYS.search(request)
+        if match:
+            days = int(match.group(1))
+        elif self._WEEK.search(request):
+            days = 7
+        meals_per_day = settings.MEAL_PLAN_MEALS_PER_DAY
+        match = self._MEALS_PER_DAY.search(request)
+        if match:
+            meals_per_day = int(match.group(1))
+
+        # The pantry is whatever follows the last "with"/"using"/"from"/":" once the plan size is removed
+        text = self._MEALS_PER_DAY.sub(' ', self._DAYS.sub(' ', request))
+        parts = self._PANTRY_SEPARATOR.split(text)
+        pantry = self.ingredient_parser.parse_ingredients(parts[-1].strip().rstrip('.!?'))
+        return pantry, days, meals_per_day
+
+    def plan_week(self, pantry: Union[str, Sequence[str]], preferences: Union[RecipeFilters, Dict] = None,
+                  days: int = None, meals_per_day: int = None) -> Dict:
+        """Plan `days` x `meals_per_day` meals that use the pantry and share what has to be bought"""
+        started = time.perf_counter()
+        filters = preferences if isinstance(preferences, RecipeFilters) else RecipeFilters.from_preferences(preferences)
+        days = max(1, min(days or settings.MEAL_PLAN_DAYS, settings.MEAL_PLAN_MAX_DAYS))
+        meals_per_day = max(1, min(meals_per_day or settings.MEAL_PLAN_MEALS_PER_DAY, settings.MEAL_PLAN_MAX_MEALS_PER_DAY))
+        if isinstance(pantry, str):
+            pantry = self.ingredient_parser.parse_ingredients(pantry)
+        else:
+            pantry = list(dict.fromkeys(ingredient for names in self.ingredient_parser.parse_many(pantry) for ingredient in names))
+        slots = days * meals_per_day
+
+        with tracer.span("plan_candidates") as span:
+            candidates, source = self._candidates(pantry, slots, filters)
+            span.set(source=source, candidates=len(candidates))
+        if not pantry or not candidates:
+            return {"days": [], "shopping_list": [], "pantry_used": [], "pantry_unused": pantry,
+                    "stats": {"candidates": len(candidates), "source": source}}
+
+        with tracer.span("plan_optimize", candidates=len(candidates), slots=slots) as span:
+            pantry_matrix, buy_matrix = self._matrices(candidates, pantry)
+            rows, objective = optimize_plan(pantry_matrix, buy_matrix, slots)
+            span.set(objective=round(objective, 2))
+
+        # Too few distinct recipes: repeat the chosen ones as leftovers
+        meals = [candidates[rows[i % len(rows)]] for i in range(slots)]
+        pantry_set = set(pantry)
+        staples = set(settings.MEAL_PLAN_STAPLES)
+        shopping = {}
+        for row in dict.fromkeys(rows):
+            for ingredient in candidates[row]["ingredients"]:
+                if ingredient not in pantry_set and ingredient not in staples:
+                    shopping[ingredient] = shopping.get(ingredient, 0) + 1
+        used_columns = pantry_matrix[rows].any(0)
+        pantry_used = [ingredient for ingredient, used in zip(pantry, used_columns) if used]
+
+        return {
+            "days": [
+                [self._meal(meal, pantry_set, staples) for meal in meals[day * meals_per_day:(day + 1) * meals_per_day]]
+                for day in range(days)
+            ],
+            "shopping_list": sorted(shopping.items(), key=lambda item: (-item[1], item[0])),
+            "pantry_used": pantry_used,
+            "pantry_unused": [ingredient for ingredient in pantry if ingredient not in pantry_used],
+            "stats": {
+                "candidates": len(candidates),
+                "source": source,
+                "distinct_recipes": len(set(rows)),
+                "objective": round(objective, 2),
+                "seconds": round(time.perf_counter() - started, 4)
+            }
+        }
+
+    def _candidates(self, pantry: List[str], slots: int, filters: RecipeFilters) -> Tuple[List[Dict], str]:
+        """One bulk retrieval: the local index first, one findByIngredients call if it is too thin"""
+        if not pantry:
+            return [], "none"
+        candidates, sources = {}, []
+        if self.local_engine is not None:
+            for recipe in self.local_engine.search(pantry, number=settings.MEAL_PLAN_LOCAL_CANDIDATES,
+                                                   ranking=2, filters=filters):
+                candidates[recipe['id']] = self._candidate(recipe, canonical=True)
+            if candidates:
+                sources.append("local")
+
+        if len(candidates) < slots * settings.MEAL_PLAN_MIN_CANDIDATES_PER_MEAL and self.recipe_service is not None:
+            recipes = self.recipe_service.search_recipes_by_ingredients(
+                pantry, number=settings.MEAL_PLAN_API_CANDIDATES, ranking=2, filters=filters
+            )
+            for recipe in recipes:
+                if recipe.get('id') is not None and recipe['id'] not in candidates:
+                    candidates[recipe['id']] = self._candidate(recipe, canonical=recipe.get('source') == 'local')
+            if recipes:
+                sources.append("spoonacular")
+        return [candidate for candidate in candidates.values() if candidate["ingredients"]], "+".join(sources) or "none"
+
+    def _candidate(self, recipe: Dict, canonical: bool) -> Dict:
+        names = [ingredient.get('name', '') for ingredient in
+                 (recipe.get('usedIngredients') or []) + (recipe.get('missedIngredients') or [])]
+        if not canonical:
+            names = [ingredient for parsed in self.ingredient_parser.parse_many(name for name in names if name)
+                     for ingredient in parsed]
+        return {"id": recipe['id'], "title": recipe.get('title') or "Recipe", "ingredients": list(dict.fromkeys(names))}
+
+    @staticmethod
+    def _matrices(candidates: List[Dict], pantry: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """0/1 candidate x ingredient matrices for pantry and to-buy ingredients; staples count as neither"""
+        pantry_columns = {ingredient: i for i, ingredient in enumerate(pantry)}
+        staples = set(settings.MEAL_PLAN_STAPLES) - set(pantry_columns)
+        buy_columns = {}
+        pantry_cells, buy_cells = ([], []), ([], [])
+        for row, candidate in enumerate(candidates):
+            for ingredient in candidate["ingredients"]:
+                column = pantry_columns.get(ingredient)
+                if column is not None:
+                    pantry_cells[0].append(row)
+                    pantry_cells[1].append(column)
+                elif ingredient not in staples:
+                    buy_cells[0].append(row)
+                    buy_cells[1].append(buy_columns.setdefault(ingredient, len(buy_columns)))
+
+        # Column-major so gathering a few ingredient columns reads contiguous memory
+        pantry_matrix = np.zeros((len(candidates), len(pantry_columns)), dtype=np.uint8, order="F")
+        buy_matrix = np.zeros((len(candidates), len(buy_columns)), dtype=np.uint8, order="F")
+        pantry_matrix[pantry_cells] = 1
+        buy_matrix[buy_cells] = 1
+        return pantry_matrix, buy_matrix
+
+    @staticmethod
+    def _meal(candidate: Dict, pantry: set, staples: set) -> Dict:
+        return {
+            "id": candidate["id"],
+            "title": candidate["title"],
+            "uses": [ingredient for ingredient in candidate["ingredients"] if ingredient in pantry],
+            "buy": [ingredient for ingredient in candidate["ingredients"] if ingredient not in pantry and ingredient not in staples]
+        }
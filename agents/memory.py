@@ -0,0 +1,22 @@
+from typing import Any, Callable, Dict, Optional
+from langchain.memory import ConversationSummaryBufferMemory
+
+class CompactSummaryBufferMemory(ConversationSummaryBufferMemory):
+    """Token-budgeted memory that summarizes old turns and stores tool outputs as short references"""
+
+    compactor: Optional[Callable[[str], str]] = None
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        super().save_context(inputs, self._compact(outputs))
+
+    async def asave_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        """Async variant used by achat; older turns are summarized with an async LLM call"""
+        await super().asave_context(inputs, self._compact(outputs))
+
+    def _compact(self, outputs: Dict[str, str]) -> Dict[str, str]:
+        if self.compactor is None:
+            return outputs
+        return {
+            key: self.compactor(value) if isinstance(value, str) else value
+            for key, value in outputs.items()
+        }
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+from config.settings import settings
+from services.recipe_records import RecipeDetail
+
+class RecipePrefetcher:
+    """Loads details for the top search results in the background"""
+
+    def __init__(self, recipe_service, executor=None, top_n: int = None,
+                 max_entries: int = None, wait_timeout: float = None):
+        self.recipe_service = recipe_service
+        self.executor = executor or recipe_service.executor
+        self.top_n = top_n or settings.PREFETCH_TOP_N
+        self.max_entries = max_entries or settings.PREFETCH_MAX_ENTRIES
+        self.wait_timeout = settings.PREFETCH_WAIT_TIMEOUT if wait_timeout is None else wait_timeout
+
+        self._store = OrderedDict()  # recipe_id -> {"details": ..., "used": bool}
+        self._pending = None  # (generation, future, recipe_ids)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+
+    def prefetch(self, recipe_ids: List[int]):
+        """Start loading details for a new search, cancelling the previous one"""
+        ids = [int(recipe_id) for recipe_id in recipe_ids if recipe_id is not None][:self.top_n]
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._cancel_pending()
+
+            # Unused details from the replaced search are wasted work
+            for recipe_id in list(self._store):
+                entry = self._store[recipe_id]
+                if recipe_id not in ids and not entry["used"]:
+                    del self._store[recipe_id]
+                    self._counters["wasted"] += 1
+
+            to_load = [recipe_id for recipe_id in ids if recipe_id not in self._store]
+            if not to_load:
+                return
+            future = self.executor.submit(self._load, generation, to_load)
+            self._pending = (generation, future, set(to_load))
+            self._counters["scheduled"] += len(to_load)
+
+    def get(self, recipe_id: int) -> Optional[RecipeDetail]:
+        """Return prefetched details, briefly waiting if the load is in flight"""
+        recipe_id = int(recipe_id)
+        details, pending = self._lookup(recipe_id)
+        if pending is None:
+            return details
+
+        try:
+            pending.result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            pass
+        except Exception as e:
+            print(f"Error prefetching recipe details: {e}")
+        return self._take_after_wait(recipe_id)
+
+    async def aget(self, recipe_id: int) -> Optional[RecipeDetail]:
+        """Async variant of get() that waits for the load without blocking the event loop"""
+        recipe_id = int(recipe_id)
+        details, pending = self._lookup(recipe_id)
+        if pending is None:
+            return details
+
+        # wait() neither raises for the load nor cancels it on timeout; the load belongs to the executor
+        done, _ = await asyncio.wait({asyncio.wrap_future(pending)}, timeout=self.wait_timeout)
+        for future in done:
+            if not future.cancelled() and future.exception() is not None:
+                print(f"Error prefetching recipe details: {future.exception()}")
+        return self._take_after_wait(recipe_id)
+
+    def clear(self):
+        """Cancel pending loads and drop stored details"""
+        with self._lock:
+            self._generation += 1
+            self._cancel_pending()
+            self._counters["wasted"] += sum(1 for entry in self._store.values() if not entry["used"])
+            self._store.clear()
+
+    def approx_size(self) -> int:
+        with self._lock:
+            return sum(len(str(entry["details"])) for entry in self._store.values())
+
+    def stats(self) -> Dict[str, float]:
+        """How often prefetched details were used versus wasted"""
+        with self._lock:
+            report = dict(self._counters)
+        settled = report.get("used", 0) + report.get("wasted", 0)
+        report["use_rate"] = report.get("used", 0) / settled if settled else 0.0
+        return report
+
+    def _load(self, generation: int, recipe_ids: List[int]):
+        details_list = self.recipe_service.get_recipe_details_bulk(recipe_ids, background=True)
+
+        with self._lock:
+            if generation != self._generation:
+                self._counters["discarded"] += len(details_list)
+                return
+            for details in details_list:
+                self._store[details.id] = {"details": details, "used": False}
+                self._store.move_to_end(details.id)
+                self._counters["loaded"] += 1
+            while len(self._store) > self.max_entries:
+                _, entry = self._store.popitem(last=False)
+                if not entry["used"]:
+                    self._counters["wasted"] += 1
+            if self._pending is not None and self._pending[0] == generation:
+                self._pending = None
+
+    def _lookup(self, recipe_id: int):
+        """(details, None) when settled, or (None, future) of the in-flight load that includes the id"""
+        with self._lock:
+            details = self._take(recipe_id)
+            if details is not None:
+                return details, None
+            pending = self._pending
+            if pending is None or recipe_id not in pending[2]:
+                self._counters["misses"] += 1
+                return None, None
+            return None, pending[1]
+
+    def _take_after_wait(self, recipe_id: int) -> Optional[RecipeDetail]:
+        with self._lock:
+            details = self._take(recipe_id)
+            if details is not None:
+                self._counters["waited"] += 1
+                return details
+            self._counters["misses"] += 1
+            return None
+
+    def _take(self, recipe_id: int) -> Optional[RecipeDetail]:
+        entry = self._store.get(recipe_id)
+        if entry is None:
+            return None
+        if not entry["used"]:
+            entry["used"] = True
+            self._counters["used"] += 1
+        else:
+            self._counters["reused"] += 1
+        self._store.move_to_end(recipe_id)
+        return entry["details"]
+
+    def _cancel_pending(self):
+        if self._pending is None:
+            return
+        _, future, recipe_ids = self._pending
+        if future.cancel():
+            self._counters["cancelled"] += len(recipe_ids)
+        self._pending = None
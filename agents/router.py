@@ -0,0 +1,152 @@
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, NamedTuple, Optional
+
+class Route(NamedTuple):
+    tool: str
+    argument: str
+
+class IntentRouter:
+    """Routes requests with an obvious intent straight to a tool, skipping the LLM"""
+
+    _BARE_ID = re.compile(r'^\s*(?:recipe\s*)?(?:id\s*)?#?\s*(\d{3,9})\s*[.!]*\s*$', re.IGNORECASE)
+    _RECIPE_ID = re.compile(r'\brecipe\s*(?:id\s*)?(?:#|no\.?|number)?\s*:?\s*(\d{3,9})\b', re.IGNORECASE)
+    _RECIPE_ID_LIST = re.compile(
+        r'\brecipes?\s*(?:ids?\s*)?:?\s*#?\d{3,9}(?:\s*(?:,|&|\band\b|,\s*and\b)\s*#?\d{3,9})+\b', re.IGNORECASE
+    )
+    _ANY_ID = re.compile(r'\b\d{3,9}\b')
+    _DETAIL_WORDS = re.compile(
+        r'\b(instructions?|details?|steps?|directions?|full|complete|show|give|get|tell|make|cook)\b',
+        re.IGNORECASE
+    )
+    _OPEN_ENDED = re.compile(
+        r'\b(substitut\w*|instead|replace|swap|without|why|compare|difference|versus|vs|healthier|'
+        r'calories|nutrition|pair\w*|wine|scale|double|halve|convert|version|allerg\w*)\b',
+        re.IGNORECASE
+    )
+
+    _LIST_LEAD_IN = re.compile(
+        r"^\s*(?:i\s+have|i've\s+got|i\s+got|got|have|ingredients)\s*:?\s*", re.IGNORECASE
+    )
+    _LIST_CHARS = re.compile(r"^[a-z0-9\s,.'\-&/\n\r]+$", re.IGNORECASE)
+    _LIST_SEPARATORS = re.compile(r'[,\n\r]+')
+    _LIST_AND = re.compile(r'\s+(?:and|&)\s+', re.IGNORECASE)
+    _NON_INGREDIENT_WORDS = re.compile(
+        r'\b(what|which|how|why|when|where|who|can|could|should|would|recipe|recipes|make|cook|'
+        r'suggest|recommend|please|help|want|need|me|you|my|i|is|are|do|does)\b',
+        re.IGNORECASE
+    )
+    # Chat replies like "ok, thanks" or "no onions, garlic" split into list-shaped text too
+    _CONVERSATIONAL = re.compile(
+        r"\b(ok|okay|thanks?|thank|cheers|yes|yeah|yep|nope|no|not|without|sure|cool|great|good|nice|"
+        r"hi|hello|hey|bye|hmm+|sounds?|maybe|first|second|third|fourth|fifth|last|next|"
+        r"it|this|that|these|those|them|they|one|ones|there|here|we|us)\b",
+        re.IGNORECASE
+    )
+    _MAX_WORDS_PER_ITEM = 4
+
+    # "What can I make with ..." style wrappers around an ingredient list
+    _REQUEST_LEAD_IN = re.compile(
+        r"^\s*(?:(?:what|which)\s+(?:can|could|should)\s+i\s+(?:make|cook)|(?:any\s+)?(?:recipes?|ideas|meals?|dishes)|"
+        r"(?:please\s+)?(?:suggest|find|show)\s+(?:me\s+)?(?:some\s+)?(?:recipes?|meals?|dishes|something))"
+        r"\s+(?:with|using|from|for)\s+",
+        re.IGNORECASE
+    )
+    # "Plan my week with ...", "5-day meal plan using ...": the planner tool takes the whole request
+    _PLAN_REQUEST = re.compile(
+        r'\b(?:meal\s*plan|plan\s+(?:my\s+|the\s+|a\s+)?(?:week|meals|\d{1,2}\s*days?)|weekly\s+(?:plan|meals|menu)|'
+        r'\d{1,2}\s*-?\s*days?\s+(?:of\s+)?(?:plan|meals|menu))\b',
+        re.IGNORECASE
+    )
+    _PLAN_PANTRY = re.compile(r'\b(?:with|using|from)\b|:', re.IGNORECASE)
+
+    # Words that tie a request to earlier turns, so its answer can't be reused elsewhere
+    _CONTEXT_WORDS = re.compile(
+        r'\b(instead|other|another|again|more|else|different|same|that|those|it|them|ones?|previous|'
+        r'first|second|third|last|also|too|but|without|not|no)\b',
+        re.IGNORECASE
+    )
+
+    def __init__(self, ingredient_parser):
+        self.ingredient_parser = ingredient_parser
+        self._counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def route(self, user_input: str) -> Optional[Route]:
+        """Return a direct tool route, or None when the LLM agent should handle it"""
+        text = user_input.strip()
+        route = self._match_recipe_details(text) or self._match_plan_request(text) or self._match_ingredient_list(text)
+
+        with self._lock:
+            if route is None:
+                self._counters["llm"] += 1
+            else:
+                self._counters["fast_path"] += 1
+                self._counters[f"fast_path.{route.tool}"] += 1
+        return route
+
+    def ingredient_request(self, user_input: str) -> Optional[str]:
+        """The ingredient list of a self-contained "recipes with X, Y" request, else None"""
+        text = self._REQUEST_LEAD_IN.sub('', user_input.strip()).strip().rstrip('?')
+        if self._CONTEXT_WORDS.search(text) or self._PLAN_REQUEST.search(text):
+            return None
+        route = self._match_ingredient_list(text)
+        return route.argument if route is not None else None
+
+    def stats(self) -> Dict[str, float]:
+        """How many requests took the fast path versus the LLM agent"""
+        with self._lock:
+            report = dict(self._counters)
+        total = report.get("fast_path", 0) + report.get("llm", 0)
+        report["fast_path_rate"] = report.get("fast_path", 0) / total if total else 0.0
+        return report
+
+    def _match_recipe_details(self, text: str) -> Optional[Route]:
+        bare = self._BARE_ID.match(text)
+        if bare:
+            return Route("get_recipe_details", bare.group(1))
+
+        if self._OPEN_ENDED.search(text) or not self._DETAIL_WORDS.search(text):
+            return None
+        # "Recipes 123, 456 and 789": the details tool fetches them together
+        listed = self._RECIPE_ID_LIST.search(text)
+        if listed:
+            recipe_ids = self._ANY_ID.findall(listed.group(0))
+            if len(recipe_ids) == len(self._ANY_ID.findall(text)):
+                return Route("get_recipe_details", ", ".join(recipe_ids))
+            return None
+
+        match = self._RECIPE_ID.search(text)
+        if not match or len(self._ANY_ID.findall(text)) != 1:
+            return None
+        return Route("get_recipe_details", match.group(1))
+
+    def _match_plan_request(self, text: str) -> Optional[Route]:
+        if not self._PLAN_REQUEST.search(text) or self._OPEN_ENDED.search(text):
+            return None
+        parts = self._PLAN_PANTRY.split(text)
+        if len(parts) < 2 or not self.ingredient_parser.parse_ingredients(parts[-1].strip().rstrip('.!?')):
+            return None
+        return Route("plan_week", text)
+
+    def _match_ingredient_list(self, text: str) -> Optional[Route]:
+        if self._PLAN_REQUEST.search(text):
+            return None
+        text = self._LIST_LEAD_IN.sub('', text).strip().rstrip('.!')
+        text = self._LIST_AND.sub(', ', text)
+        if not text or not self._LIST_CHARS.match(text) or not self._LIST_SEPARATORS.search(text):
+            return None
+        if self._NON_INGREDIENT_WORDS.search(text) or self._CONVERSATIONAL.search(text):
+            return None
+
+        items = [item.strip() for item in self._LIST_SEPARATORS.split(text) if item.strip()]
+        if any(len(item.split()) > self._MAX_WORDS_PER_ITEM for item in items):
+            return None
+        # Most items must be known ingredients; anything else is left to the LLM
+        known = sum(1 for item in items if self.ingredient_parser.in_vocabulary(item))
+        if known * 2 <= len(items):
+            return None
+        if not self.ingredient_parser.parse_ingredients(text):
+            return None
+        return Route("search_recipes", text)
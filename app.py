@@ -1,6 +1,11 @@
 import streamlit as st
-from agents.meal_plan_agent import MealPlanningAgent
+from agents.agent_pool import AgentPool
+from config.settings import settings
+from utils.async_runner import BackgroundLoop
+from utils.startup import startup
+from utils.tracing import tracer
 import os
+import uuid
 
 # Page configuration
 st.set_page_config(
@@ -9,21 +14,67 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize the agent
+# One pool per process; each browser session gets its own agent. Building it is cheap: LangChain,
+# Groq and Chroma load in the optional warm-up thread or on the first message, not before first render.
 @st.cache_resource
+def load_agent_pool():
+    pool = AgentPool()
+    if settings.AGENT_POOL_WARM_UP:
+        pool.warm_up()
+    return pool
+
+# One event loop per process: non-streamed turns run on it as coroutines, so a single worker thread
+# keeps many conversations' Spoonacular and Groq calls in flight while each script waits for its own
+@st.cache_resource
+def load_event_loop():
+    return BackgroundLoop()
+
 def load_agent():
-    return MealPlanningAgent()
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return load_agent_pool().get(st.session_state.session_id)
+
+def render_debug_panel(agent):
+    """Per-stage timings of this session's last request plus process-wide metrics"""
+    with st.expander("🔍 Debug: last request trace", expanded=True):
+        traces = tracer.recent_traces(session_id=agent.session_id)
+        if not traces:
+            st.caption("No requests traced yet.")
+        else:
+            last = traces[-1]
+            st.markdown(f"**Path:** {last['attributes'].get('path', 'n/a')} | **Total:** {last['duration_ms']:.0f} ms | **Trace:** `{last['trace_id']}`")
+            if last["error"]:
+                st.error(last["error"])
+            st.table([
+                {
+                    "stage": span["name"],
+                    "detail": span["attributes"].get("tool") or span["attributes"].get("endpoint") or "",
+                    "start_ms": span["offset_ms"],
+                    "duration_ms": span["duration_ms"],
+                    "tokens": f"{span['attributes']['prompt_tokens']}+{span['attributes']['completion_tokens']}"
+                              if "prompt_tokens" in span["attributes"] else "",
+                    "error": span["error"] or ""
+                }
+                for span in sorted(last["spans"], key=lambda span: span["offset_ms"])
+            ])
+    
+    with st.expander("📈 Debug: metrics"):
+        st.json({
+            "routing": agent.routing_stats(),
+            "answer_cache": agent.answer_cache_stats(),
+            "prefetch": agent.prefetch_stats(),
+            "spoonacular": agent.agent_tools.recipe_service.limiter_stats(),
+            "recent_turns": agent.usage_stats()[-5:],
+            "startup": startup.report()
+        })
+        st.code(tracer.metrics.render(), language="text")
 
 def main():
     st.title("🍳 AI Meal Planning Agent")
     st.markdown("Tell me what ingredients you have, and I'll suggest delicious recipes!")
     
-    # Load agent
-    try:
-        agent = load_agent()
-    except Exception as e:
-        st.error("Failed to initialize the AI agent. Please check your API keys in the .env file.")
-        st.stop()
+    # Start the pool (and its warm-up) now; the session's agent is fetched when first needed
+    load_agent_pool()
     
     # Sidebar for user preferences
     with st.sidebar:
@@ -39,7 +90,11 @@ def main():
             value="Intermediate"
         )
         
-        prep_time = st.slider("Max Prep Time (minutes)", 10, 120, 30)
+        # The top of the range means "any time", so retrieval stays unfiltered until the user narrows it
+        prep_time = st.slider("Max Prep Time (minutes)", 10, 120, 120, help="120 means no limit")
+        
+        stream_responses = st.toggle("Stream responses", value=True)
+        show_debug = st.toggle("Debug panel", value=False)
     
     # Initialize chat history
     if "messages" not in st.session_state:
@@ -61,27 +116,49 @@ def main():
         
         # Generate assistant response
         with st.chat_message("assistant"):
-            with st.spinner("Finding recipes for you..."):
-                try:
-                    # Add context from sidebar
-                    context = f"User preferences: Dietary restrictions: {', '.join(dietary_restrictions) if dietary_restrictions else 'None'}, "
-                    context += f"Cooking skill: {cooking_skill}, Max prep time: {prep_time} minutes. "
-                    
-                    full_prompt = context + prompt
-                    response = agent.chat(full_prompt)
+            try:
+                agent = load_agent()
+            except Exception as e:
+                st.error("Failed to initialize the AI agent. Please check your API keys in the .env file.")
+                st.stop()
+            
+            try:
+                # Sidebar settings filter retrieval instead of padding the prompt
+                preferences = {
+                    "dietary_restrictions": dietary_restrictions,
+                    "cooking_skill": cooking_skill,
+                    "max_ready_time": prep_time if prep_time < 120 else None
+                }
+                
+                if stream_responses:
+                    # Render final-answer tokens in the bubble as they arrive
+                    response = st.write_stream(agent.chat_stream(prompt, preferences))
+                else:
+                    with st.spinner("Finding recipes for you..."):
+                        if settings.ASYNC_CHAT:
+                            response = load_event_loop().run(
+                                agent.achat(prompt, preferences), timeout=settings.ASYNC_CHAT_TIMEOUT
+                            )
+                        else:
+                            response = agent.chat(prompt, preferences)
                     st.markdown(response)
-                    
-                    # Add assistant response to chat history
-                    st.session_state.messages.append({"role": "assistant", "content": response})
-                    
-                except Exception as e:
-                    error_msg = "I'm having trouble right now. Please make sure your API keys are configured correctly."
-                    st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                
+                # Add assistant response to chat history
+                st.session_state.messages.append({"role": "assistant", "content": response})
+                startup.mark("first_answer")
+                
+            except Exception as e:
+                error_msg = "I'm having trouble right now. Please make sure your API keys are configured correctly."
+                st.error(error_msg)
+                st.session_state.messages.append({"role": "assistant", "content": error_msg})
+    
+    if show_debug:
+        render_debug_panel(load_agent())
     
     # Footer
     st.markdown("---")
     st.markdown("💡 **Tip**: List your ingredients like 'chicken, rice, onions, tomatoes' for best results!")
+    startup.mark("first_render")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
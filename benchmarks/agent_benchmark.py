@@ -0,0 +1,317 @@
+"""End-to-end load test of MealPlanningAgent.chat/achat and the agent tools against local stand-ins.
+
+A fake Spoonacular server and a scripted ReAct chat model replace the network, so runs are
+repeatable offline. Reports throughput plus p50/p95/p99 per stage from the request traces.
+Every mode runs `concurrency` conversations, each with its own agent or tools; achat keeps them all
+on a single event loop thread. Detail lookups ask for a recipe the conversation's last search returned,
+as a user picking a result would, so the prefetcher's use rate is meaningful.
+
+Usage: python -m benchmarks.agent_benchmark [--requests 200] [--concurrency 8] [--mode both|all|achat]
+       [--latency-ms 80] [--jitter-ms 40] [--rate-limit 0.02] [--llm-latency-ms 300] [--quota-points 150]
+       [--fixtures fixtures.jsonl] [--output results.json] [--baseline previous.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, List
+from benchmarks.common import INGREDIENTS, summarize, write_results
+from benchmarks.fake_chat_model import ScriptedReActChatModel
+from benchmarks.fake_spoonacular import FakeSpoonacular
+from config.settings import settings
+from utils.tracing import tracer
+
+def workload(count: int, sessions: int, seed: int = 5) -> List[Dict]:
+    """Mix of plain ingredient lists (fast path), open questions (LLM loop) and detail lookups
+
+    Job i belongs to conversation i % sessions. A detail lookup names which of the top search
+    results to open; the recipe id is only known once that conversation's earlier search ran.
+    """
+    rng = random.Random(seed)
+    jobs, searched = [], set()
+    for i in range(count):
+        session = i % sessions
+        kind = rng.choices(["list", "question", "details"], weights=[4, 4, 2])[0]
+        if kind == "details" and session not in searched:
+            kind = "list"
+        ingredients = rng.sample(INGREDIENTS, rng.randint(2, 5))
+        job = {"kind": kind, "session": session, "ingredients": ", ".join(ingredients)}
+        if kind == "list":
+            job["text"] = ", ".join(ingredients)
+            searched.add(session)
+        elif kind == "question":
+            job["text"] = f"What could I cook tonight with {' and '.join(ingredients)} for my family?"
+        else:
+            job["pick"] = rng.randrange(settings.PREFETCH_TOP_N)
+        jobs.append(job)
+    return jobs
+
+def job_text(job: Dict, tools) -> str:
+    """The job's message; detail lookups open a result of the conversation's last search"""
+    if job["kind"] != "details":
+        return job["text"]
+    recipe_ids = [recipe.get("id") for recipe in tools.current_recipes if recipe.get("id") is not None]
+    recipe_id = recipe_ids[job["pick"] % len(recipe_ids)] if recipe_ids else 1000 + job["pick"]
+    return f"Show me the full instructions for recipe {recipe_id}"
+
+class Stack:
+    """Shared services wired to the fake endpoints; agents and tools are built per conversation"""
+
+    def __init__(self, base_url: str, workdir: str, llm_latency: float, quota_points: float = None):
+        from database.embedding_cache import EmbeddingCache
+        from database.local_recipe_engine import LocalRecipeEngine
+        from database.vector_db import VectorDB
+        from services.quota import QuotaLimiter
+        from services.recipe_cache import RecipeCache
+        from services.recipe_service import RecipeService
+        from utils.ingreadient_parser import IngredientParser
+
+        self.llm_latency = llm_latency
+        self.recipe_service = RecipeService(
+            cache=RecipeCache(path=os.path.join(workdir, "recipe_cache.sqlite3")),
+            base_url=base_url,
+            api_key="benchmark",
+            # Only the daily budget is modelled; the per-second rate would just measure the limiter
+            quota=QuotaLimiter(daily_points=quota_points or 1e9, points_per_second=1e6, burst_points=1e6)
+        )
+        self.ingredient_parser = IngredientParser()
+        self.local_engine = LocalRecipeEngine(
+            corpus_path=os.path.join(workdir, "recipe_corpus.jsonl"), ingredient_parser=self.ingredient_parser
+        )
+        self.vector_db = VectorDB(
+            os.path.join(workdir, "chroma"), EmbeddingCache(os.path.join(workdir, "embedding_cache"))
+        )
+        self.llm_limiter = threading.BoundedSemaphore(settings.MAX_CONCURRENT_LLM_CALLS)
+        self._all_tools = []
+        self._tools_lock = threading.Lock()
+
+    def new_tools(self):
+        from agents.agent_tool import AgentTools
+
+        tools = AgentTools(
+            recipe_service=self.recipe_service,
+            vector_db=self.vector_db,
+            ingredient_parser=self.ingredient_parser,
+            local_engine=self.local_engine
+        )
+        with self._tools_lock:
+            self._all_tools.append(tools)
+        return tools
+
+    def prefetch_stats(self) -> Dict[str, float]:
+        """Prefetcher counters summed over every worker's or conversation's tools"""
+        report = defaultdict(int)
+        with self._tools_lock:
+            for tools in self._all_tools:
+                for name, count in tools.prefetcher.stats().items():
+                    if name != "use_rate":
+                        report[name] += count
+        settled = report["used"] + report["wasted"]
+        return {**report, "use_rate": round(report["used"] / settled, 3) if settled else 0.0}
+
+    def new_agent(self, tools=None):
+        from agents.meal_plan_agent import MealPlanningAgent
+        from services.groq_service import GroqService
+
+        return MealPlanningAgent(
+            groq_service=GroqService(llm=ScriptedReActChatModel(latency=self.llm_latency)),
+            agent_tools=tools or self.new_tools(),
+            llm_limiter=self.llm_limiter
+        )
+
+def run_jobs(jobs: List[Dict], concurrency: int, handle: Callable[[int, Dict], bool]) -> Dict:
+    """Each of `concurrency` conversations runs its jobs in order on its own thread"""
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def conversation(slot: int):
+        nonlocal errors
+        for job in jobs[slot::concurrency]:
+            started = time.perf_counter()
+            try:
+                ok = handle(slot, job)
+            except Exception as e:
+                print(f"Error in benchmark job: {e}")
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                errors += 0 if ok else 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(conversation, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(jobs),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(jobs) / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "latency": summarize(latencies)
+    }
+
+def run_async_jobs(jobs: List[Dict], concurrency: int, handle: Callable[[int, Dict], Awaitable[bool]],
+                   cleanup: Callable[[], Awaitable[None]] = None) -> Dict:
+    """Like run_jobs, but each of `concurrency` conversations is a task on one event loop"""
+    latencies, errors = [], 0
+
+    async def conversation(slot: int):
+        nonlocal errors
+        for job in jobs[slot::concurrency]:
+            started = time.perf_counter()
+            try:
+                ok = await handle(slot, job)
+            except Exception as e:
+                print(f"Error in benchmark job: {e}")
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += 0 if ok else 1
+
+    async def main():
+        await asyncio.gather(*(conversation(slot) for slot in range(concurrency)))
+        if cleanup is not None:
+            await cleanup()
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(jobs),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(jobs) / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "latency": summarize(latencies)
+    }
+
+def stage_latencies(trace_path: str) -> Dict[str, Dict[str, float]]:
+    """p50/p95/p99 per request path and per span name (with tool/endpoint) from exported traces"""
+    durations = defaultdict(list)
+    if not os.path.exists(trace_path):
+        return {}
+    with open(trace_path, encoding="utf-8") as traces:
+        for line in traces:
+            trace = json.loads(line)
+            durations[f"request.{trace['attributes'].get('path', trace['name'])}"].append(trace["duration_ms"] / 1000)
+            for span in trace["spans"]:
+                detail = span["attributes"].get("tool") or span["attributes"].get("endpoint")
+                durations[f"{span['name']}.{detail}" if detail else span["name"]].append(span["duration_ms"] / 1000)
+    return {stage: summarize(values) for stage, values in sorted(durations.items())}
+
+def run_mode(mode: str, jobs: List[Dict], concurrency: int, base_url: str, llm_latency: float,
+             quota_points: float = None) -> Dict:
+    workdir = tempfile.mkdtemp(prefix=f"agent-benchmark-{mode}-")
+    tracer.export_path = os.path.join(workdir, "traces.jsonl")
+    stack = Stack(base_url, workdir, llm_latency, quota_points)
+
+    if mode == "achat":
+        # One agent per conversation; all of them share the event loop thread
+        agents = [stack.new_agent() for _ in range(concurrency)]
+
+        async def ahandle(slot, job):
+            agent = agents[slot]
+            return await agent.achat(job_text(job, agent.agent_tools)) != agent.ERROR_MESSAGE
+
+        result = run_async_jobs(jobs, concurrency, ahandle, cleanup=stack.recipe_service.http.aclose)
+    elif mode == "chat":
+        agents = [stack.new_agent() for _ in range(concurrency)]
+
+        def handle(slot, job):
+            agent = agents[slot]
+            return agent.chat(job_text(job, agent.agent_tools)) != agent.ERROR_MESSAGE
+
+        result = run_jobs(jobs, concurrency, handle)
+    else:
+        all_tools = [stack.new_tools() for _ in range(concurrency)]
+
+        def handle(slot, job):
+            tools = all_tools[slot]
+            with tracer.trace("tools", path=job["kind"]):
+                if job["kind"] == "details":
+                    return bool(tools.get_recipe_details_tool(job_text(job, tools).rsplit(" ", 1)[-1]))
+                return bool(tools.search_recipes_tool(job["ingredients"]))
+
+        result = run_jobs(jobs, concurrency, handle)
+    result["stages"] = stage_latencies(tracer.export_path)
+    result["recipe_cache"] = stack.recipe_service.cache_stats()
+    result["limiter"] = stack.recipe_service.limiter_stats()
+    result["prefetch"] = stack.prefetch_stats()
+    return result
+
+def compare(results: Dict, baseline: Dict) -> Dict[str, Dict[str, float]]:
+    """Ratio of current to baseline p95 per mode and stage; above 1.0 is slower"""
+    comparison = {}
+    for mode, current in results["modes"].items():
+        previous = baseline.get("modes", {}).get(mode)
+        if not previous:
+            continue
+        stages = {"overall": (current["latency"], previous["latency"])}
+        stages.update(
+            (stage, (summary, previous["stages"][stage]))
+            for stage, summary in current["stages"].items() if stage in previous.get("stages", {})
+        )
+        comparison[mode] = {
+            stage: round(now["p95_ms"] / before["p95_ms"], 3)
+            for stage, (now, before) in stages.items() if before["p95_ms"]
+        }
+        comparison[mode]["throughput"] = round(
+            current["throughput_rps"] / previous["throughput_rps"], 3
+        ) if previous["throughput_rps"] else 0.0
+    return comparison
+
+def run(args) -> Dict:
+    # Keep the agent loop quiet; its stdout trace would dominate the run
+    settings.AGENT_VERBOSE = False
+    server = FakeSpoonacular(
+        latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+        rate_limit=args.rate_limit, fixtures_path=args.fixtures, daily_points=args.quota_points
+    ).start()
+    jobs = workload(args.requests, args.concurrency, seed=args.seed)
+    modes = {"both": ["chat", "tools"], "all": ["chat", "achat", "tools"]}.get(args.mode, [args.mode])
+
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "modes": {}
+    }
+    try:
+        for mode in modes:
+            results["modes"][mode] = run_mode(
+                mode, jobs, args.concurrency, server.base_url, args.llm_latency_ms / 1000, args.quota_points
+            )
+    finally:
+        server.stop()
+    results["fake_spoonacular"] = server.stats()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            results["comparison"] = compare(results, json.load(baseline))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end agent benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mode", choices=["chat", "achat", "tools", "both", "all"], default="both")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="Fake Spoonacular latency")
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--rate-limit", type=float, default=0.02, help="Fraction of API calls answered with 429")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="Scripted model latency per call")
+    parser.add_argument("--quota-points", type=float, help="Daily Spoonacular points (default unlimited)")
+    parser.add_argument("--fixtures", help="Recorded Spoonacular responses (see benchmarks.fake_spoonacular)")
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare p95s and throughput against")
+    args = parser.parse_args()
+
+    write_results(run(args), args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import json
+import math
+from typing import Dict, List
+
+INGREDIENTS = [
+    "chicken", "rice", "onion", "garlic", "tomato", "egg", "milk", "butter", "flour", "cheese",
+    "spinach", "mushroom", "potato", "carrot", "bell pepper", "beef", "pork", "salmon", "lemon",
+    "basil", "cilantro", "ginger", "soy sauce", "black bean", "corn", "zucchini", "broccoli", "tofu"
+]
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0
+    }
+
+def write_results(results: Dict, path: str = None):
+    text = json.dumps(results, indent=2)
+    print(text)
+    if path:
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
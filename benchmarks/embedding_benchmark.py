@@ -0,0 +1,84 @@
+"""Ingest and query benchmark for VectorDB with and without the embedding cache.
+
+Usage: python -m benchmarks.embedding_benchmark [--recipes 2000] [--queries 300] [--corpus recipes.jsonl] [--output results.json]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from benchmarks.common import INGREDIENTS, summarize, write_results
+from database.embedding_cache import EmbeddingCache, default_embedding_function
+from database.vector_db import VectorDB
+
+def synthetic_recipes(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    for recipe_id in range(1, count + 1):
+        ingredients = rng.sample(INGREDIENTS, rng.randint(4, 10))
+        yield {
+            "id": recipe_id,
+            "title": f"{ingredients[0].title()} and {ingredients[1]} bake #{recipe_id}",
+            "ingredients": ingredients
+        }
+
+def load_recipes(path: str, limit: int):
+    with open(path, encoding="utf-8") as corpus:
+        recipes = [json.loads(line) for line in corpus if line.strip()]
+    return recipes[:limit]
+
+def time_queries(search, queries):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+def run(recipe_count: int, query_count: int, corpus: str = None):
+    recipes = load_recipes(corpus, recipe_count) if corpus else list(synthetic_recipes(recipe_count))
+    embedding_function = default_embedding_function()
+    workdir = tempfile.mkdtemp(prefix="embedding-benchmark-")
+    cache_dir = os.path.join(workdir, "embedding_cache")
+    results = {"recipes": len(recipes), "queries": query_count}
+
+    # Cold ingest: every document is embedded
+    cold_db = VectorDB(os.path.join(workdir, "chroma_cold"), EmbeddingCache(cache_dir, embedding_function))
+    started = time.perf_counter()
+    cold_db.add_recipes(recipes)
+    elapsed = time.perf_counter() - started
+    results["ingest_cold"] = {"seconds": round(elapsed, 3), "embeddings_per_second": round(len(recipes) / elapsed, 1)}
+
+    # Warm ingest: a fresh process would reopen the persisted memmap
+    warm_db = VectorDB(os.path.join(workdir, "chroma_warm"), EmbeddingCache(cache_dir, embedding_function))
+    started = time.perf_counter()
+    warm_db.add_recipes(recipes)
+    elapsed = time.perf_counter() - started
+    results["ingest_warm"] = {"seconds": round(elapsed, 3), "embeddings_per_second": round(len(recipes) / elapsed, 1)}
+
+    # Queries drawn from a small hot set, as in real traffic
+    rng = random.Random(11)
+    hot_set = [", ".join(rng.sample(INGREDIENTS, 3)) for _ in range(max(1, query_count // 10))]
+    queries = [rng.choice(hot_set) for _ in range(query_count)]
+
+    results["query_without_cache"] = time_queries(
+        lambda query: warm_db.collection.query(query_texts=[query], n_results=5), queries
+    )
+    results["query_with_cache"] = time_queries(
+        lambda query: warm_db.search_similar_recipes(query, n_results=5), queries
+    )
+    results["embedding_cache"] = warm_db.embedding_cache.stats()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VectorDB ingest and query with the embedding cache")
+    parser.add_argument("--recipes", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--corpus", help="Optional JSONL recipe dump instead of synthetic recipes")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    write_results(run(args.recipes, args.queries, args.corpus), args.output)
+
+if __name__ == "__main__":
+    main()
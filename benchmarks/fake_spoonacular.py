@@ -0,0 +1,297 @@
+"""Local stand-in for the Spoonacular recipes API with configurable latency and 429 injection.
+
+Serves findByIngredients, complexSearch, informationBulk and /{id}/information from recorded
+fixtures when they match, otherwise from deterministic synthetic recipes. With --record-from it
+proxies misses to a real endpoint and appends the responses to the fixtures file. With
+--daily-points it charges points per request like Spoonacular and answers 402 once they run out.
+
+Usage: python -m benchmarks.fake_spoonacular [--port 8089] [--latency-ms 80] [--jitter-ms 40]
+       [--rate-limit 0.05] [--daily-points 150] [--fixtures fixtures.jsonl]
+       [--record-from https://api.spoonacular.com/recipes]
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+from benchmarks.common import INGREDIENTS
+
+_DETAILS_PATH = re.compile(r"^/recipes/(\d+)/information$")
+
+class FakeSpoonacular:
+    """Threaded HTTP server answering like Spoonacular's /recipes endpoints"""
+
+    def __init__(self, port: int = 0, latency: float = 0.0, jitter: float = 0.0, rate_limit: float = 0.0,
+                 fixtures_path: str = None, record_from: str = None, seed: int = 11, daily_points: float = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit  # Fraction of requests answered with 429
+        self.daily_points = daily_points  # None never runs out
+        self.points_used = 0.0
+        self.fixtures_path = fixtures_path
+        self.record_from = record_from.rstrip("/") if record_from else None
+        self.fixtures = self._load_fixtures(fixtures_path)
+
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._record_lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/recipes"
+
+    def start(self) -> "FakeSpoonacular":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-spoonacular", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+    def respond(self, path: str, params: Dict[str, str]):
+        """(status, headers, body) for one request"""
+        with self._rng_lock:
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            throttled = self._rng.random() < self.rate_limit
+        time.sleep(delay)
+
+        endpoint, key = self._route(path, params)
+        self._counters[f"requests.{endpoint}"] += 1
+        if throttled:
+            self._counters["rate_limited"] += 1
+            return 429, {"Retry-After": "0"}, {"status": "failure", "code": 429, "message": "Too many requests"}
+        if endpoint == "unknown":
+            return 404, {}, {"status": "failure", "code": 404}
+        with self._rng_lock:
+            if self.daily_points is not None and self.points_used >= self.daily_points:
+                self._counters["quota_exhausted"] += 1
+                return 402, self._quota_headers(0.0), {"status": "failure", "code": 402, "message": "Daily points limit"}
+            points = self._points(endpoint, key, params)
+            self.points_used += points
+
+        body = self.fixtures.get((endpoint, key))
+        if body is not None:
+            self._counters["fixture_hits"] += 1
+        elif self.record_from:
+            body = self._record(path, params, endpoint, key)
+        if body is None:
+            body = self._synthetic(endpoint, key, params)
+        return 200, self._quota_headers(points), body
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                status, headers, body = fake.respond(url.path, params)
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @staticmethod
+    def _route(path: str, params: Dict[str, str]):
+        """Endpoint name and an order-independent fixture key"""
+        path = path.rstrip("/")
+        if path.endswith("/findByIngredients"):
+            return "findByIngredients", FakeSpoonacular._ingredient_key(params.get("ingredients", ""))
+        if path.endswith("/complexSearch"):
+            return "complexSearch", FakeSpoonacular._ingredient_key(params.get("includeIngredients", ""))
+        if path.endswith("/informationBulk"):
+            return "informationBulk", ",".join(sorted(params.get("ids", "").split(",")))
+        match = _DETAILS_PATH.search(path)
+        if match:
+            return "information", match.group(1)
+        return "unknown", path
+
+    @staticmethod
+    def _ingredient_key(ingredients: str) -> str:
+        return ",".join(sorted({name.strip().lower() for name in ingredients.split(",") if name.strip()}))
+
+    def _quota_headers(self, points: float) -> Dict[str, str]:
+        # Same header names Spoonacular uses; without daily_points the quota never runs out
+        if self.daily_points is None:
+            return {"X-API-Quota-Request": "1", "X-API-Quota-Used": "0", "X-API-Quota-Left": "10000"}
+        return {
+            "X-API-Quota-Request": f"{points:g}",
+            "X-API-Quota-Used": f"{self.points_used:g}",
+            "X-API-Quota-Left": f"{max(0.0, self.daily_points - self.points_used):g}"
+        }
+
+    @staticmethod
+    def _points(endpoint: str, key: str, params: Dict[str, str]) -> float:
+        """Roughly Spoonacular's pricing: a base point per call plus a fraction per recipe"""
+        number = int(params.get("number", 10))
+        if endpoint == "findByIngredients":
+            return 1 + 0.01 * number
+        if endpoint == "complexSearch":
+            return 1 + 0.06 * number
+        if endpoint == "informationBulk":
+            return 0.5 + 0.5 * len(key.split(","))
+        return 1.0
+
+    def _synthetic(self, endpoint: str, key: str, params: Dict[str, str]):
+        number = int(params.get("number", 10))
+        if endpoint == "findByIngredients":
+            return [self._summary(recipe_id, key.split(",")) for recipe_id in self._ids_for(key, number)]
+        if endpoint == "complexSearch":
+            results = [
+                {**self._details(recipe_id), **self._summary(recipe_id, key.split(","))}
+                for recipe_id in self._ids_for(key, number)
+            ]
+            return {"results": results, "offset": 0, "number": number, "totalResults": len(results)}
+        nutrition = params.get("includeNutrition", "false").lower() == "true"
+        if endpoint == "informationBulk":
+            return [
+                self._details(int(recipe_id), nutrition) for recipe_id in key.split(",") if recipe_id.isdigit()
+            ]
+        return self._details(int(key), nutrition)
+
+    @staticmethod
+    def _ids_for(key: str, number: int) -> List[int]:
+        base = zlib.crc32(key.encode("utf-8")) % 900000 + 1000
+        return [base + i for i in range(number)]
+
+    @staticmethod
+    def _recipe_ingredients(recipe_id: int) -> List[str]:
+        rng = random.Random(recipe_id)
+        return rng.sample(INGREDIENTS, rng.randint(5, 9))
+
+    def _summary(self, recipe_id: int, query: List[str]) -> Dict:
+        ingredients = self._recipe_ingredients(recipe_id)
+        used = [name for name in query if name][:2] or ingredients[:1]
+        missed = [name for name in ingredients if name not in used]
+        return {
+            "id": recipe_id,
+            "title": f"{used[0].title()} Skillet #{recipe_id}",
+            "image": f"https://img.example/{recipe_id}.jpg",
+            "usedIngredientCount": len(used),
+            "missedIngredientCount": len(missed),
+            "usedIngredients": [{"name": name} for name in used],
+            "missedIngredients": [{"name": name} for name in missed],
+            "unusedIngredients": []
+        }
+
+    def _details(self, recipe_id: int, nutrition: bool = False) -> Dict:
+        rng = random.Random(recipe_id)
+        ingredients = self._recipe_ingredients(recipe_id)
+        details = {
+            "id": recipe_id,
+            "title": f"{ingredients[0].title()} Skillet #{recipe_id}",
+            "image": f"https://img.example/{recipe_id}.jpg",
+            "readyInMinutes": rng.choice([15, 20, 30, 45, 60]),
+            "servings": rng.choice([2, 4, 6]),
+            "vegetarian": rng.random() < 0.3,
+            "vegan": rng.random() < 0.1,
+            "glutenFree": rng.random() < 0.4,
+            "dairyFree": rng.random() < 0.4,
+            "summary": f"A <b>simple</b> weeknight dish built around <a href='#'>{ingredients[0]}</a>.",
+            "extendedIngredients": [
+                {"name": name, "amount": rng.choice([0.5, 1, 2, 3]), "unit": rng.choice(["cup", "tbsp", "g", ""])}
+                for name in ingredients
+            ],
+            "analyzedInstructions": [{"steps": [
+                {"number": i, "step": f"Step {i}: prepare the {name} and add it to the pan."}
+                for i, name in enumerate(ingredients, 1)
+            ]}]
+        }
+        if nutrition:
+            # Roughly the size of Spoonacular's block: per-nutrient totals plus per-ingredient breakdowns
+            nutrients = [
+                {"name": f"Nutrient {i}", "amount": round(rng.uniform(0, 500), 2), "unit": "g",
+                 "percentOfDailyNeeds": round(rng.uniform(0, 100), 2)}
+                for i in range(30)
+            ]
+            details["nutrition"] = {
+                "nutrients": nutrients,
+                "ingredients": [{"name": name, "nutrients": nutrients[:12]} for name in ingredients],
+                "caloricBreakdown": {"percentProtein": 20.1, "percentFat": 35.2, "percentCarbs": 44.7}
+            }
+        return details
+
+    def _record(self, path: str, params: Dict[str, str], endpoint: str, key: str):
+        """Fetch a miss from the real API and append it to the fixtures file"""
+        import httpx
+
+        upstream = self.record_from + path.split("/recipes", 1)[-1]
+        try:
+            response = httpx.get(upstream, params=params, timeout=15.0)
+            response.raise_for_status()
+            body = response.json()
+        except httpx.HTTPError as e:
+            print(f"Error recording fixture for {endpoint}: {e}")
+            return None
+
+        self.fixtures[(endpoint, key)] = body
+        self._counters["recorded"] += 1
+        if self.fixtures_path:
+            with self._record_lock, open(self.fixtures_path, "a", encoding="utf-8") as fixtures:
+                fixtures.write(json.dumps({"endpoint": endpoint, "key": key, "response": body}) + "\n")
+        return body
+
+    @staticmethod
+    def _load_fixtures(path: Optional[str]) -> Dict:
+        fixtures = {}
+        if not path:
+            return fixtures
+        try:
+            with open(path, encoding="utf-8") as lines:
+                for line in lines:
+                    if line.strip():
+                        record = json.loads(line)
+                        fixtures[(record["endpoint"], record["key"])] = record["response"]
+        except FileNotFoundError:
+            pass
+        return fixtures
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Spoonacular API")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--daily-points", type=float, help="Spoonacular points before answering 402")
+    parser.add_argument("--fixtures", help="JSONL fixtures to serve (and append to when recording)")
+    parser.add_argument("--record-from", help="Proxy fixture misses to this base URL and record them")
+    args = parser.parse_args()
+
+    server = FakeSpoonacular(
+        port=args.port, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+        rate_limit=args.rate_limit, fixtures_path=args.fixtures, record_from=args.record_from,
+        daily_points=args.daily_points
+    ).start()
+    print(f"Fake Spoonacular listening on {server.base_url} (set SPOONACULAR_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
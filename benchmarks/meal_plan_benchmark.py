@@ -0,0 +1,103 @@
+"""Weekly planner benchmark: optimizer time and end-to-end plan_week over synthetic candidate pools.
+
+Recipes draw 5-12 ingredients from a Zipf-weighted vocabulary whose most popular entries are the
+common benchmark ingredients and whose long tail is made-up words. Each pool is indexed in a
+LocalRecipeEngine with no Spoonacular service, so the candidates come from one local retrieval.
+The greedy-only objective is reported next to the local-search result.
+
+Usage: python -m benchmarks.meal_plan_benchmark [--pools 1000,5000,10000] [--vocabulary 1500]
+       [--days 7] [--meals-per-day 2] [--repeat 5] [--output results.json]
+"""
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+from benchmarks.common import INGREDIENTS, summarize, write_results
+from agents.meal_planner import MealPlanner, optimize_plan
+from database.local_recipe_engine import LocalRecipeEngine
+from utils.ingreadient_parser import IngredientParser
+
+PANTRY = ["chicken", "rice", "onion", "garlic", "tomato", "egg", "spinach", "cheese", "potato", "lemon"]
+
+# Consonants without "s" so the parser's plural folding leaves the made-up words alone
+_CONSONANTS = "bdfgklmnprtvz"
+_VOWELS = "aeiou"
+
+def vocabulary(size: int):
+    syllables = [c + v for c, v in itertools.product(_CONSONANTS, _VOWELS)]
+    words = ("".join(parts) for parts in itertools.product(syllables, repeat=3))
+    return INGREDIENTS + list(itertools.islice(words, max(0, size - len(INGREDIENTS))))
+
+def synthetic_recipes(count: int, words, seed: int = 11):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    recipes = []
+    for recipe_id in range(1, count + 1):
+        names = set()
+        size = rng.randint(5, 12)
+        while len(names) < size:
+            names.update(rng.choices(words, weights=weights, k=size - len(names)))
+        recipes.append({"id": recipe_id, "title": f"Recipe {recipe_id}", "ingredients": sorted(names)})
+    return recipes
+
+def timed(fn, repeat: int):
+    latencies, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        latencies.append(time.perf_counter() - started)
+    return result, summarize(latencies)
+
+def run_pool(size: int, args, words, workdir: str):
+    parser = IngredientParser()
+    engine = LocalRecipeEngine(corpus_path=os.path.join(workdir, f"corpus-{size}.jsonl"), ingredient_parser=parser)
+    engine.add_recipes(synthetic_recipes(size, words))
+    engine.warm_up()
+    planner = MealPlanner(recipe_service=None, local_engine=engine, ingredient_parser=parser)
+    slots = args.days * args.meals_per_day
+
+    candidates, _ = planner._candidates(PANTRY, slots, filters=None)
+    pantry_matrix, buy_matrix = planner._matrices(candidates, PANTRY)
+    (_, greedy_objective), greedy = timed(
+        lambda: optimize_plan(pantry_matrix, buy_matrix, slots, max_passes=0), args.repeat
+    )
+    (plan, objective), optimized = timed(lambda: optimize_plan(pantry_matrix, buy_matrix, slots), args.repeat)
+    result, end_to_end = timed(
+        lambda: planner.plan_week(PANTRY, days=args.days, meals_per_day=args.meals_per_day), args.repeat
+    )
+    return {
+        "candidates": len(candidates),
+        "buy_columns": buy_matrix.shape[1],
+        "greedy": {**greedy, "objective": round(greedy_objective, 2)},
+        "greedy_local_search": {**optimized, "objective": round(objective, 2), "distinct_recipes": len(set(plan))},
+        "plan_week": {
+            **end_to_end,
+            "shopping_list_items": len(result["shopping_list"]),
+            "pantry_used": len(result["pantry_used"])
+        }
+    }
+
+def run(args):
+    words = vocabulary(args.vocabulary)
+    results = {"config": {key: value for key, value in vars(args).items() if key != "output"}, "pools": {}}
+    with tempfile.TemporaryDirectory(prefix="meal-plan-benchmark-") as workdir:
+        for size in args.pools:
+            results["pools"][str(size)] = run_pool(size, args, words, workdir)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Weekly meal planner optimization benchmark")
+    parser.add_argument("--pools", type=lambda value: [int(size) for size in value.split(",")],
+                        default=[1000, 5000, 10000], help="Comma-separated candidate pool sizes")
+    parser.add_argument("--vocabulary", type=int, default=1500, help="Distinct ingredients across all recipes")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--meals-per-day", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per measurement")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args()
+    write_results(run(args), args.output)
+
+if __name__ == "__main__":
+    main()
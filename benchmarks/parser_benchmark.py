@@ -0,0 +1,59 @@
+"""Micro-benchmark for IngredientParser: cold parsing, memoized repeats and the parse_many batch path.
+
+Usage: python -m benchmarks.parser_benchmark [--lines 20000] [--output results.json]
+"""
+import argparse
+import random
+import time
+from benchmarks.common import write_results
+from utils.ingreadient_parser import IngredientParser
+
+QUANTITIES = ["", "1 ", "2 cups ", "1/2 tsp ", "3 large ", "200 g ", "½ cup chopped "]
+NAMES = [
+    "scallions", "green onions", "spring onion", "tomatoes", "garlic cloves", "chicken breasts",
+    "ground beef", "aubergine", "courgettes", "heavy whipping cream", "fresh basil leaves",
+    "extra-virgin olive oil", "jalapeños", "garbanzo beans", "rice", "eggs", "dragon fruit"
+]
+
+def synthetic_lines(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    return [
+        ", ".join(rng.choice(QUANTITIES) + rng.choice(NAMES) for _ in range(rng.randint(2, 6)))
+        for _ in range(count)
+    ]
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+def run(line_count: int):
+    lines = synthetic_lines(line_count)
+    items = sum(line.count(",") + 1 for line in lines)
+    results = {"lines": line_count, "items": items}
+
+    cold = IngredientParser(cache_size=1)
+    elapsed = timed(lambda: [cold.parse_ingredients(line) for line in lines])
+    results["uncached"] = {"seconds": round(elapsed, 4), "lines_per_second": round(line_count / elapsed)}
+
+    parser = IngredientParser()
+    elapsed = timed(lambda: parser.parse_many(lines))
+    results["parse_many_first_pass"] = {"seconds": round(elapsed, 4), "lines_per_second": round(line_count / elapsed)}
+    elapsed = timed(lambda: parser.parse_many(lines))
+    results["parse_many_memoized"] = {"seconds": round(elapsed, 4), "lines_per_second": round(line_count / elapsed)}
+
+    distinct = {ingredient for parsed in parser.parse_many(lines) for ingredient in parsed}
+    results["distinct_canonical_ingredients"] = len(distinct)
+    results["distinct_raw_names"] = len(NAMES)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingredient parsing")
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    write_results(run(args.lines), args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Cold-start profile: which imports dominate, and time to first render and first answer.
+
+Imports are measured with `python -X importtime` in fresh interpreters. The timeline replays the
+app's startup in a child process against the fake Spoonacular server: build the agent pool (first
+render; Streamlit's own import is not included), wait while the user types, then answer a plain
+ingredient list (first answer), which takes the router's fast path and so should load none of the
+deferred modules. It runs once cold and once with the background warm-up. The answer
+cache and write-through indexing are left out because they need an embedding model.
+
+Usage: python -m benchmarks.startup_benchmark [--think-ms 1500] [--latency-ms 80] [--top 15]
+       [--output results.json]
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Set
+from benchmarks.common import write_results
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What app.py imports before the page renders, what the first answer needs, and what is deferred
+RENDER_MODULES = ["config.settings", "utils.startup", "utils.tracing", "agents.agent_pool"]
+ANSWER_MODULES = [
+    "agents.meal_plan_agent", "agents.agent_tool", "agents.answer_cache",
+    "services.recipe_service", "services.groq_service", "database.vector_db"
+]
+DEFERRED_MODULES = ["langchain_core", "langchain.agents", "langchain_groq", "chromadb"]
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)\s*$")
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of -X importtime output; depth 0 is a module imported directly by the statement"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        rows.append({
+            "module": module,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": len(indent) // 2
+        })
+    return rows
+
+def import_profile(modules: List[str], top: int, baseline: Set[str] = frozenset()) -> Dict:
+    """Cold import cost of modules in a fresh interpreter, ignoring modules in baseline"""
+    statement = "; ".join(f"import {module}" for module in modules)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, cwd=ROOT
+    )
+    if completed.returncode != 0:
+        return {"modules": modules, "error": completed.stderr.strip().splitlines()[-1:]}
+
+    rows = [row for row in parse_importtime(completed.stderr) if row["module"] not in baseline]
+    top_level = sorted((row for row in rows if row["depth"] == 0), key=lambda row: -row["cumulative_us"])
+    return {
+        "modules": modules,
+        "total_ms": round(sum(row["cumulative_us"] for row in top_level) / 1000, 1),
+        "slowest_cumulative_ms": {row["module"]: round(row["cumulative_us"] / 1000, 1) for row in top_level[:top]},
+        "slowest_self_ms": {
+            row["module"]: round(row["self_us"] / 1000, 1)
+            for row in sorted(rows, key=lambda row: -row["self_us"])[:top]
+        }
+    }
+
+def interpreter_modules() -> Set[str]:
+    """Modules every interpreter imports at startup (site, encodings, ...)"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True)
+    return {row["module"] for row in parse_importtime(completed.stderr)}
+
+def interpreter_seconds() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return round(time.perf_counter() - started, 3)
+
+def timeline(base_url: str, think_ms: float, warm_up: bool) -> Dict:
+    """Startup milestones from a child process replaying the app's startup"""
+    env = {
+        **os.environ,
+        "SPOONACULAR_BASE_URL": base_url,
+        "SPOONACULAR_API_KEY": "benchmark",
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY") or "benchmark",
+        "AGENT_VERBOSE": "0"
+    }
+    command = [
+        sys.executable, "-m", "benchmarks.startup_benchmark", "--child",
+        "--think-ms", str(think_ms), "--workdir", tempfile.mkdtemp(prefix="startup-benchmark-")
+    ]
+    if warm_up:
+        command.append("--warm-up")
+
+    started = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=ROOT, env=env)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup child failed: {completed.stderr.strip()[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+def child(args):
+    """Runs in a fresh interpreter; prints one JSON line with the startup report"""
+    from utils.startup import startup
+    from config.settings import settings
+    from agents.agent_pool import AgentPool
+
+    # Keep the run's files out of ./database
+    settings.RECIPE_CACHE_PATH = os.path.join(args.workdir, "recipe_cache.sqlite3")
+    settings.LOCAL_RECIPE_CORPUS_PATH = os.path.join(args.workdir, "recipe_corpus.jsonl")
+    settings.CHROMA_DB_PATH = os.path.join(args.workdir, "chroma")
+    settings.EMBEDDING_CACHE_DIR = os.path.join(args.workdir, "embedding_cache")
+    settings.TRACE_EXPORT_PATH = os.path.join(args.workdir, "traces.jsonl")
+
+    pool = AgentPool(shared={"answer_cache": None, "index_writer": None})
+    if args.warm_up:
+        pool.warm_up()
+    startup.mark("first_render")
+    loaded_before_render = [module for module in DEFERRED_MODULES if module in sys.modules]
+
+    time.sleep(args.think_ms / 1000)
+    with startup.phase("first_answer"):
+        agent = pool.get("benchmark")
+        response = agent.chat("chicken, rice, garlic")
+    startup.mark("first_answer")
+
+    report = startup.report()
+    report["deferred_modules_loaded_before_render"] = loaded_before_render
+    report["deferred_modules_loaded_by_first_answer"] = [module for module in DEFERRED_MODULES if module in sys.modules]
+    report["answered"] = response != agent.ERROR_MESSAGE
+    print(json.dumps(report))
+
+def run(args) -> Dict:
+    from benchmarks.fake_spoonacular import FakeSpoonacular
+
+    baseline = interpreter_modules()
+    results = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "child", "workdir", "warm_up")},
+        "interpreter_seconds": interpreter_seconds(),
+        "imports": {
+            "before_render": import_profile(RENDER_MODULES, args.top, baseline),
+            "first_answer": import_profile(ANSWER_MODULES, args.top, baseline),
+            "deferred": import_profile(DEFERRED_MODULES, args.top, baseline)
+        },
+        "timeline": {}
+    }
+    server = FakeSpoonacular(latency=args.latency_ms / 1000).start()
+    try:
+        results["timeline"]["cold"] = timeline(server.base_url, args.think_ms, warm_up=False)
+        results["timeline"]["warm_up"] = timeline(server.base_url, args.think_ms, warm_up=True)
+    finally:
+        server.stop()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import and time-to-first-answer profile")
+    parser.add_argument("--think-ms", type=float, default=1500.0, help="Pause between first render and first message")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="Fake Spoonacular latency")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list per import profile")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--warm-up", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+    write_results(run(args), args.output)
+
+if __name__ == "__main__":
+    main()
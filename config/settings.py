@@ -7,6 +7,103 @@ class Settings:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     SPOONACULAR_API_KEY = os.getenv("SPOONACULAR_API_KEY")
     CHROMA_DB_PATH = "./database/chroma_data"
-    SPOONACULAR_BASE_URL = "https://api.spoonacular.com/recipes"
+    SPOONACULAR_BASE_URL = os.getenv("SPOONACULAR_BASE_URL", "https://api.spoonacular.com/recipes")
+    GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")  # None uses the Groq client's default endpoint
+    GROQ_MODEL_NAME = os.getenv("GROQ_MODEL_NAME", "llama3-70b-8192")
+
+    # Spoonacular response cache (seconds)
+    RECIPE_CACHE_PATH = "./database/recipe_cache.sqlite3"
+    RECIPE_CACHE_TTLS = {"search": 6 * 60 * 60, "details": 7 * 24 * 60 * 60}
+    RECIPE_CACHE_STALE_TTLS = {"search": 24 * 60 * 60, "details": 30 * 24 * 60 * 60}
+    RECIPE_CACHE_MAX_ENTRIES = {"search": 5000, "details": 20000}
+
+    # Pooled HTTP client (seconds)
+    HTTP_TIMEOUT = 10.0
+    HTTP_CONNECT_TIMEOUT = 3.0
+    HTTP_MAX_RETRIES = 3
+    HTTP_BACKOFF_BASE = 0.5
+    HTTP_BACKOFF_CAP = 8.0
+    HTTP_MAX_CONNECTIONS = 20
+    SPOONACULAR_BULK_CHUNK_SIZE = 10
+    # Nutrition is most of an information payload and is never shown
+    SPOONACULAR_INCLUDE_NUTRITION = False
+
+    # Spoonacular point quota and rate limit (points; costs are base + per returned recipe)
+    SPOONACULAR_DAILY_POINTS = float(os.getenv("SPOONACULAR_DAILY_POINTS", "150"))
+    SPOONACULAR_POINTS_PER_SECOND = 5.0
+    SPOONACULAR_BURST_POINTS = 10.0
+    SPOONACULAR_QUOTA_RESERVE = 5.0  # Kept back from user-facing requests
+    SPOONACULAR_BACKGROUND_RESERVE = 30.0  # Kept back from prefetch and stale revalidation
+    SPOONACULAR_LIMITER_MAX_WAIT = 1.0
+    SPOONACULAR_POINT_COSTS = {
+        "findByIngredients": (1.0, 0.01),
+        "complexSearch": (1.0, 0.06),
+        "information": (1.0, 0.0),
+        "informationBulk": (0.5, 0.5)
+    }
+
+    # Background detail prefetch after a search
+    PREFETCH_TOP_N = 3
+    PREFETCH_MAX_ENTRIES = 20
+    PREFETCH_WAIT_TIMEOUT = 5.0
+
+    # Conversation memory budget (tokens)
+    MEMORY_MAX_TOKENS = 1500
+
+    # Print the ReAct loop to stdout
+    AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "1") == "1"
+
+    # Per-session agent pool
+    AGENT_POOL_MAX_SESSIONS = 500
+    AGENT_POOL_IDLE_TIMEOUT = 30 * 60
+    AGENT_POOL_MAX_MEMORY_BYTES = 256 * 1024 * 1024
+    MAX_CONCURRENT_LLM_CALLS = 8
+    # Import heavy modules, open clients and build a spare agent in a background thread at startup
+    AGENT_POOL_WARM_UP = os.getenv("AGENT_POOL_WARM_UP", "1") == "1"
+
+    # Async chat path: non-streamed turns run as coroutines on one shared background event loop
+    ASYNC_CHAT = os.getenv("ASYNC_CHAT", "1") == "1"
+    ASYNC_LOOP_WORKERS = 16  # Threads for blocking steps (cache lookups, CPU-bound tools) off the loop
+    ASYNC_CHAT_TIMEOUT = 120  # Seconds a script waits for its turn before giving up
+
+    # Offline ingredient-overlap search
+    LOCAL_RECIPE_CORPUS_PATH = "./database/recipe_corpus.jsonl"
+    LOCAL_ENGINE_MIN_COVERAGE = 0.6
+
+    # Write-through indexing of served recipes
+    VECTOR_DB_UPSERT_BATCH_SIZE = 256
+    INDEX_WRITER_BATCH_SIZE = 64
+    INDEX_WRITER_FLUSH_INTERVAL = 5.0
+    INDEX_WRITER_QUEUE_SIZE = 10000
+    INDEX_WRITER_MAX_SEEN = 50000
+
+    # Embedding cache for the vector database
+    EMBEDDING_CACHE_DIR = "./database/embedding_cache"
+    EMBEDDING_CACHE_LRU_SIZE = 2048
+    EMBEDDING_BATCH_SIZE = 128
+    EMBEDDING_WORKERS = 4
+
+    # Weekly meal planner: one bulk retrieval, then greedy + swap local search over the candidates
+    MEAL_PLAN_DAYS = 7
+    MEAL_PLAN_MEALS_PER_DAY = 2
+    MEAL_PLAN_MAX_DAYS = 14
+    MEAL_PLAN_MAX_MEALS_PER_DAY = 4
+    MEAL_PLAN_LOCAL_CANDIDATES = 5000
+    MEAL_PLAN_API_CANDIDATES = 100  # findByIngredients maximum
+    MEAL_PLAN_MIN_CANDIDATES_PER_MEAL = 3  # Fewer local candidates than this per meal adds one API search
+    MEAL_PLAN_WEIGHTS = {"pantry_covered": 2.0, "pantry_uses": 0.5, "purchase": 1.0}
+    MEAL_PLAN_LOCAL_SEARCH_PASSES = 4
+    MEAL_PLAN_STAPLES = ["salt", "pepper", "water", "oil"]  # Assumed on hand, never on the shopping list
+
+    # Whole-response cache in front of the agent
+    ANSWER_CACHE_TTL = 6 * 60 * 60
+    ANSWER_CACHE_MAX_ENTRIES = 1000
+    ANSWER_CACHE_SIMILARITY_THRESHOLD = 0.95
+
+    # Per-request tracing and Prometheus-style metrics
+    TRACE_EXPORT_PATH = "./database/traces.jsonl"
+    TRACE_EXPORT_MAX_BYTES = 50 * 1024 * 1024  # Rolled over to traces.jsonl.1 past this size
+    TRACE_RECENT_TRACES = 50
+    TRACE_HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,157 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence
+import numpy as np
+from config.settings import settings
+
+def default_embedding_function():
+    """The embedding model Chroma uses for the recipes collection"""
+    from chromadb.utils import embedding_functions
+    return embedding_functions.DefaultEmbeddingFunction()
+
+class EmbeddingCache:
+    """Content-hash keyed embeddings persisted in a memory-mapped NumPy array with an LRU front"""
+
+    def __init__(self, directory: str = None, embedding_function: Callable = None,
+                 lru_size: int = None, batch_size: int = None, workers: int = None):
+        self.directory = directory or settings.EMBEDDING_CACHE_DIR
+        self.lru_size = lru_size or settings.EMBEDDING_CACHE_LRU_SIZE
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.workers = workers or settings.EMBEDDING_WORKERS
+        self._embedding_function = embedding_function
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._keys_path = os.path.join(self.directory, "keys.txt")
+        self._vectors_path = os.path.join(self.directory, "vectors.npy")
+
+        self._lock = threading.Lock()
+        self._rows = {}  # content hash -> row in the memmap
+        self._vectors = None
+        self._hot = OrderedDict()  # content hash -> vector for repeated queries
+        self._counters = defaultdict(int)
+        self._load()
+
+    @property
+    def embedding_function(self):
+        if self._embedding_function is None:
+            self._embedding_function = default_embedding_function()
+        return self._embedding_function
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embeddings for texts, computing only the ones not cached yet"""
+        hashes = [self.content_hash(text) for text in texts]
+        vectors = [None] * len(texts)
+        missing = OrderedDict()  # content hash -> text
+
+        with self._lock:
+            for i, content_hash in enumerate(hashes):
+                vector = self._lookup(content_hash)
+                if vector is not None:
+                    vectors[i] = vector
+                elif content_hash not in missing:
+                    missing[content_hash] = texts[i]
+            self._counters["hits"] += len(texts) - len(missing)
+            self._counters["misses"] += len(missing)
+
+        if missing:
+            computed = self._compute(list(missing.values()))
+            with self._lock:
+                self._store(list(missing.keys()), computed)
+                for i, content_hash in enumerate(hashes):
+                    if vectors[i] is None:
+                        vectors[i] = self._lookup(content_hash)
+
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            report = dict(self._counters)
+            report["stored"] = len(self._rows)
+        lookups = report.get("hits", 0) + report.get("misses", 0)
+        report["hit_rate"] = report.get("hits", 0) / lookups if lookups else 0.0
+        return report
+
+    def _compute(self, texts: List[str]) -> np.ndarray:
+        """Embed in large batches spread over a worker pool"""
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            results = [self.embedding_function(batches[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(self.embedding_function, batches))
+        self._counters["embedded"] += len(texts)
+        return np.vstack([np.asarray(result, dtype=np.float32) for result in results])
+
+    def _lookup(self, content_hash: str):
+        vector = self._hot.get(content_hash)
+        if vector is not None:
+            self._hot.move_to_end(content_hash)
+            self._counters["lru_hits"] += 1
+            return vector
+        row = self._rows.get(content_hash)
+        if row is None:
+            return None
+        vector = np.array(self._vectors[row])
+        self._remember(content_hash, vector)
+        return vector
+
+    def _remember(self, content_hash: str, vector: np.ndarray):
+        self._hot[content_hash] = vector
+        self._hot.move_to_end(content_hash)
+        while len(self._hot) > self.lru_size:
+            self._hot.popitem(last=False)
+
+    def _store(self, hashes: List[str], vectors: np.ndarray):
+        new = [(content_hash, vector) for content_hash, vector in zip(hashes, vectors) if content_hash not in self._rows]
+        if not new:
+            return
+        self._ensure_capacity(len(self._rows) + len(new), vectors.shape[1])
+
+        start = len(self._rows)
+        for offset, (content_hash, vector) in enumerate(new):
+            self._vectors[start + offset] = vector
+        self._vectors.flush()
+
+        # Keys are appended after vectors are on disk so a crash never maps a key to garbage
+        with open(self._keys_path, "a", encoding="utf-8") as keys:
+            for offset, (content_hash, vector) in enumerate(new):
+                keys.write(content_hash + "\n")
+                self._rows[content_hash] = start + offset
+                self._remember(content_hash, vector)
+
+    def _ensure_capacity(self, rows: int, dimension: int):
+        if self._vectors is not None and self._vectors.shape[0] >= rows:
+            return
+        capacity = max(1024, rows, 2 * (self._vectors.shape[0] if self._vectors is not None else 0))
+        grown = np.lib.format.open_memmap(
+            self._vectors_path + ".tmp", mode="w+", dtype=np.float32, shape=(capacity, dimension)
+        )
+        if self._vectors is not None:
+            grown[:len(self._rows)] = self._vectors[:len(self._rows)]
+        grown.flush()
+        del grown
+        self._vectors = None
+        os.replace(self._vectors_path + ".tmp", self._vectors_path)
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+
+    def _load(self):
+        if not (os.path.exists(self._keys_path) and os.path.exists(self._vectors_path)):
+            return
+        self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+        with open(self._keys_path, encoding="utf-8") as keys:
+            for row, line in enumerate(keys):
+                if row >= self._vectors.shape[0]:
+                    break
+                self._rows[line.strip()] = row
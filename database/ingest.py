@@ -0,0 +1,67 @@
+"""Bulk-load a JSONL recipe dump into the vector database and the local recipe index.
+
+Usage: python -m database.ingest recipes.jsonl [--batch-size 512] [--skip-local]
+"""
+import argparse
+import json
+import time
+from typing import Dict, Iterator, List
+from config.settings import settings
+
+def read_batches(path: str, batch_size: int) -> Iterator[List[Dict]]:
+    """Stream recipes from a JSONL file without loading it all into memory"""
+    batch = []
+    with open(path, encoding="utf-8") as dump:
+        for line_number, line in enumerate(dump, 1):
+            if not line.strip():
+                continue
+            try:
+                batch.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                print(f"Skipping line {line_number}: {e}")
+                continue
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def ingest(path: str, batch_size: int = None, include_local: bool = True) -> Dict[str, float]:
+    from database.vector_db import VectorDB
+
+    batch_size = batch_size or settings.VECTOR_DB_UPSERT_BATCH_SIZE
+    vector_db = VectorDB()
+    local_engine = None
+    if include_local:
+        from database.local_recipe_engine import LocalRecipeEngine
+        local_engine = LocalRecipeEngine()
+
+    started = time.perf_counter()
+    total = 0
+    for batch in read_batches(path, batch_size):
+        total += vector_db.add_recipes(batch, batch_size=batch_size)
+        if local_engine is not None:
+            local_engine.add_recipes(batch, persist=True)
+
+        elapsed = time.perf_counter() - started
+        print(f"Ingested {total} recipes in {elapsed:.1f}s ({total / elapsed:.0f} recipes/s)")
+
+    elapsed = time.perf_counter() - started
+    return {
+        "recipes": total,
+        "seconds": round(elapsed, 3),
+        "recipes_per_second": round(total / elapsed, 1) if elapsed else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a JSONL recipe dump into the local indexes")
+    parser.add_argument("path", help="JSONL file with one recipe per line")
+    parser.add_argument("--batch-size", type=int, default=settings.VECTOR_DB_UPSERT_BATCH_SIZE)
+    parser.add_argument("--skip-local", action="store_true", help="Only load the vector database")
+    args = parser.parse_args()
+
+    summary = ingest(args.path, batch_size=args.batch_size, include_local=not args.skip_local)
+    print(json.dumps(summary))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from config.settings import settings
+from utils.recipe_filters import RecipeFilters
+from utils.recipe_utils import ingredient_names
+
+class LocalRecipeEngine:
+    """Offline findByIngredients over a local recipe corpus using an inverted ingredient index"""
+
+    METADATA_FLAGS = tuple(RecipeFilters.METADATA_FLAGS.values())
+
+    def __init__(self, corpus_path: str = None, ingredient_parser=None, min_coverage: float = None):
+        self.corpus_path = corpus_path or settings.LOCAL_RECIPE_CORPUS_PATH
+        self.min_coverage = settings.LOCAL_ENGINE_MIN_COVERAGE if min_coverage is None else min_coverage
+        if ingredient_parser is None:
+            from utils.ingreadient_parser import IngredientParser
+            ingredient_parser = IngredientParser()
+        self.ingredient_parser = ingredient_parser
+
+        self._recipes = []  # Compact records: id, title, image, ingredients
+        self._positions = {}  # recipe id -> row
+        self._postings = defaultdict(list)  # canonical ingredient -> rows
+        self._posting_arrays = {}
+        self._ingredient_counts = np.zeros(0, dtype=np.int16)
+        self._ready_in_minutes = np.zeros(0, dtype=np.int32)
+        self._flags = {}
+        self._dirty = False
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+
+    def __len__(self):
+        return len(self._recipes)
+
+    def add_recipes(self, recipes: Iterable[Dict], persist: bool = False) -> int:
+        """Index new recipes and fill in the ready time and diet flags of known ones; optionally append
+        the changed records to the corpus file"""
+        self._ensure_loaded()
+        added = []
+        with self._lock:
+            for recipe in recipes:
+                record = self._index(recipe)
+                if record is not None:
+                    added.append(record)
+            if added:
+                self._dirty = True
+
+        if persist and added:
+            os.makedirs(os.path.dirname(self.corpus_path) or ".", exist_ok=True)
+            with open(self.corpus_path, "a", encoding="utf-8") as corpus:
+                for record in added:
+                    corpus.write(json.dumps(record) + "\n")
+        return len(added)
+
+    def search(self, ingredients: List[str], number: int = 10, ranking: int = 1,
+               filters: RecipeFilters = None) -> List[Dict]:
+        """Rank local recipes like Spoonacular findByIngredients (ranking 1 = maximize used, 2 = minimize missing)"""
+        self._ensure_loaded()
+        query = list(dict.fromkeys(self._canonical(ingredients)))
+        if filters is not None and not filters.metadata_filterable():
+            return []
+
+        with self._lock:
+            self._build()
+            postings = [self._posting_arrays[ing] for ing in query if ing in self._posting_arrays]
+            if not postings:
+                return []
+
+            used = np.bincount(np.concatenate(postings), minlength=len(self._recipes))
+            candidates = np.flatnonzero(used)
+            if filters is not None and not filters.is_empty():
+                candidates = candidates[self._filter_mask(candidates, filters)]
+            used = used[candidates]
+            missed = self._ingredient_counts[candidates] - used
+            if ranking == 2:
+                order = np.lexsort((-used, missed))
+            else:
+                order = np.lexsort((missed, -used))
+            rows = candidates[order[:number]]
+            records = [self._recipes[row] for row in rows]
+
+        query_set = set(query)
+        return [self._to_search_result(record, query_set) for record in records]
+
+    def search_if_covered(self, ingredients: List[str], number: int = 10, ranking: int = 1,
+                          filters: RecipeFilters = None) -> Optional[List[Dict]]:
+        """Local results when they are good enough to skip the API, otherwise None"""
+        results = self.search(ingredients, number=number, ranking=ranking, filters=filters)
+        query_size = len(set(self._canonical(ingredients)))
+        covered = (
+            len(results) >= number
+            and query_size > 0
+            and results[0]["usedIngredientCount"] / query_size >= self.min_coverage
+        )
+        with self._lock:
+            self._counters["local_hits" if covered else "local_misses"] += 1
+        return results if covered else None
+
+    def warm_up(self):
+        """Load the corpus and build the posting arrays ahead of the first search"""
+        self._ensure_loaded()
+        with self._lock:
+            self._build()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            report = dict(self._counters)
+        lookups = report.get("local_hits", 0) + report.get("local_misses", 0)
+        report["recipes"] = len(self._recipes)
+        report["ingredients"] = len(self._postings)
+        report["local_hit_rate"] = report.get("local_hits", 0) / lookups if lookups else 0.0
+        return report
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if os.path.exists(self.corpus_path):
+                with open(self.corpus_path, encoding="utf-8") as corpus:
+                    for line in corpus:
+                        if line.strip():
+                            self._index(json.loads(line))
+                self._dirty = True
+            self._loaded = True
+
+    def _index(self, recipe: Dict) -> Optional[Dict]:
+        recipe_id = recipe.get('id')
+        if recipe_id is None:
+            return None
+        if int(recipe_id) in self._positions:
+            return self._update(self._recipes[self._positions[int(recipe_id)]], recipe)
+
+        record = {
+            'id': int(recipe_id),
+            'title': recipe.get('title', ''),
+            'image': recipe.get('image', ''),
+            'ingredients': list(dict.fromkeys(self._canonical(ingredient_names(recipe))))
+        }
+        if not record['ingredients']:
+            return None
+        # Diet flags and ready time, when known, for preference filters
+        for field in ('readyInMinutes',) + self.METADATA_FLAGS:
+            if recipe.get(field) is not None:
+                record[field] = recipe[field]
+
+        row = len(self._recipes)
+        self._recipes.append(record)
+        self._positions[record['id']] = row
+        for ingredient in record['ingredients']:
+            self._postings[ingredient].append(row)
+        return record
+
+    def _update(self, record: Dict, recipe: Dict) -> Optional[Dict]:
+        """Full details arrive after the search summary indexed first; only they carry ready time and diet flags"""
+        changed = False
+        for field in ('readyInMinutes',) + self.METADATA_FLAGS:
+            if recipe.get(field) is not None and record.get(field) != recipe[field]:
+                record[field] = recipe[field]
+                changed = True
+        return record if changed else None
+
+    def _build(self):
+        """Freeze posting lists into NumPy arrays after new recipes were added"""
+        if not self._dirty:
+            return
+        self._posting_arrays = {
+            ingredient: np.asarray(rows, dtype=np.int32) for ingredient, rows in self._postings.items()
+        }
+        self._ingredient_counts = np.asarray(
+            [len(record['ingredients']) for record in self._recipes], dtype=np.int16
+        )
+        self._ready_in_minutes = np.asarray(
+            [record.get('readyInMinutes', -1) for record in self._recipes], dtype=np.int32
+        )
+        self._flags = {
+            flag: np.asarray([record.get(flag) is True for record in self._recipes], dtype=bool)
+            for flag in self.METADATA_FLAGS
+        }
+        self._dirty = False
+
+    def _filter_mask(self, rows: np.ndarray, filters: RecipeFilters) -> np.ndarray:
+        mask = np.ones(len(rows), dtype=bool)
+        for flag in filters.required_flags():
+            mask &= self._flags[flag][rows]
+        if filters.max_ready_time:
+            ready = self._ready_in_minutes[rows]
+            mask &= (ready >= 0) & (ready <= filters.max_ready_time)
+        return mask
+
+    def _canonical(self, names: Iterable[str]) -> List[str]:
+        parsed = self.ingredient_parser.parse_many(name for name in names if name)
+        return [ingredient for ingredients in parsed for ingredient in ingredients]
+
+    @staticmethod
+    def _to_search_result(record: Dict, query: set) -> Dict:
+        used = [{'name': name} for name in record['ingredients'] if name in query]
+        missed = [{'name': name} for name in record['ingredients'] if name not in query]
+        return {
+            'id': record['id'],
+            'title': record['title'],
+            'image': record['image'],
+            'usedIngredientCount': len(used),
+            'missedIngredientCount': len(missed),
+            'usedIngredients': used,
+            'missedIngredients': missed,
+            'unusedIngredients': [{'name': name} for name in query if name not in record['ingredients']],
+            'readyInMinutes': record.get('readyInMinutes'),
+            'source': 'local'
+        }
@@ -0,0 +1,114 @@
+import atexit
+import queue
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Iterable
+from config.settings import settings
+
+class RecipeIndexWriter:
+    """Write-through indexing of served recipes, flushed off the request thread in bounded chunks"""
+
+    def __init__(self, vector_db, local_engine=None, batch_size: int = None,
+                 flush_interval: float = None, max_seen: int = None):
+        self.vector_db = vector_db
+        self.local_engine = local_engine
+        self.batch_size = batch_size or settings.INDEX_WRITER_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.INDEX_WRITER_FLUSH_INTERVAL
+        self.max_seen = max_seen or settings.INDEX_WRITER_MAX_SEEN
+
+        self._queue = queue.Queue(maxsize=settings.INDEX_WRITER_QUEUE_SIZE)
+        self._pending = OrderedDict()  # (id, kind) -> recipe, deduplicated until the next flush
+        self._seen = OrderedDict()  # (id, kind) already written
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._counters = defaultdict(int)
+
+    def submit(self, recipes: Iterable[Dict]):
+        """Queue recipes for indexing; never blocks the caller"""
+        self._ensure_started()
+        for recipe in recipes:
+            if not isinstance(recipe, dict) or recipe.get('id') is None:
+                continue
+            try:
+                self._queue.put_nowait(recipe)
+                self._counters["submitted"] += 1
+            except queue.Full:
+                self._counters["dropped"] += 1
+
+    def close(self, timeout: float = 10.0):
+        """Flush what is queued and stop the worker; also runs at interpreter exit once started"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            atexit.unregister(self.close)
+
+    def stats(self) -> Dict[str, int]:
+        report = dict(self._counters)
+        report["queued"] = self._queue.qsize()
+        report["pending"] = len(self._pending)
+        return report
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="recipe-index-writer", daemon=True)
+                self._thread.start()
+                # The daemon thread would otherwise die with the process and lose the pending batch
+                atexit.register(self.close)
+
+    def _run(self):
+        oldest_pending = None
+        while not (self._stopping.is_set() and self._queue.empty()):
+            timeout = self.flush_interval
+            if oldest_pending is not None:
+                timeout = max(0.0, oldest_pending + self.flush_interval - time.monotonic())
+            try:
+                self._add_pending(self._queue.get(timeout=min(timeout, 1.0)))
+                if oldest_pending is None and self._pending:
+                    oldest_pending = time.monotonic()
+            except queue.Empty:
+                pass
+
+            due = oldest_pending is not None and time.monotonic() - oldest_pending >= self.flush_interval
+            if len(self._pending) >= self.batch_size or (self._pending and (due or self._stopping.is_set())):
+                self._flush()
+                oldest_pending = None
+        self._flush()
+
+    def _add_pending(self, recipe: Dict):
+        # Full details supersede search summaries for the same recipe
+        kind = 'details' if recipe.get('extendedIngredients') else 'summary'
+        key = (int(recipe['id']), kind)
+        if key in self._seen or (kind == 'summary' and (key[0], 'details') in self._seen):
+            self._counters["deduplicated"] += 1
+            return
+        if key in self._pending:
+            self._counters["deduplicated"] += 1
+        self._pending[key] = recipe
+
+    def _flush(self):
+        if not self._pending:
+            return
+        batch = list(self._pending.items())
+        self._pending.clear()
+        recipes = [recipe for _, recipe in batch]
+
+        try:
+            self.vector_db.add_recipes(recipes)
+            if self.local_engine is not None:
+                self.local_engine.add_recipes(recipes, persist=True)
+        except Exception as e:
+            print(f"Error indexing recipes: {e}")
+            self._counters["failed"] += len(recipes)
+            return
+
+        for key, _ in batch:
+            self._seen[key] = True
+        while len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+        self._counters["written"] += len(recipes)
+        self._counters["flushes"] += 1
@@ -1,59 +1,112 @@
-import chromadb
-from chromadb.config import Settings as ChromaSettings
 import json
 import os
+import threading
 from typing import List, Dict
+from config.settings import settings
+from database.embedding_cache import EmbeddingCache
+from utils.recipe_filters import RecipeFilters
+from utils.recipe_utils import ingredient_names
 
 class VectorDB:
-    def __init__(self, persist_directory="./database/chroma_data"):
-        self.persist_directory = persist_directory
-        os.makedirs(persist_directory, exist_ok=True)
+    def __init__(self, persist_directory=None, embedding_cache: EmbeddingCache = None):
+        self.persist_directory = persist_directory or settings.CHROMA_DB_PATH
+        os.makedirs(self.persist_directory, exist_ok=True)
+        self.embedding_cache = embedding_cache or EmbeddingCache()
         
-        self.chroma_client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=ChromaSettings(anonymized_telemetry=False)
-        )
-        
-        try:
-            self.collection = self.chroma_client.get_collection("recipes")
-        except:
-            self.collection = self.chroma_client.create_collection("recipes")
+        # chromadb is slow to import and open, and most requests never touch it
+        self._chroma_client = None
+        self._collection = None
+        self._lock = threading.Lock()
+    
+    @property
+    def chroma_client(self):
+        """Persistent Chroma client, opened on first use"""
+        if self._chroma_client is None:
+            with self._lock:
+                if self._chroma_client is None:
+                    import chromadb
+                    from chromadb.config import Settings as ChromaSettings
+                    self._chroma_client = chromadb.PersistentClient(
+                        path=self.persist_directory,
+                        settings=ChromaSettings(anonymized_telemetry=False)
+                    )
+        return self._chroma_client
+    
+    @property
+    def collection(self):
+        if self._collection is None:
+            client = self.chroma_client
+            with self._lock:
+                if self._collection is None:
+                    try:
+                        self._collection = client.get_collection("recipes")
+                    except:
+                        self._collection = client.create_collection("recipes")
+        return self._collection
+    
+    def warm_up(self):
+        """Open the client and collection ahead of the first query"""
+        return self.collection
     
-    def add_recipes(self, recipes: List[Dict]):
-        """Add recipes to vector database"""
-        documents = []
-        metadatas = []
-        ids = []
+    def add_recipes(self, recipes: List[Dict], batch_size: int = None):
+        """Upsert recipes into the vector database in chunks; re-adding an ID replaces it"""
+        batch_size = batch_size or settings.VECTOR_DB_UPSERT_BATCH_SIZE
         
+        # Last occurrence of an ID wins so a chunk never carries duplicates
+        unique = {}
         for recipe in recipes:
-            # Create searchable text from ingredients and title
-            ingredients_text = ', '.join([ing.get('name', '') for ing in recipe.get('usedIngredients', [])])
-            ingredients_text += ', ' + ', '.join([ing.get('name', '') for ing in recipe.get('missedIngredients', [])])
-            
-            document = f"{recipe.get('title', '')} - Ingredients: {ingredients_text}"
-            
-            documents.append(document)
-            metadatas.append({
-                'title': recipe.get('title', ''),
-                'id': str(recipe.get('id', '')),
-                'image': recipe.get('image', ''),
-                'used_ingredients': len(recipe.get('usedIngredients', [])),
-                'missed_ingredients': len(recipe.get('missedIngredients', []))
-            })
-            ids.append(str(recipe.get('id', len(documents))))
+            if recipe.get('id') is not None:
+                unique[str(recipe['id'])] = recipe
+        recipes = list(unique.values())
         
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        # Embed everything up front in large cached batches; Chroma then skips its own embedding
+        documents = [self._recipe_document(recipe) for recipe in recipes]
+        embeddings = self.embedding_cache.embed(documents)
+        
+        for start in range(0, len(recipes), batch_size):
+            chunk = recipes[start:start + batch_size]
+            self.collection.upsert(
+                documents=documents[start:start + batch_size],
+                embeddings=embeddings[start:start + batch_size].tolist(),
+                metadatas=[self._recipe_metadata(recipe) for recipe in chunk],
+                ids=[str(recipe['id']) for recipe in chunk]
+            )
+        return len(recipes)
+    
+    @staticmethod
+    def _recipe_document(recipe: Dict) -> str:
+        """Create searchable text from the title and every ingredient"""
+        ingredients_text = ', '.join(name for name in ingredient_names(recipe) if name)
+        return f"{recipe.get('title', '')} - Ingredients: {ingredients_text}"
+    
+    @staticmethod
+    def _recipe_metadata(recipe: Dict) -> Dict:
+        ready = recipe.get('readyInMinutes')
+        return {
+            'title': recipe.get('title', ''),
+            'id': str(recipe.get('id', '')),
+            'image': recipe.get('image', '') or '',
+            'used_ingredients': len(recipe.get('usedIngredients', [])),
+            'missed_ingredients': len(recipe.get('missedIngredients', [])),
+            # Preference filters; unknown values never match an active filter
+            'readyInMinutes': -1 if ready is None else int(ready),
+            'vegetarian': recipe.get('vegetarian') is True,
+            'vegan': recipe.get('vegan') is True,
+            'glutenFree': recipe.get('glutenFree') is True,
+            'dairyFree': recipe.get('dairyFree') is True
+        }
     
-    def search_similar_recipes(self, query: str, n_results: int = 5):
-        """Search for similar recipes based on query"""
+    def search_similar_recipes(self, query: str, n_results: int = 5, query_embedding=None,
+                               filters: RecipeFilters = None):
+        """Search for similar recipes based on query, reusing cached query embeddings"""
         try:
+            if query_embedding is None:
+                query_embedding = self.embedding_cache.embed_query(query)
+            where = filters.to_chroma_where() if filters is not None else None
             results = self.collection.query(
-                query_texts=[query],
-                n_results=n_results
+                query_embeddings=[list(map(float, query_embedding))],
+                n_results=n_results,
+                where=where
             )
             return results
         except Exception as e:
@@ -1,13 +1,55 @@
-from langchain_groq import ChatGroq
+import re
 from config.settings import settings
 
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+def approximate_token_ids(text: str):
+    """Cheap stand-in tokenizer so token budgets work without a local BPE model"""
+    return [hash(token) for token in _TOKEN_PATTERN.findall(text)]
+
 class GroqService:
-    def __init__(self):
-        self.llm = ChatGroq(
+    def __init__(self, api_key: str = None, base_url: str = None, model_name: str = None, llm=None):
+        self.api_key = api_key or settings.GROQ_API_KEY
+        self.base_url = base_url or settings.GROQ_BASE_URL
+        self.model_name = model_name or settings.GROQ_MODEL_NAME
+        # An injected chat model (e.g. a local stand-in) serves both plain and streamed calls;
+        # otherwise the Groq client is imported and built on first use
+        self._llm = llm
+        self.streaming_llm = llm
+    
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = self._build_llm(streaming=False)
+        return self._llm
+    
+    def _build_llm(self, streaming: bool):
+        from langchain_groq import ChatGroq
+        return ChatGroq(
             temperature=0.7,
-            groq_api_key=settings.GROQ_API_KEY,
-            model_name="llama3-70b-8192"
+            groq_api_key=self.api_key,
+            groq_api_base=self.base_url,
+            model_name=self.model_name,
+            custom_get_token_ids=approximate_token_ids,
+            streaming=streaming
         )
     
     def get_llm(self):
         return self.llm
+    
+    def get_streaming_llm(self):
+        """LLM that emits tokens to callbacks as they are generated"""
+        if self.streaming_llm is None:
+            self.streaming_llm = self._build_llm(streaming=True)
+        return self.streaming_llm
+    
+    def warm_up(self):
+        """Import and build the Groq clients ahead of the first LLM turn"""
+        self.get_llm()
+        self.get_streaming_llm()
+    
+    def count_tokens(self, text: str) -> int:
+        # Before the first LLM turn, count the way ChatGroq's custom_get_token_ids would
+        if self._llm is None:
+            return len(approximate_token_ids(text))
+        return self._llm.get_num_tokens(text)
@@ -0,0 +1,99 @@
+import asyncio
+import random
+import time
+import httpx
+from config.settings import settings
+from utils.tracing import tracer
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class HttpClient:
+    """Pooled keep-alive HTTP client with timeouts and jittered-backoff retries"""
+
+    def __init__(self, timeout: float = None, connect_timeout: float = None, max_retries: int = None,
+                 backoff_base: float = None, backoff_cap: float = None, max_connections: int = None):
+        self.max_retries = settings.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base or settings.HTTP_BACKOFF_BASE
+        self.backoff_cap = backoff_cap or settings.HTTP_BACKOFF_CAP
+        self.timeout = httpx.Timeout(
+            timeout or settings.HTTP_TIMEOUT,
+            connect=connect_timeout or settings.HTTP_CONNECT_TIMEOUT
+        )
+        self.limits = httpx.Limits(
+            max_connections=max_connections or settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=max_connections or settings.HTTP_MAX_CONNECTIONS
+        )
+        self._client = httpx.Client(timeout=self.timeout, limits=self.limits)
+        # AsyncClient is bound to the loop it was first used on
+        self._async_client = None
+        self._async_loop = None
+
+    def get(self, url: str, params: dict = None) -> httpx.Response:
+        """GET with retries on 429/5xx and transport errors; raises httpx.HTTPError"""
+        with tracer.span("http", endpoint=self._endpoint(url)) as span:
+            for attempt in range(self.max_retries + 1):
+                span.set(attempts=attempt + 1)
+                try:
+                    response = self._client.get(url, params=params)
+                except httpx.TransportError:
+                    if attempt >= self.max_retries:
+                        raise
+                    time.sleep(self._backoff(attempt))
+                    continue
+
+                span.set(status=response.status_code)
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    time.sleep(self._backoff(attempt, response))
+                    continue
+                response.raise_for_status()
+                return response
+
+    async def aget(self, url: str, params: dict = None) -> httpx.Response:
+        """Async counterpart of get() sharing the same retry policy"""
+        client = self._get_async_client()
+        with tracer.span("http", endpoint=self._endpoint(url)) as span:
+            for attempt in range(self.max_retries + 1):
+                span.set(attempts=attempt + 1)
+                try:
+                    response = await client.get(url, params=params)
+                except httpx.TransportError:
+                    if attempt >= self.max_retries:
+                        raise
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+
+                span.set(status=response.status_code)
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    await asyncio.sleep(self._backoff(attempt, response))
+                    continue
+                response.raise_for_status()
+                return response
+
+    def close(self):
+        self._client.close()
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+            self._async_loop = loop
+        return self._async_client
+
+    @staticmethod
+    def _endpoint(url: str) -> str:
+        """Last path segment, e.g. 'findByIngredients' or 'information'; never the query string"""
+        return url.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+
+    def _backoff(self, attempt: int, response: httpx.Response = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), self.backoff_cap))
+        return delay
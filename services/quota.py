@@ -0,0 +1,170 @@
+import asyncio
+import contextvars
+import datetime
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Mapping, Optional, Tuple
+from config.settings import settings
+
+# Set while serving speculative work (prefetch, stale revalidation) that should yield quota first
+_background = contextvars.ContextVar("quota_background", default=False)
+
+class QuotaLimiter:
+    """Token bucket over Spoonacular points plus the daily quota reported in response headers"""
+
+    def __init__(self, daily_points: float = None, points_per_second: float = None, burst_points: float = None,
+                 reserve_points: float = None, background_reserve_points: float = None,
+                 max_wait: float = None, costs: Dict[str, Tuple[float, float]] = None):
+        self.daily_points = daily_points or settings.SPOONACULAR_DAILY_POINTS
+        self.points_per_second = points_per_second or settings.SPOONACULAR_POINTS_PER_SECOND
+        self.burst_points = burst_points or settings.SPOONACULAR_BURST_POINTS
+        self.reserve_points = settings.SPOONACULAR_QUOTA_RESERVE if reserve_points is None else reserve_points
+        self.background_reserve_points = (
+            settings.SPOONACULAR_BACKGROUND_RESERVE if background_reserve_points is None else background_reserve_points
+        )
+        self.max_wait = settings.SPOONACULAR_LIMITER_MAX_WAIT if max_wait is None else max_wait
+        self.costs = costs or settings.SPOONACULAR_POINT_COSTS
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst_points
+        self._refilled_at = time.monotonic()
+        self._day = self._today()
+        self._spent_today = 0.0  # Points we were allowed to spend since midnight UTC
+        self._reported_left = None  # X-API-Quota-Left from the latest response
+        self._spent_since_report = 0.0
+        self._counters = defaultdict(float)
+
+    def cost(self, endpoint: str, items: int = 1) -> float:
+        """Estimated points for a request returning or asking for `items` recipes"""
+        base, per_item = self.costs.get(endpoint, (1.0, 0.0))
+        return base + per_item * max(1, items)
+
+    def acquire(self, endpoint: str, items: int = 1) -> bool:
+        """Take points for a request, waiting briefly for the bucket; False means don't call the API"""
+        cost = self.cost(endpoint, items)
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self._try_take(endpoint, cost)
+            if wait is None:
+                return False
+            if wait == 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                self._deny(endpoint, "rate")
+                return False
+            time.sleep(wait)
+
+    async def aacquire(self, endpoint: str, items: int = 1) -> bool:
+        """Async counterpart of acquire() that never blocks the event loop"""
+        cost = self.cost(endpoint, items)
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self._try_take(endpoint, cost)
+            if wait is None:
+                return False
+            if wait == 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                self._deny(endpoint, "rate")
+                return False
+            await asyncio.sleep(wait)
+
+    def observe(self, headers: Mapping[str, str]):
+        """Sync the daily budget with Spoonacular's quota headers"""
+        left = headers.get("X-API-Quota-Left")
+        used = headers.get("X-API-Quota-Used")
+        with self._lock:
+            self._roll_day()
+            try:
+                if left is not None:
+                    self._reported_left = float(left)
+                    self._spent_since_report = 0.0
+                elif used is not None:
+                    self._reported_left = self.daily_points - float(used)
+                    self._spent_since_report = 0.0
+            except ValueError:
+                pass
+
+    def mark_exhausted(self):
+        """Spoonacular answered 402: nothing left until the daily reset"""
+        with self._lock:
+            self._reported_left = 0.0
+            self._spent_since_report = 0.0
+            self._counters["exhausted"] += 1
+
+    def remaining(self) -> float:
+        with self._lock:
+            self._roll_day()
+            return self._remaining()
+
+    def is_low(self) -> bool:
+        """True once only the reserve for user-facing requests is left"""
+        return self.remaining() < self.background_reserve_points
+
+    @staticmethod
+    @contextmanager
+    def background():
+        """Mark requests in this block as speculative; they stop first when the quota runs low"""
+        token = _background.set(True)
+        try:
+            yield
+        finally:
+            _background.reset(token)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            self._roll_day()
+            report = dict(self._counters)
+            report["remaining_points"] = round(self._remaining(), 2)
+            report["spent_points_today"] = round(self._spent_today, 2)
+            report["bucket_points"] = round(self._tokens, 2)
+        return report
+
+    def _try_take(self, endpoint: str, cost: float) -> Optional[float]:
+        """0 when points were taken, seconds to wait for the bucket, or None when over budget"""
+        background = _background.get()
+        with self._lock:
+            self._roll_day()
+            reserve = self.background_reserve_points if background else self.reserve_points
+            if self._remaining() - cost < reserve:
+                self._counters[f"denied_quota.{endpoint}"] += 1
+                return None
+
+            now = time.monotonic()
+            self._tokens = min(self.burst_points, self._tokens + (now - self._refilled_at) * self.points_per_second)
+            self._refilled_at = now
+            # A request costing more than the burst size waits for a full bucket instead of forever
+            needed = min(cost, self.burst_points)
+            if self._tokens < needed:
+                return (needed - self._tokens) / self.points_per_second
+
+            self._tokens -= needed
+            self._spent_today += cost
+            self._spent_since_report += cost
+            self._counters[f"allowed.{endpoint}"] += 1
+            self._counters["points"] += cost
+            return 0
+
+    def _deny(self, endpoint: str, reason: str):
+        with self._lock:
+            self._counters[f"denied_{reason}.{endpoint}"] += 1
+
+    def _remaining(self) -> float:
+        if self._reported_left is not None:
+            return self._reported_left - self._spent_since_report
+        return self.daily_points - self._spent_today
+
+    def _roll_day(self):
+        # Spoonacular quotas reset at midnight UTC
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._spent_today = 0.0
+            self._reported_left = None
+            self._spent_since_report = 0.0
+
+    @staticmethod
+    def _today() -> datetime.date:
+        return datetime.datetime.now(datetime.timezone.utc).date()
@@ -0,0 +1,230 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from config.settings import settings
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+class RecipeCache:
+    """Disk-backed cache for Spoonacular responses with per-endpoint TTLs"""
+
+    def __init__(self, path: str = None, ttls: Dict[str, int] = None,
+                 stale_ttls: Dict[str, int] = None, max_entries: Dict[str, int] = None,
+                 memory_entries: int = 512):
+        self.path = path or settings.RECIPE_CACHE_PATH
+        self.ttls = ttls or settings.RECIPE_CACHE_TTLS
+        self.stale_ttls = stale_ttls or settings.RECIPE_CACHE_STALE_TTLS
+        self.max_entries = max_entries or settings.RECIPE_CACHE_MAX_ENTRIES
+        self.memory_entries = memory_entries
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_lru ON responses (namespace, accessed_at)"
+        )
+
+        # Decoded hot entries so repeat lookups skip SQLite and JSON decoding
+        self._memory = OrderedDict()
+        # Memory hits' access times, written to SQLite in batches so the LRU order stays true
+        self._touched = {}
+        self._codecs = {}  # namespace -> (encode to JSON-able, decode from JSON-able)
+        self._sizes = {}  # namespace -> rows on disk, counted once and then kept up to date
+        self._counters = defaultdict(lambda: defaultdict(int))
+
+    def register_codec(self, namespace: str, encode: Callable[[Any], Any], decode: Callable[[Any], Any]):
+        """Store a namespace's values as encode(value) on disk and keep decode(row) objects in memory"""
+        self._codecs[namespace] = (encode, decode)
+
+    @staticmethod
+    def search_key(ingredients: Iterable[str], number: int, ranking: int, ignore_pantry: bool) -> str:
+        """Build an order-independent key for an ingredient search"""
+        normalized = sorted({ing.strip().lower() for ing in ingredients if ing and ing.strip()})
+        return f"{','.join(normalized)}|number={number}|ranking={ranking}|ignorePantry={int(bool(ignore_pantry))}"
+
+    @staticmethod
+    def details_key(recipe_id) -> str:
+        return str(int(recipe_id))
+
+    def _state(self, namespace: str, created_at: float, now: float) -> str:
+        age = now - created_at
+        ttl = self.ttls.get(namespace, 0)
+        if age < ttl:
+            return FRESH
+        if age < ttl + self.stale_ttls.get(namespace, 0):
+            return STALE
+        return MISS
+
+    def get(self, namespace: str, key: str) -> Tuple[Optional[Any], str]:
+        """Return (value, state) where state is fresh, stale or miss"""
+        now = time.time()
+        counters = self._counters[namespace]
+
+        with self._lock:
+            entry = self._memory.get((namespace, key))
+            if entry is not None:
+                self._memory.move_to_end((namespace, key))
+                self._touched[(namespace, key)] = now
+                if len(self._touched) >= self.memory_entries:
+                    self._flush_access()
+            else:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM responses WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+                if row is not None:
+                    entry = (self._decode(namespace, row[0]), row[1])
+                    self._conn.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                        (now, namespace, key)
+                    )
+                    self._remember(namespace, key, entry)
+
+            if entry is None:
+                counters["misses"] += 1
+                return None, MISS
+
+            value, created_at = entry
+            state = self._state(namespace, created_at, now)
+            if state == MISS:
+                # Kept until LRU eviction so peek() can still serve it when the API is unavailable
+                counters["expired"] += 1
+                counters["misses"] += 1
+                return None, MISS
+
+            counters["hits" if state == FRESH else "stale_hits"] += 1
+            return value, state
+
+    def peek(self, namespace: str, key: str) -> Optional[Any]:
+        """Return any stored value regardless of age, as a last resort when the API can't be called"""
+        with self._lock:
+            entry = self._memory.get((namespace, key))
+            if entry is None:
+                row = self._conn.execute(
+                    "SELECT value FROM responses WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                if row is None:
+                    return None
+                entry = (self._decode(namespace, row[0]), None)
+            self._counters[namespace]["expired_served"] += 1
+            return entry[0]
+
+    def set(self, namespace: str, key: str, value: Any):
+        """Store a response and enforce the namespace size cap"""
+        now = time.time()
+        codec = self._codecs.get(namespace)
+        payload = json.dumps(codec[0](value) if codec else value)
+
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO responses (namespace, key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, payload, now, now)
+            ).rowcount
+            if not inserted:
+                self._conn.execute(
+                    "UPDATE responses SET value = ?, created_at = ?, accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (payload, now, now, namespace, key)
+                )
+            elif namespace in self._sizes:
+                self._sizes[namespace] += 1
+            self._remember(namespace, key, (value, now))
+            self._counters[namespace]["writes"] += 1
+            self._enforce_cap(namespace)
+
+    def invalidate(self, namespace: str, key: str = None):
+        """Drop one entry, or a whole namespace when no key is given"""
+        with self._lock:
+            if key is not None:
+                self._delete(namespace, key)
+                return
+            self._conn.execute("DELETE FROM responses WHERE namespace = ?", (namespace,))
+            self._sizes[namespace] = 0
+            for cached in [k for k in self._memory if k[0] == namespace]:
+                del self._memory[cached]
+            for cached in [k for k in self._touched if k[0] == namespace]:
+                del self._touched[cached]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Hit/miss counters per namespace"""
+        report = {}
+        for namespace, counters in self._counters.items():
+            lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+            report[namespace] = dict(counters)
+            report[namespace]["hit_rate"] = (
+                (counters["hits"] + counters["stale_hits"]) / lookups if lookups else 0.0
+            )
+        return report
+
+    def _decode(self, namespace: str, payload: str) -> Any:
+        value = json.loads(payload)
+        codec = self._codecs.get(namespace)
+        return codec[1](value) if codec else value
+
+    def _remember(self, namespace: str, key: str, entry: Tuple[Any, float]):
+        self._memory[(namespace, key)] = entry
+        self._memory.move_to_end((namespace, key))
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _delete(self, namespace: str, key: str):
+        deleted = self._conn.execute(
+            "DELETE FROM responses WHERE namespace = ? AND key = ?", (namespace, key)
+        ).rowcount
+        if namespace in self._sizes:
+            self._sizes[namespace] -= deleted
+        self._memory.pop((namespace, key), None)
+        self._touched.pop((namespace, key), None)
+
+    def _flush_access(self, namespace: str = None):
+        touched = [
+            (accessed_at, cached[0], cached[1]) for cached, accessed_at in self._touched.items()
+            if namespace is None or cached[0] == namespace
+        ]
+        if not touched:
+            return
+        self._conn.executemany(
+            "UPDATE responses SET accessed_at = MAX(accessed_at, ?) WHERE namespace = ? AND key = ?", touched
+        )
+        for _, cached_namespace, key in touched:
+            del self._touched[(cached_namespace, key)]
+
+    def _enforce_cap(self, namespace: str):
+        cap = self.max_entries.get(namespace)
+        if not cap:
+            return
+        if namespace not in self._sizes:
+            self._sizes[namespace] = self._conn.execute(
+                "SELECT COUNT(*) FROM responses WHERE namespace = ?", (namespace,)
+            ).fetchone()[0]
+        overflow = self._sizes[namespace] - cap
+        if overflow <= 0:
+            return
+
+        # Least recently accessed entries go first
+        self._flush_access(namespace)
+        evicted = self._conn.execute(
+            "SELECT key FROM responses WHERE namespace = ? ORDER BY accessed_at ASC LIMIT ?",
+            (namespace, overflow)
+        ).fetchall()
+        for (key,) in evicted:
+            self._delete(namespace, key)
+        self._counters[namespace]["evictions"] += len(evicted)
@@ -0,0 +1,90 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# The recipe card shows this much of the summary; the rest is never rendered
+SUMMARY_CHARS = 200
+
+_BOLD = re.compile(r"</?b>", re.IGNORECASE)
+_TAG = re.compile(r"<.*?>")
+
+def clean_summary(summary: str, limit: int = SUMMARY_CHARS) -> str:
+    """Spoonacular's HTML summary as short markdown: <b> becomes **, other tags are dropped"""
+    return _TAG.sub("", _BOLD.sub("**", summary or ""))[:limit]
+
+@dataclass(frozen=True, slots=True)
+class Ingredient:
+    name: str
+    amount: Optional[float] = None
+    unit: str = ""
+
+    def line(self) -> str:
+        amount = "" if self.amount is None else self.amount
+        return f"{amount} {self.unit} {self.name}"
+
+@dataclass(frozen=True, slots=True)
+class RecipeDetail:
+    """The parts of a Spoonacular recipe the agent shows, parsed once when the response arrives"""
+
+    id: int
+    title: str = "Recipe"
+    image: str = ""
+    ready_in_minutes: Optional[int] = None
+    servings: Optional[int] = None
+    vegetarian: bool = False
+    vegan: bool = False
+    gluten_free: bool = False
+    dairy_free: bool = False
+    ingredients: Tuple[Ingredient, ...] = ()
+    steps: Tuple[str, ...] = ()  # First analyzedInstructions block
+    summary: str = ""  # Already cleaned and cut to SUMMARY_CHARS
+
+    @classmethod
+    def from_api(cls, payload: Any) -> Optional["RecipeDetail"]:
+        """Parse a full or already projected information payload; None when it has no id"""
+        if isinstance(payload, RecipeDetail):
+            return payload
+        if not isinstance(payload, dict) or payload.get('id') is None:
+            return None
+
+        instructions = payload.get('analyzedInstructions') or []
+        steps = instructions[0].get('steps', []) if instructions else []
+        return cls(
+            id=int(payload['id']),
+            title=payload.get('title') or "Recipe",
+            image=payload.get('image') or "",
+            ready_in_minutes=payload.get('readyInMinutes'),
+            servings=payload.get('servings'),
+            vegetarian=payload.get('vegetarian') is True,
+            vegan=payload.get('vegan') is True,
+            gluten_free=payload.get('glutenFree') is True,
+            dairy_free=payload.get('dairyFree') is True,
+            ingredients=tuple(
+                Ingredient(ingredient.get('name', ''), ingredient.get('amount'), ingredient.get('unit') or "")
+                for ingredient in payload.get('extendedIngredients') or []
+            ),
+            steps=tuple(step.get('step', '') for step in steps),
+            summary=clean_summary(payload.get('summary', ''))
+        )
+
+    def to_dict(self) -> Dict:
+        """Projected payload in Spoonacular's field names, for the disk cache and the indexes"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'image': self.image,
+            'readyInMinutes': self.ready_in_minutes,
+            'servings': self.servings,
+            'vegetarian': self.vegetarian,
+            'vegan': self.vegan,
+            'glutenFree': self.gluten_free,
+            'dairyFree': self.dairy_free,
+            'extendedIngredients': [
+                {'name': ingredient.name, 'amount': ingredient.amount, 'unit': ingredient.unit}
+                for ingredient in self.ingredients
+            ],
+            'analyzedInstructions': [
+                {'steps': [{'number': i, 'step': step} for i, step in enumerate(self.steps, 1)]}
+            ] if self.steps else [],
+            'summary': self.summary
+        }
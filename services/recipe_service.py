@@ -1,43 +1,422 @@
-import requests
+import asyncio
+import contextvars
+import httpx
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from config.settings import settings
+from services.http_client import HttpClient
+from services.quota import QuotaLimiter
+from services.recipe_cache import RecipeCache, FRESH, STALE
+from services.recipe_records import RecipeDetail
+from services.single_flight import SingleFlight
+from utils.recipe_filters import RecipeFilters
 
 class RecipeService:
-    def __init__(self):
-        self.api_key = settings.SPOONACULAR_API_KEY
-        self.base_url = settings.SPOONACULAR_BASE_URL
-    
-    def search_recipes_by_ingredients(self, ingredients, number=10):
-        """Search recipes by available ingredients"""
+    def __init__(self, cache: RecipeCache = None, http_client: HttpClient = None, index_writer=None,
+                 base_url: str = None, api_key: str = None, quota: QuotaLimiter = None):
+        self.api_key = api_key or settings.SPOONACULAR_API_KEY
+        self.base_url = (base_url or settings.SPOONACULAR_BASE_URL).rstrip("/")
+        self.cache = cache if cache is not None else RecipeCache()
+        # Details are cached as compact records; only their projected fields reach the disk
+        self.cache.register_codec("details", RecipeDetail.to_dict, RecipeDetail.from_api)
+        self.http = http_client if http_client is not None else HttpClient()
+        self.index_writer = index_writer  # Optional write-through into the local indexes
+        self.quota = quota if quota is not None else QuotaLimiter()
+        self.bulk_chunk_size = settings.SPOONACULAR_BULK_CHUNK_SIZE
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.HTTP_MAX_CONNECTIONS,
+            thread_name_prefix="recipe-service"
+        )
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._change_listeners = []  # Called with recipe ids whose cached data changed
+        self._flight = SingleFlight()  # Identical concurrent requests share one API call
+
+    def add_change_listener(self, callback):
+        """Register callback(recipe_ids) for revalidations that returned different data"""
+        self._change_listeners.append(callback)
+
+    def search_recipes_by_ingredients(self, ingredients, number=10, ranking=1, ignore_pantry=True,
+                                      filters: RecipeFilters = None):
+        """Search recipes by available ingredients, filtered server-side when preferences are set"""
+        key = RecipeCache.search_key(ingredients, number, ranking, ignore_pantry)
+        if filters is not None and not filters.is_empty():
+            recipes = self._cached(
+                "search", f"{key}|{filters.key()}",
+                lambda: self._fetch_recipes_complex(ingredients, number, ranking, ignore_pantry, filters)
+            )
+        else:
+            recipes = self._cached(
+                "search", key,
+                lambda: self._fetch_recipes_by_ingredients(ingredients, number, ranking, ignore_pantry)
+            )
+        return recipes if recipes is not None else []
+
+    async def asearch_recipes_by_ingredients(self, ingredients, number=10, ranking=1, ignore_pantry=True,
+                                             filters: RecipeFilters = None):
+        """Async variant of search_recipes_by_ingredients"""
+        key = RecipeCache.search_key(ingredients, number, ranking, ignore_pantry)
+        if filters is not None and not filters.is_empty():
+            recipes = await self._acached(
+                "search", f"{key}|{filters.key()}",
+                lambda: self._afetch_recipes_complex(ingredients, number, ranking, ignore_pantry, filters),
+                lambda: self._fetch_recipes_complex(ingredients, number, ranking, ignore_pantry, filters)
+            )
+        else:
+            recipes = await self._acached(
+                "search", key,
+                lambda: self._afetch_recipes_by_ingredients(ingredients, number, ranking, ignore_pantry),
+                lambda: self._fetch_recipes_by_ingredients(ingredients, number, ranking, ignore_pantry)
+            )
+        return recipes if recipes is not None else []
+
+    def get_recipe_details(self, recipe_id):
+        """Get detailed recipe information as a RecipeDetail"""
+        key = RecipeCache.details_key(recipe_id)
+        return self._cached("details", key, lambda: self._fetch_recipe_details(recipe_id))
+
+    async def aget_recipe_details(self, recipe_id):
+        """Async variant of get_recipe_details"""
+        key = RecipeCache.details_key(recipe_id)
+        return await self._acached(
+            "details", key, lambda: self._afetch_recipe_details(recipe_id), lambda: self._fetch_recipe_details(recipe_id)
+        )
+
+    def get_recipe_details_bulk(self, recipe_ids, background=False):
+        """Get details for many recipes, fetching cache misses in concurrent bulk chunks
+
+        background=True marks speculative loads (prefetch) that give way first when the quota runs low.
+        """
+        with self.quota.background() if background else nullcontext():
+            ids, found, missing = self._split_cached_details(recipe_ids)
+            chunks = self._chunk(missing)
+
+            if len(chunks) == 1:
+                fetched = [self._fetch_recipe_details_bulk(chunks[0])]
+            else:
+                # Each worker gets a copy of the caller's context so its HTTP spans join the request trace
+                contexts = [contextvars.copy_context() for _ in chunks]
+                fetched = list(self.executor.map(
+                    lambda context, chunk: context.run(self._fetch_recipe_details_bulk, chunk), contexts, chunks
+                ))
+            self._store_bulk(found, fetched)
+            self._fill_expired(found, missing)
+
+        return [found[recipe_id] for recipe_id in ids if recipe_id in found]
+
+    async def aget_recipe_details_bulk(self, recipe_ids, background=False):
+        """Async variant of get_recipe_details_bulk"""
+        with self.quota.background() if background else nullcontext():
+            ids, found, missing = self._split_cached_details(recipe_ids)
+            fetched = await asyncio.gather(
+                *(self._afetch_recipe_details_bulk(chunk) for chunk in self._chunk(missing))
+            )
+            self._store_bulk(found, fetched)
+            self._fill_expired(found, missing)
+
+        return [found[recipe_id] for recipe_id in ids if recipe_id in found]
+
+    def _request(self, endpoint, url, params, items=1):
+        """GET within the point budget; None when the quota or rate limit rules the call out"""
+        if not self.quota.acquire(endpoint, items):
+            return None
+        try:
+            response = self.http.get(url, params=params)
+        except httpx.HTTPStatusError as e:
+            self._on_status_error(e)
+            raise
+        self.quota.observe(response.headers)
+        return self._decode(response)
+
+    async def _arequest(self, endpoint, url, params, items=1):
+        if not await self.quota.aacquire(endpoint, items):
+            return None
+        try:
+            response = await self.http.aget(url, params=params)
+        except httpx.HTTPStatusError as e:
+            self._on_status_error(e)
+            raise
+        self.quota.observe(response.headers)
+        return self._decode(response)
+
+    @staticmethod
+    def _decode(response):
+        # A truncated or non-JSON body (e.g. a proxy error page) is a failed request like any other
+        try:
+            return response.json()
+        except ValueError as e:
+            raise httpx.DecodingError(f"Invalid JSON from {response.url}: {e}", request=response.request) from e
+
+    def _on_status_error(self, error):
+        self.quota.observe(error.response.headers)
+        # Spoonacular answers 402 once the daily points are used up
+        if error.response.status_code == 402:
+            self.quota.mark_exhausted()
+
+    def _search_request(self, ingredients, number, ranking, ignore_pantry):
         url = f"{self.base_url}/findByIngredients"
         params = {
             'apiKey': self.api_key,
             'ingredients': ','.join(ingredients),
             'number': number,
-            'ranking': 1,
-            'ignorePantry': True
+            'ranking': ranking,
+            'ignorePantry': ignore_pantry
         }
-        
+        return url, params
+
+    def _fetch_recipes_by_ingredients(self, ingredients, number, ranking, ignore_pantry):
+        url, params = self._search_request(ingredients, number, ranking, ignore_pantry)
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            return self._request("findByIngredients", url, params, items=number)
+        except httpx.HTTPError as e:
             print(f"Error fetching recipes: {e}")
-            return []
-    
-    def get_recipe_details(self, recipe_id):
-        """Get detailed recipe information"""
+            return None
+
+    async def _afetch_recipes_by_ingredients(self, ingredients, number, ranking, ignore_pantry):
+        url, params = self._search_request(ingredients, number, ranking, ignore_pantry)
+        try:
+            return await self._arequest("findByIngredients", url, params, items=number)
+        except httpx.HTTPError as e:
+            print(f"Error fetching recipes: {e}")
+            return None
+
+    def _complex_request(self, ingredients, number, ranking, ignore_pantry, filters):
+        """complexSearch with diet/intolerance/time filters, returned in findByIngredients shape"""
+        url = f"{self.base_url}/complexSearch"
+        params = {
+            'apiKey': self.api_key,
+            'includeIngredients': ','.join(ingredients),
+            'number': number,
+            'sort': 'min-missing-ingredients' if ranking == 2 else 'max-used-ingredients',
+            'ignorePantry': ignore_pantry,
+            'fillIngredients': True,
+            'addRecipeInformation': True,
+            **filters.to_spoonacular_params()
+        }
+        return url, params
+
+    def _fetch_recipes_complex(self, ingredients, number, ranking, ignore_pantry, filters):
+        url, params = self._complex_request(ingredients, number, ranking, ignore_pantry, filters)
+        try:
+            response = self._request("complexSearch", url, params, items=number)
+            return response.get('results', []) if response is not None else None
+        except httpx.HTTPError as e:
+            print(f"Error fetching filtered recipes: {e}")
+            return None
+
+    async def _afetch_recipes_complex(self, ingredients, number, ranking, ignore_pantry, filters):
+        url, params = self._complex_request(ingredients, number, ranking, ignore_pantry, filters)
+        try:
+            response = await self._arequest("complexSearch", url, params, items=number)
+            return response.get('results', []) if response is not None else None
+        except httpx.HTTPError as e:
+            print(f"Error fetching filtered recipes: {e}")
+            return None
+
+    def _details_request(self, recipe_id):
         url = f"{self.base_url}/{recipe_id}/information"
         params = {
             'apiKey': self.api_key,
-            'includeNutrition': True
+            'includeNutrition': settings.SPOONACULAR_INCLUDE_NUTRITION
         }
-        
+        return url, params
+
+    def _fetch_recipe_details(self, recipe_id):
+        url, params = self._details_request(recipe_id)
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            return RecipeDetail.from_api(self._request("information", url, params))
+        except httpx.HTTPError as e:
             print(f"Error fetching recipe details: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    async def _afetch_recipe_details(self, recipe_id):
+        url, params = self._details_request(recipe_id)
+        try:
+            return RecipeDetail.from_api(await self._arequest("information", url, params))
+        except httpx.HTTPError as e:
+            print(f"Error fetching recipe details: {e}")
+            return None
+
+    def _bulk_request(self, recipe_ids):
+        url = f"{self.base_url}/informationBulk"
+        params = {
+            'apiKey': self.api_key,
+            'ids': ','.join(str(recipe_id) for recipe_id in recipe_ids),
+            'includeNutrition': settings.SPOONACULAR_INCLUDE_NUTRITION
+        }
+        return url, params
+
+    def _fetch_recipe_details_bulk(self, recipe_ids):
+        return self._flight.do(("informationBulk", tuple(recipe_ids)), lambda: self._request_details_bulk(recipe_ids))
+
+    def _request_details_bulk(self, recipe_ids):
+        url, params = self._bulk_request(recipe_ids)
+        try:
+            return self._request("informationBulk", url, params, items=len(recipe_ids)) or []
+        except httpx.HTTPError as e:
+            print(f"Error fetching recipe details in bulk: {e}")
+            return []
+
+    async def _afetch_recipe_details_bulk(self, recipe_ids):
+        return await self._flight.ado(
+            ("informationBulk", tuple(recipe_ids)), lambda: self._arequest_details_bulk(recipe_ids)
+        )
+
+    async def _arequest_details_bulk(self, recipe_ids):
+        url, params = self._bulk_request(recipe_ids)
+        try:
+            return await self._arequest("informationBulk", url, params, items=len(recipe_ids)) or []
+        except httpx.HTTPError as e:
+            print(f"Error fetching recipe details in bulk: {e}")
+            return []
+
+    def _split_cached_details(self, recipe_ids):
+        """Return (ordered unique ids, cached details by id, ids still to fetch)"""
+        ids = list(dict.fromkeys(int(recipe_id) for recipe_id in recipe_ids))
+        found, missing, stale = {}, [], {}
+
+        for recipe_id in ids:
+            details, state = self.cache.get("details", RecipeCache.details_key(recipe_id))
+            if state == FRESH:
+                found[recipe_id] = details
+            elif state == STALE:
+                found[recipe_id] = details
+                stale[recipe_id] = details
+            else:
+                missing.append(recipe_id)
+
+        for chunk in self._chunk(list(stale)):
+            self.executor.submit(self._refresh_details_bulk, chunk, {recipe_id: stale[recipe_id] for recipe_id in chunk})
+        return ids, found, missing
+
+    def _refresh_details_bulk(self, recipe_ids, previous):
+        refreshed = {}
+        with self.quota.background():
+            self._store_bulk(refreshed, [self._fetch_recipe_details_bulk(recipe_ids)])
+        self._notify_changed(
+            [recipe_id for recipe_id, details in refreshed.items() if previous.get(recipe_id) != details]
+        )
+
+    def _store_bulk(self, found, fetched_chunks):
+        for chunk in fetched_chunks:
+            records = [details for details in map(RecipeDetail.from_api, chunk or []) if details is not None]
+            for details in records:
+                self.cache.set("details", RecipeCache.details_key(details.id), details)
+                found[details.id] = details
+            self._write_through(records)
+
+    def _fill_expired(self, found, recipe_ids):
+        """Fall back to expired cached details for ids the API didn't return"""
+        for recipe_id in recipe_ids:
+            if recipe_id not in found:
+                details = self.cache.peek("details", RecipeCache.details_key(recipe_id))
+                if details is not None:
+                    found[recipe_id] = details
+
+    def _chunk(self, recipe_ids):
+        size = self.bulk_chunk_size
+        return [recipe_ids[i:i + size] for i in range(0, len(recipe_ids), size)]
+
+    def _cached(self, namespace, key, fetch):
+        """Serve from cache, revalidating stale entries in the background
+
+        Concurrent misses for the same key share one fetch. When the fetch fails or the quota
+        rules it out, an expired cached copy is better than nothing.
+        """
+        value, state = self.cache.get(namespace, key)
+        if state == FRESH:
+            return value
+        if state == STALE:
+            self._refresh_in_background(namespace, key, fetch, value)
+            return value
+
+        value = self._flight.do((namespace, key), lambda: self._fetch_and_store(namespace, key, fetch))
+        if value is None:
+            value = self.cache.peek(namespace, key)
+        return value
+
+    async def _acached(self, namespace, key, afetch, fetch):
+        """Async variant of _cached; stale entries are still revalidated by the sync fetch in a worker"""
+        value, state = self.cache.get(namespace, key)
+        if state == FRESH:
+            return value
+        if state == STALE:
+            self._refresh_in_background(namespace, key, fetch, value)
+            return value
+
+        value = await self._flight.ado((namespace, key), lambda: self._afetch_and_store(namespace, key, afetch))
+        if value is None:
+            value = self.cache.peek(namespace, key)
+        return value
+
+    async def _afetch_and_store(self, namespace, key, afetch):
+        value = await afetch()
+        if value is not None:
+            self.cache.set(namespace, key, value)
+            self._write_through(value)
+        return value
+
+    def _fetch_and_store(self, namespace, key, fetch):
+        value = fetch()
+        if value is not None:
+            self.cache.set(namespace, key, value)
+            self._write_through(value)
+        return value
+
+    def _write_through(self, value):
+        if self.index_writer is None or not value:
+            return
+        records = value if isinstance(value, list) else [value]
+        self.index_writer.submit([
+            record.to_dict() if isinstance(record, RecipeDetail) else record for record in records
+        ])
+
+    def _refresh_in_background(self, namespace, key, fetch, previous):
+        with self._refresh_lock:
+            if (namespace, key) in self._refreshing:
+                return
+            self._refreshing.add((namespace, key))
+
+        def refresh():
+            try:
+                with self.quota.background():
+                    value = fetch()
+                if value is not None:
+                    self.cache.set(namespace, key, value)
+                    self._write_through(value)
+                    if value != previous:
+                        self._notify_changed(self._recipe_ids(previous))
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard((namespace, key))
+
+        self.executor.submit(refresh)
+
+    def _notify_changed(self, recipe_ids):
+        if not recipe_ids:
+            return
+        for callback in self._change_listeners:
+            try:
+                callback(recipe_ids)
+            except Exception as e:
+                print(f"Error notifying recipe change: {e}")
+
+    @staticmethod
+    def _recipe_ids(value):
+        recipe_ids = []
+        for record in value if isinstance(value, list) else [value]:
+            if isinstance(record, RecipeDetail):
+                recipe_ids.append(record.id)
+            elif isinstance(record, dict) and record.get('id') is not None:
+                recipe_ids.append(int(record['id']))
+        return recipe_ids
+
+    def cache_stats(self):
+        """Hit/miss counters for the response cache"""
+        return self.cache.stats()
+
+    def limiter_stats(self):
+        """Point quota usage and how many calls were coalesced"""
+        return {"quota": self.quota.stats(), "single_flight": self._flight.stats()}
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution whose result all callers share"""
+
+    def __init__(self):
+        self._calls = {}  # key -> Future of the call in flight
+        self._async_calls = {}  # (event loop id, key) -> asyncio.Future
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            self._counters["executed" if leader else "coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of do(); calls coalesce per event loop"""
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            future = self._async_calls.get(loop_key)
+            leader = future is None
+            if leader:
+                future = self._async_calls[loop_key] = asyncio.get_running_loop().create_future()
+            self._counters["executed" if leader else "coalesced"] += 1
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a leader failing with no followers doesn't log "never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._async_calls.pop(loop_key, None)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            report = dict(self._counters)
+            report["in_flight"] = len(self._calls) + len(self._async_calls)
+        calls = report.get("executed", 0) + report.get("coalesced", 0)
+        report["coalesced_rate"] = report.get("coalesced", 0) / calls if calls else 0.0
+        return report
@@ -0,0 +1,58 @@
+from agents.agent_pool import AgentPool
+
+class SizedAgent:
+    """Stands in for MealPlanningAgent; approx_size() must not be called on the pool's hot path"""
+
+    def __init__(self):
+        self.size = 0
+        self.closed = False
+        self._turn_listeners = []
+
+    def add_turn_listener(self, listener):
+        self._turn_listeners.append(listener)
+
+    def approx_size(self):
+        raise AssertionError("the pool should use the size recorded at the end of the turn")
+
+    def turn(self, size):
+        self.size = size
+        for listener in self._turn_listeners:
+            listener(self)
+
+    def close(self):
+        self.closed = True
+
+def make_pool(**kwargs):
+    pool = AgentPool(idle_timeout=3600, **kwargs)
+    pool._create_agent = SizedAgent
+    return pool
+
+def test_memory_cap_evicts_least_recently_used_sessions():
+    pool = make_pool(max_sessions=100, max_memory_bytes=1000)
+    agents = {name: pool.get(name) for name in ("a", "b", "c")}
+    agents["a"].turn(400)
+    agents["b"].turn(400)
+    agents["c"].turn(100)
+    assert pool.stats()["approx_memory_bytes"] == 900
+
+    agents["b"].turn(700)
+    pool.get("c")
+    assert agents["a"].closed and not agents["b"].closed
+    assert pool.stats() == {"sessions": 2, "approx_memory_bytes": 800, "evictions": 1}
+
+def test_removed_sessions_leave_the_total():
+    pool = make_pool(max_sessions=100, max_memory_bytes=10_000)
+    agent = pool.get("a")
+    agent.turn(300)
+    pool.remove("a")
+    # A late turn of the removed agent doesn't count any more
+    agent.turn(500)
+    assert pool.stats() == {"sessions": 0, "approx_memory_bytes": 0, "evictions": 0}
+
+def test_idle_sessions_expire():
+    pool = make_pool(max_sessions=100, max_memory_bytes=10_000)
+    pool.idle_timeout = -1
+    first = pool.get("a")
+    pool.get("b")
+    assert first.closed
+    assert pool.stats()["sessions"] == 1
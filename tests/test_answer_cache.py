@@ -0,0 +1,75 @@
+import os
+import tempfile
+import time
+import zlib
+import numpy as np
+import pytest
+from agents.answer_cache import AnswerCache
+from database.embedding_cache import EmbeddingCache
+from database.vector_db import VectorDB
+from utils.recipe_filters import RecipeFilters
+
+NO_FILTERS = RecipeFilters()
+
+def trigram_embedding(texts):
+    """Deterministic stand-in for the ONNX model: hashed character trigrams"""
+    vectors = np.zeros((len(texts), 256), dtype=np.float32)
+    for row, text in enumerate(texts):
+        padded = f"  {text.lower()} "
+        for i in range(len(padded) - 2):
+            vectors[row, zlib.crc32(padded[i:i + 3].encode()) % 256] += 1
+    return vectors
+
+@pytest.fixture(scope="module")
+def vector_db():
+    workdir = tempfile.mkdtemp(prefix="answer-cache-test-")
+    embeddings = EmbeddingCache(os.path.join(workdir, "embeddings"), embedding_function=trigram_embedding)
+    return VectorDB(os.path.join(workdir, "chroma"), embeddings)
+
+def test_exact_hit_miss_and_invalidation():
+    cache = AnswerCache()
+    cache.set(["rice", "chicken"], NO_FILTERS, "Chicken fried rice", recipe_ids=[11])
+    cache.set(["egg", "spinach"], NO_FILTERS, "Spinach omelette", recipe_ids=[22])
+
+    assert cache.get(["chicken", "rice"], NO_FILTERS) == "Chicken fried rice"
+    assert cache.get(["chicken", "rice"], RecipeFilters(dietary_restrictions=["Vegan"])) is None
+    assert cache.get(["chicken"], NO_FILTERS) is None
+
+    cache.invalidate([11])
+    assert cache.get(["chicken", "rice"], NO_FILTERS) is None
+    assert cache.get(["egg", "spinach"], NO_FILTERS) == "Spinach omelette"
+    cache.invalidate()
+    assert cache.get(["egg", "spinach"], NO_FILTERS) is None
+
+    stats = cache.stats()
+    assert (stats["exact_hits"], stats["misses"], stats["invalidated"], stats["entries"]) == (2, 4, 2, 0)
+
+def test_expired_and_evicted_entries_miss():
+    cache = AnswerCache(ttl=0.05, max_entries=2)
+    cache.set(["chicken"], NO_FILTERS, "a")
+    cache.set(["rice"], NO_FILTERS, "b")
+    cache.set(["egg"], NO_FILTERS, "c")
+    assert cache.get(["chicken"], NO_FILTERS) is None
+    assert cache.get(["rice"], NO_FILTERS) == "b"
+    time.sleep(0.06)
+    assert cache.get(["rice"], NO_FILTERS) is None
+    assert cache.stats()["evictions"] == 1 and cache.stats()["expired"] == 1
+
+def test_different_ingredient_lists_never_share_an_answer(vector_db):
+    cache = AnswerCache(vector_db=vector_db, similarity_threshold=0.0)
+    cache.set(["chicken", "rice"], NO_FILTERS, "Chicken fried rice")
+    cache.set(["chicken", "dragon fruit"], NO_FILTERS, "Dragon fruit chicken salad")
+
+    # Even a threshold that accepts anything can't cross vocabulary ingredients or preferences
+    assert cache.get(["chicken", "broccoli"], NO_FILTERS) is None
+    assert cache.get(["chicken", "rice", "egg"], NO_FILTERS) is None
+    assert cache.get(["rice", "dragon fruit"], NO_FILTERS) is None
+    assert cache.get(["chicken", "dragon fruit"], RecipeFilters(max_ready_time=20)) is None
+
+def test_free_text_items_match_semantically(vector_db):
+    cache = AnswerCache(vector_db=vector_db, similarity_threshold=0.8)
+    cache.set(["chicken", "dragon fruit"], NO_FILTERS, "Dragon fruit chicken salad")
+
+    assert cache.get(["chicken", "dragon fruits"], NO_FILTERS) == "Dragon fruit chicken salad"
+    assert cache.get(["chicken", "kimchi"], NO_FILTERS) is None
+    assert cache.stats()["semantic_hits"] == 1
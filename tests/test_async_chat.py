@@ -0,0 +1,51 @@
+import asyncio
+import tempfile
+import threading
+import pytest
+from benchmarks.agent_benchmark import Stack
+from benchmarks.fake_spoonacular import FakeSpoonacular
+from config.settings import settings
+from utils.async_runner import BackgroundLoop
+
+@pytest.fixture
+def stack():
+    settings.AGENT_VERBOSE = False
+    server = FakeSpoonacular(latency=0.02).start()
+    try:
+        yield Stack(server.base_url, tempfile.mkdtemp(prefix="async-chat-test-"), llm_latency=0.05)
+    finally:
+        server.stop()
+
+def test_llm_limiter_waiters_do_not_starve_the_loop_executor(stack):
+    # More conversations waiting on the limiter than the loop has worker threads
+    stack.llm_limiter = threading.BoundedSemaphore(2)
+    loop = BackgroundLoop(workers=4)
+    agents = [stack.new_agent() for _ in range(10)]
+    futures = [
+        loop.submit(agent.achat(f"What could I cook tonight with beef and rice for guest {i}?"))
+        for i, agent in enumerate(agents)
+    ]
+    # A starved loop never finishes; don't join it on failure
+    responses = [future.result(timeout=20) for future in futures]
+    loop.stop()
+
+    assert all(response != agents[0].ERROR_MESSAGE for response in responses)
+    # Every permit came back
+    assert all(stack.llm_limiter.acquire(blocking=False) for _ in range(2))
+
+def test_cancelled_waiter_leaves_the_lock_free():
+    from agents.meal_plan_agent import MealPlanningAgent
+
+    lock = threading.Lock()
+
+    async def scenario():
+        lock.acquire()
+        waiter = asyncio.ensure_future(MealPlanningAgent._acquired(lock).__aenter__())
+        await asyncio.sleep(0.02)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        lock.release()
+
+    asyncio.run(scenario())
+    assert lock.acquire(blocking=False)
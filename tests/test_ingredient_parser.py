@@ -0,0 +1,51 @@
+import pytest
+from utils.ingreadient_parser import IngredientParser
+
+@pytest.fixture(scope="module")
+def parser():
+    return IngredientParser()
+
+@pytest.mark.parametrize("text, expected", [
+    # A vocabulary phrase inside a longer item is a different ingredient
+    ("peanut butter", ["peanut butter"]),
+    ("almond milk, oats", ["almond milk", "oat"]),
+    ("rice vinegar", ["rice vinegar"]),
+    ("fresh kale with garlic", ["kale with garlic"]),
+    ("cream of mushroom soup", ["cream of mushroom soup"]),
+    ("corn flour", ["corn flour"]),
+    # Whole items still canonicalize once quantities, units and descriptors are dropped
+    ("2 cups of flour", ["flour"]),
+    ("1 can diced tomatoes", ["tomato"]),
+    ("boneless skinless chicken breasts", ["chicken breast"]),
+    ("Scallions, spring onion", ["green onion"]),
+    ("fresh basil leaves, garlic cloves", ["basil", "garlic"]),
+    ("salt and pepper to taste", ["salt", "pepper"]),
+    ("½ cup chopped dragon fruit", ["dragon fruit"]),
+])
+def test_parse_ingredients(parser, text, expected):
+    assert parser.parse_ingredients(text) == expected
+
+@pytest.mark.parametrize("word, singular", [
+    ("cookies", "cookie"), ("pies", "pie"), ("berries", "berry"), ("anchovies", "anchovy"),
+    ("fries", "fry"), ("leaves", "leaf"), ("tomatoes", "tomato"), ("molasses", "molasses"), ("cloves", "clove"),
+])
+def test_singular(parser, word, singular):
+    assert parser._singular(word) == singular
+
+def test_unknown_items_are_kept_as_typed(parser):
+    assert parser.parse_ingredients("cookies, pies") == ["cookies", "pies"]
+
+@pytest.mark.parametrize("text, canonical", [
+    # Search terms stay as broad as what the user typed
+    ("corn", "corn"), ("sweet corn", "corn"), ("flour", "flour"), ("plain flour", "flour"), ("cornflour", "cornstarch"),
+])
+def test_synonym_targets(parser, text, canonical):
+    assert parser.canonicalize(text) == canonical
+
+def test_in_vocabulary_needs_the_whole_item(parser):
+    assert parser.in_vocabulary("3 large eggs")
+    assert not parser.in_vocabulary("peanut butter")
+
+def test_parse_many_matches_parse_ingredients(parser):
+    texts = ["2 onions, garlic", "peanut butter", ""]
+    assert parser.parse_many(texts) == [parser.parse_ingredients(text) for text in texts]
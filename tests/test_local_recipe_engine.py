@@ -0,0 +1,71 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import pytest
+from database.local_recipe_engine import LocalRecipeEngine
+from utils.recipe_filters import RecipeFilters
+
+SUMMARY = {
+    "id": 101, "title": "Garlic Chicken", "image": "",
+    "usedIngredients": [{"name": "chicken"}, {"name": "garlic"}], "missedIngredients": [{"name": "lemon"}]
+}
+DETAILS = {
+    "id": 101, "title": "Garlic Chicken", "image": "", "readyInMinutes": 25,
+    "vegetarian": False, "vegan": False, "glutenFree": True, "dairyFree": True,
+    "extendedIngredients": [{"name": "chicken"}, {"name": "garlic"}, {"name": "lemon"}]
+}
+
+@pytest.fixture
+def corpus_path():
+    return os.path.join(tempfile.mkdtemp(prefix="local-engine-test-"), "corpus.jsonl")
+
+def test_ranks_by_used_then_missed_ingredients(corpus_path):
+    engine = LocalRecipeEngine(corpus_path=corpus_path)
+    engine.add_recipes([
+        {"id": 1, "title": "A", "ingredients": ["chicken", "rice", "saffron", "peas"]},
+        {"id": 2, "title": "B", "ingredients": ["chicken", "rice"]},
+        {"id": 3, "title": "C", "ingredients": ["chicken"]},
+    ])
+    results = engine.search(["chicken", "rice"], number=3)
+    assert [result["id"] for result in results] == [2, 1, 3]
+    assert results[0]["usedIngredientCount"] == 2 and results[0]["missedIngredientCount"] == 0
+
+def test_details_write_through_fills_in_filter_fields(corpus_path):
+    engine = LocalRecipeEngine(corpus_path=corpus_path)
+    filters = RecipeFilters(dietary_restrictions=["Gluten-Free"], max_ready_time=30)
+    assert engine.add_recipes([SUMMARY], persist=True) == 1
+    # The summary has no ready time or diet flags, so filtered searches can't use it yet
+    assert engine.search(["chicken", "garlic"], filters=filters) == []
+
+    assert engine.add_recipes([DETAILS], persist=True) == 1
+    assert [result["id"] for result in engine.search(["chicken", "garlic"], filters=filters)] == [101]
+    assert engine.search(["chicken"], filters=RecipeFilters(max_ready_time=20)) == []
+    # Repeating the same details changes nothing
+    assert engine.add_recipes([DETAILS], persist=True) == 0
+
+    reloaded = LocalRecipeEngine(corpus_path=corpus_path)
+    reloaded.warm_up()
+    assert len(reloaded) == 1
+    assert [result["id"] for result in reloaded.search(["chicken", "garlic"], filters=filters)] == [101]
+
+def test_index_writer_flushes_queued_recipes_at_exit(corpus_path):
+    script = f"""
+import json
+from database.local_recipe_engine import LocalRecipeEngine
+from database.recipe_indexer import RecipeIndexWriter
+
+class NoVectorDB:
+    def add_recipes(self, recipes):
+        pass
+
+writer = RecipeIndexWriter(NoVectorDB(), LocalRecipeEngine(corpus_path={corpus_path!r}), flush_interval=60)
+writer.submit([json.loads({json.dumps(DETAILS)!r})])
+"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=root)
+
+    reloaded = LocalRecipeEngine(corpus_path=corpus_path)
+    reloaded.warm_up()
+    assert [recipe["id"] for recipe in reloaded.search(["chicken", "garlic"], number=5)] == [101]
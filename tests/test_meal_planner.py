@@ -0,0 +1,69 @@
+import os
+import tempfile
+import numpy as np
+import pytest
+from agents.meal_planner import MealPlanner, optimize_plan
+from database.local_recipe_engine import LocalRecipeEngine
+from utils.ingreadient_parser import IngredientParser
+
+WEIGHTS = {"pantry_covered": 2.0, "pantry_uses": 0.5, "purchase": 1.0}
+
+def objective(pantry_matrix, buy_matrix, plan):
+    return (
+        WEIGHTS["pantry_covered"] * np.count_nonzero(pantry_matrix[plan].any(0))
+        + WEIGHTS["pantry_uses"] * int(pantry_matrix[plan].sum())
+        - WEIGHTS["purchase"] * np.count_nonzero(buy_matrix[plan].any(0))
+    )
+
+def random_matrices(seed, candidates=40, pantry=8, buy=30):
+    rng = np.random.default_rng(seed)
+    return (rng.random((candidates, pantry)) < 0.25).astype(np.uint8), (rng.random((candidates, buy)) < 0.1).astype(np.uint8)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_plan_has_distinct_rows_and_reports_its_objective(seed):
+    pantry_matrix, buy_matrix = random_matrices(seed)
+    plan, value = optimize_plan(pantry_matrix, buy_matrix, slots=7, weights=WEIGHTS)
+    assert len(plan) == 7 and len(set(plan)) == 7
+    assert value == pytest.approx(objective(pantry_matrix, buy_matrix, plan))
+
+@pytest.mark.parametrize("seed", range(5))
+def test_no_single_swap_improves_the_plan(seed):
+    pantry_matrix, buy_matrix = random_matrices(seed)
+    plan, value = optimize_plan(pantry_matrix, buy_matrix, slots=5, weights=WEIGHTS, max_passes=50)
+    for position in range(len(plan)):
+        for row in set(range(len(pantry_matrix))) - set(plan):
+            swapped = plan[:position] + [row] + plan[position + 1:]
+            assert objective(pantry_matrix, buy_matrix, swapped) <= value + 1e-9
+
+def test_shared_purchases_beat_separate_ones():
+    # Pantry: chicken, rice. Meals 0 and 1 both need lemon; meal 2 needs ginger and soy sauce
+    pantry_matrix = np.array([[1, 0], [0, 1], [1, 1]], dtype=np.uint8)
+    buy_matrix = np.array([[1, 0, 0], [1, 0, 0], [0, 1, 1]], dtype=np.uint8)
+    plan, value = optimize_plan(pantry_matrix, buy_matrix, slots=2, weights=WEIGHTS)
+    assert sorted(plan) == [0, 1]
+    assert value == pytest.approx(2 * 2.0 + 2 * 0.5 - 1.0)
+
+def test_slots_are_capped_by_candidates():
+    pantry_matrix, buy_matrix = random_matrices(0, candidates=3)
+    assert sorted(optimize_plan(pantry_matrix, buy_matrix, slots=10, weights=WEIGHTS)[0]) == [0, 1, 2]
+    assert optimize_plan(pantry_matrix, buy_matrix, slots=0, weights=WEIGHTS) == ([], 0.0)
+
+def test_plan_week_repeats_meals_and_lists_only_missing_ingredients():
+    parser = IngredientParser()
+    engine = LocalRecipeEngine(
+        corpus_path=os.path.join(tempfile.mkdtemp(prefix="meal-planner-test-"), "corpus.jsonl"),
+        ingredient_parser=parser
+    )
+    engine.add_recipes([
+        {"id": 1, "title": "Lemon Chicken", "ingredients": ["chicken", "lemon", "salt"]},
+        {"id": 2, "title": "Lemon Rice", "ingredients": ["rice", "lemon"]},
+    ])
+    plan = MealPlanner(local_engine=engine, ingredient_parser=parser).plan_week(
+        "chicken, rice", days=2, meals_per_day=2
+    )
+
+    assert [len(day) for day in plan["days"]] == [2, 2]
+    assert {meal["id"] for day in plan["days"] for meal in day} == {1, 2}
+    assert plan["shopping_list"] == [("lemon", 2)]
+    assert plan["pantry_used"] == ["chicken", "rice"] and plan["pantry_unused"] == []
+    assert plan["stats"]["distinct_recipes"] == 2
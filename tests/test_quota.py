@@ -0,0 +1,78 @@
+import asyncio
+import time
+from services.quota import QuotaLimiter
+
+COSTS = {"findByIngredients": (1.0, 0.01), "informationBulk": (1.0, 0.5)}
+
+def make_limiter(**kwargs):
+    options = dict(daily_points=100, points_per_second=1000, burst_points=50, reserve_points=0,
+                   background_reserve_points=0, max_wait=0.5, costs=COSTS)
+    options.update(kwargs)
+    return QuotaLimiter(**options)
+
+def test_cost_scales_with_items():
+    limiter = make_limiter()
+    assert limiter.cost("findByIngredients", 10) == 1.1
+    assert limiter.cost("informationBulk", 4) == 3.0
+    assert limiter.cost("unknown") == 1.0
+
+def test_bucket_waits_for_refill_within_max_wait():
+    limiter = make_limiter(points_per_second=20, burst_points=2)
+    assert limiter.acquire("unknown") and limiter.acquire("unknown")
+    started = time.monotonic()
+    assert limiter.acquire("unknown")
+    assert time.monotonic() - started >= 0.04
+
+def test_bucket_denies_when_refill_exceeds_max_wait():
+    limiter = make_limiter(points_per_second=1, burst_points=1, max_wait=0.05)
+    assert limiter.acquire("unknown")
+    assert not limiter.acquire("unknown")
+    assert limiter.stats()["denied_rate.unknown"] == 1
+
+def test_daily_budget_keeps_the_reserve():
+    limiter = make_limiter(daily_points=10, reserve_points=3)
+    granted = sum(limiter.acquire("unknown") for _ in range(10))
+    assert granted == 7
+    assert limiter.stats()["denied_quota.unknown"] == 3
+
+def test_background_requests_stop_at_their_larger_reserve():
+    limiter = make_limiter(daily_points=10, reserve_points=1, background_reserve_points=5)
+    with limiter.background():
+        background = sum(limiter.acquire("unknown") for _ in range(10))
+    foreground = sum(limiter.acquire("unknown") for _ in range(10))
+    assert (background, foreground) == (5, 4)
+
+def test_quota_headers_override_the_local_estimate():
+    limiter = make_limiter(daily_points=100)
+    limiter.acquire("unknown")
+    limiter.observe({"X-API-Quota-Left": "2.5"})
+    assert limiter.remaining() == 2.5
+    assert limiter.acquire("unknown") and limiter.acquire("unknown")
+    assert not limiter.acquire("unknown")
+
+def test_payment_required_exhausts_the_day():
+    limiter = make_limiter()
+    limiter.mark_exhausted()
+    assert not limiter.acquire("unknown")
+    assert asyncio.run(limiter.aacquire("unknown")) is False
+
+def test_async_acquire_waits_without_blocking_the_loop():
+    limiter = make_limiter(points_per_second=20, burst_points=1)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.ensure_future(ticker())
+        results = [await limiter.aacquire("unknown") for _ in range(3)]
+        task.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(scenario())
+    assert results == [True, True, True]
+    assert ticks > 3
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import time
+from services.recipe_cache import FRESH, MISS, RecipeCache
+
+def make_cache(**kwargs):
+    path = os.path.join(tempfile.mkdtemp(prefix="recipe-cache-test-"), "cache.sqlite3")
+    return RecipeCache(path=path, ttls={"search": 3600}, stale_ttls={"search": 0}, **kwargs)
+
+def test_memory_hits_keep_hot_keys_from_eviction():
+    cache = make_cache(max_entries={"search": 3})
+    for key in ("hot", "cold", "warm"):
+        cache.set("search", key, {"key": key})
+        time.sleep(0.01)
+    # Served from memory, never touching SQLite
+    assert cache.get("search", "hot") == ({"key": "hot"}, FRESH)
+
+    cache.set("search", "new", {"key": "new"})
+    assert cache.get("search", "hot")[1] == FRESH
+    assert cache.get("search", "cold") == (None, MISS)
+    assert cache.stats()["search"]["evictions"] == 1
+
+def test_access_times_flush_in_batches():
+    cache = make_cache(memory_entries=4)
+    for key in "abcd":
+        cache.set("search", key, key)
+    before = dict(cache._conn.execute("SELECT key, accessed_at FROM responses").fetchall())
+    time.sleep(0.01)
+    for key in "abcd":
+        cache.get("search", key)
+    after = dict(cache._conn.execute("SELECT key, accessed_at FROM responses").fetchall())
+    assert not cache._touched
+    assert all(after[key] >= before[key] for key in "abcd")
+    assert after["d"] > before["d"]
+
+def test_size_cap_counts_rows_once():
+    cache = make_cache(max_entries={"search": 3})
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    for key in "abcde":
+        cache.set("search", key, key)
+        time.sleep(0.01)
+    # Replacing an entry doesn't grow the namespace
+    cache.set("search", "e", "e2")
+    cache.invalidate("search", "e")
+    cache.set("search", "f", "f")
+
+    assert sum("COUNT(*)" in statement for statement in statements) == 1
+    assert sorted(key for (key,) in cache._conn.execute("SELECT key FROM responses")) == ["c", "d", "f"]
+    assert cache.stats()["search"]["evictions"] == 2
+
+def test_reopened_cache_counts_existing_rows():
+    cache = make_cache(max_entries={"search": 2})
+    cache.set("search", "a", "a")
+    time.sleep(0.01)
+    cache.set("search", "b", "b")
+
+    reopened = RecipeCache(path=cache.path, ttls=cache.ttls, stale_ttls=cache.stale_ttls, max_entries={"search": 2})
+    reopened.set("search", "c", "c")
+    assert reopened.get("search", "a") == (None, MISS)
+    assert reopened.get("search", "c") == ("c", FRESH)
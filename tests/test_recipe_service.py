@@ -0,0 +1,70 @@
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import pytest
+from services.quota import QuotaLimiter
+from services.recipe_cache import RecipeCache
+from services.recipe_service import RecipeService
+
+class StubHttpClient:
+    """Answers every GET with the same body"""
+
+    def __init__(self, content: bytes, status_code: int = 200, latency: float = 0.0):
+        self.content = content
+        self.status_code = status_code
+        self.latency = latency
+        self.calls = 0
+
+    def _response(self, url, params):
+        self.calls += 1
+        return httpx.Response(self.status_code, content=self.content, request=httpx.Request("GET", url, params=params))
+
+    def get(self, url, params=None):
+        time.sleep(self.latency)
+        return self._response(url, params)
+
+    async def aget(self, url, params=None):
+        await asyncio.sleep(self.latency)
+        return self._response(url, params)
+
+@pytest.fixture
+def make_service():
+    def make(http_client):
+        return RecipeService(
+            cache=RecipeCache(path=os.path.join(tempfile.mkdtemp(prefix="recipe-service-test-"), "cache.sqlite3")),
+            http_client=http_client,
+            base_url="http://spoonacular.test",
+            api_key="test",
+            quota=QuotaLimiter(daily_points=1e6, points_per_second=1e6, burst_points=1e6)
+        )
+    return make
+
+def test_invalid_json_is_a_failed_request(make_service):
+    service = make_service(StubHttpClient(b"<html>Bad gateway</html>"))
+    assert service.search_recipes_by_ingredients(["chicken"]) == []
+    assert service.get_recipe_details(101) is None
+
+def test_invalid_json_is_a_failed_async_request(make_service):
+    service = make_service(StubHttpClient(b'[{"id": 1'))
+    assert asyncio.run(service.asearch_recipes_by_ingredients(["chicken"])) == []
+
+def test_identical_concurrent_searches_share_one_call(make_service):
+    http = StubHttpClient(b'[{"id": 1, "title": "Garlic Chicken"}]', latency=0.1)
+    service = make_service(http)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: service.search_recipes_by_ingredients(["chicken", "garlic"]), range(4)))
+    assert http.calls == 1
+    assert all(result == [{"id": 1, "title": "Garlic Chicken"}] for result in results)
+
+def test_identical_concurrent_async_searches_share_one_call(make_service):
+    http = StubHttpClient(b'[{"id": 1, "title": "Garlic Chicken"}]', latency=0.05)
+    service = make_service(http)
+
+    async def scenario():
+        return await asyncio.gather(*(service.asearch_recipes_by_ingredients(["garlic", "chicken"]) for _ in range(4)))
+
+    assert len(asyncio.run(scenario())) == 4
+    assert http.calls == 1
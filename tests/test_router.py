@@ -0,0 +1,47 @@
+import pytest
+from agents.router import IntentRouter, Route
+from utils.ingreadient_parser import IngredientParser
+
+@pytest.fixture
+def router():
+    return IntentRouter(IngredientParser())
+
+@pytest.mark.parametrize("text", [
+    "Sounds good, thanks!",
+    "ok, thanks",
+    "Yes, the first one",
+    "hmm, not sure",
+    "Cool, bye",
+    "Hi, there",
+    "no onions, garlic",
+    "without onions, garlic",
+    "quinoa, kale, chicken",
+])
+def test_chat_replies_go_to_the_llm(router, text):
+    assert router.route(text) is None
+    assert router.ingredient_request(text) is None
+
+@pytest.mark.parametrize("text, argument", [
+    ("chicken, rice, broccoli", "chicken, rice, broccoli"),
+    ("I have: 2 eggs, spinach and cheddar", "2 eggs, spinach, cheddar"),
+    ("salt, black pepper", "salt, black pepper"),
+    ("beef, quinoa, onions", "beef, quinoa, onions"),
+])
+def test_ingredient_lists_take_the_fast_path(router, text, argument):
+    assert router.route(text) == Route("search_recipes", argument)
+
+def test_recipes_with_request_is_cacheable(router):
+    assert router.ingredient_request("What can I make with chicken, rice and broccoli?") == "chicken, rice, broccoli"
+
+def test_routed_first_answer_does_not_import_langchain():
+    from benchmarks.fake_spoonacular import FakeSpoonacular
+    from benchmarks.startup_benchmark import timeline
+
+    server = FakeSpoonacular(latency=0.0).start()
+    try:
+        report = timeline(server.base_url, think_ms=0, warm_up=False)
+    finally:
+        server.stop()
+
+    assert report["answered"]
+    assert report["deferred_modules_loaded_by_first_answer"] == []
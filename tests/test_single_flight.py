@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from services.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return {"id": 1}
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(flight.do, "key", fetch) for _ in range(5)]
+        # Let every follower join the flight before the leader returns
+        deadline = time.monotonic() + 2
+        while flight.stats().get("coalesced", 0) < 4 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        release.set()
+        results = [future.result(timeout=2) for future in futures]
+
+    assert len(calls) == 1
+    assert results == [{"id": 1}] * 5
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+def test_different_keys_and_later_calls_run_separately():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.do("a", lambda: 3) == 3
+    assert flight.stats()["executed"] == 3
+
+def test_followers_see_the_leaders_error():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait(2)
+        raise RuntimeError("down")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flight.do, "key", fail) for _ in range(3)]
+        deadline = time.monotonic() + 2
+        while flight.stats().get("coalesced", 0) < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=2)
+    # The failed flight is gone; the next call runs again
+    assert flight.do("key", lambda: "ok") == "ok"
+
+def test_async_calls_coalesce_and_survive_a_cancelled_follower():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "recipes"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.ado("key", fetch))
+        follower = asyncio.ensure_future(flight.ado("key", fetch))
+        cancelled = asyncio.ensure_future(flight.ado("key", fetch))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        return await asyncio.gather(leader, follower), cancelled.cancelled()
+
+    (results, cancelled) = asyncio.run(scenario())
+    assert results == ["recipes", "recipes"]
+    assert cancelled
+    assert len(calls) == 1
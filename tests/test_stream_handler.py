@@ -0,0 +1,25 @@
+import json
+import pytest
+from agents.callbacks import FinalAnswerStreamHandler
+
+ANSWER = "Try 🟢 this 🍳 dish:\n- **Step 1** \"sear\" the 🥩\\nthen rest ✅"
+
+def stream(blob: str, chunk_size: int) -> str:
+    tokens = []
+    handler = FinalAnswerStreamHandler(tokens.append)
+    handler.on_chat_model_start({}, [[]])
+    for start in range(0, len(blob), chunk_size):
+        handler.on_llm_new_token(blob[start:start + chunk_size])
+    return "".join(tokens)
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 11, 64])
+def test_surrogate_pairs_decode_to_one_character(chunk_size):
+    # json.dumps escapes each emoji as a surrogate pair, e.g. \\ud83d\\udfe2
+    blob = "```json\n" + json.dumps({"action": "Final Answer", "action_input": ANSWER}) + "\n```"
+    streamed = stream(blob, chunk_size)
+    assert streamed == ANSWER
+    streamed.encode("utf-8")
+
+def test_lone_surrogate_is_replaced():
+    blob = '{"action": "Final Answer", "action_input": "a \\ud83d b \\udfe2 c"}'
+    assert stream(blob, 1) == "a � b � c"
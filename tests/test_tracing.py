@@ -0,0 +1,31 @@
+import json
+import os
+import tempfile
+from utils.tracing import Metrics, Tracer
+
+def test_recent_traces_filter_by_session():
+    tracer = Tracer(export_path="", metrics=Metrics())
+    with tracer.trace("chat", session="alice", path="llm"):
+        with tracer.span("tool", tool="search_recipes"):
+            pass
+    with tracer.trace("chat", session="bob", path="fast_path"):
+        pass
+
+    assert [trace["attributes"]["path"] for trace in tracer.recent_traces(session_id="alice")] == ["llm"]
+    assert [trace["attributes"]["path"] for trace in tracer.recent_traces(session_id="bob")] == ["fast_path"]
+    assert tracer.recent_traces(session_id="carol") == []
+    assert len(tracer.recent_traces()) == 2
+    # Session ids never become metric labels
+    assert "alice" not in tracer.metrics.render()
+
+def test_export_rolls_over_past_the_size_cap():
+    path = os.path.join(tempfile.mkdtemp(prefix="tracing-test-"), "traces.jsonl")
+    tracer = Tracer(export_path=path, metrics=Metrics(), export_max_bytes=2000)
+    for i in range(50):
+        with tracer.trace("chat", request=i):
+            pass
+
+    assert os.path.getsize(path) <= 2000
+    assert os.path.getsize(path + ".1") <= 2000 + 1000
+    with open(path, encoding="utf-8") as traces:
+        assert json.loads(traces.readlines()[-1])["attributes"]["request"] == 49
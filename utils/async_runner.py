@@ -0,0 +1,40 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine
+from config.settings import settings
+
+class BackgroundLoop:
+    """Event loop on a daemon thread, so synchronous callers (Streamlit scripts) can share it for coroutines"""
+
+    def __init__(self, workers: int = None, name: str = "async-chat"):
+        self.loop = asyncio.new_event_loop()
+        # Blocking steps handed to asyncio.to_thread() share this pool
+        self.loop.set_default_executor(ThreadPoolExecutor(
+            max_workers=workers or settings.ASYNC_LOOP_WORKERS, thread_name_prefix=f"{name}-worker"
+        ))
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        """Schedule a coroutine on the loop; the returned future can be waited on from any thread"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine: Coroutine, timeout: float = None) -> Any:
+        """Run a coroutine on the loop and block the calling thread (not the loop) for its result"""
+        future = self.submit(coroutine)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
@@ -1,34 +1,141 @@
 import re
-from typing import List
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.ingredient_vocabulary import SYNONYMS
+
+class IngredientTrie:
+    """Word-level trie mapping ingredient phrases to canonical names"""
+
+    _END = "$"
 
-class IngredientParser:
     def __init__(self):
+        self._root = {}
+
+    def add(self, words: Tuple[str, ...], canonical: str):
+        node = self._root
+        for word in words:
+            node = node.setdefault(word, {})
+        node[self._END] = canonical
+
+    def longest_match(self, words: List[str], start: int) -> Tuple[Optional[str], int]:
+        """Canonical name of the longest phrase starting at words[start] and its length"""
+        node, match, length = self._root, None, 0
+        for i in range(start, len(words)):
+            node = node.get(words[i])
+            if node is None:
+                break
+            if self._END in node:
+                match, length = node[self._END], i - start + 1
+        return match, length
+
+class IngredientParser:
+    # Precompiled once for every parser instance
+    _ITEM_SEPARATORS = re.compile(r'[,;\n\r]+|\s+(?:and|&)\s+')
+    _QUANTITIES = re.compile(r'\([^)]*\)|\d+(?:[./]\d+)?|[¼½¾⅓⅔⅛]')
+    _WORDS = re.compile(r"[a-z]+(?:'[a-z]+)?")
+    _NO_FOLD_SUFFIXES = ('ss', 'us', 'is', 'ous')
+    _IRREGULAR_PLURALS = {
+        'leaves': 'leaf', 'loaves': 'loaf', 'halves': 'half', 'cookies': 'cookie', 'brownies': 'brownie',
+        'smoothies': 'smoothie', 'veggies': 'veggie', 'calories': 'calorie', 'pierogies': 'pierogi'
+    }
+    _NO_FOLD_WORDS = {'asparagus', 'couscous', 'hummus', 'molasses', 'swiss', 'brussels', 'grits', 'chives', 'greens'}
+
+    def __init__(self, vocabulary: Dict[str, List[str]] = None, cache_size: int = 4096):
         # Common cooking terms to filter out
-        self.cooking_terms = {'cup', 'cups', 'tablespoon', 'tablespoons', 'teaspoon', 'teaspoons', 
-                             'pound', 'pounds', 'ounce', 'ounces', 'gram', 'grams', 'kg', 'lb',
-                             'tbsp', 'tsp', 'oz', 'ml', 'liter', 'liters', 'fresh', 'dried',
-                             'chopped', 'sliced', 'diced', 'minced', 'whole', 'ground'}
-    
+        self.cooking_terms = {'cup', 'tablespoon', 'teaspoon', 'pound', 'ounce', 'gram', 'kg', 'lb',
+                             'tbsp', 'tsp', 'oz', 'lbs', 'ml', 'liter', 'fresh', 'dried', 'chopped', 'sliced',
+                             'diced', 'minced', 'whole', 'ground', 'g', 'l', 'pinch', 'handful', 'bunch',
+                             'slice', 'piece', 'can', 'large', 'small', 'medium', 'boneless', 'skinless',
+                             'frozen', 'canned', 'raw', 'cooked', 'organic', 'of', 'to', 'taste', 'some',
+                             'shredded', 'grated', 'crushed', 'peeled', 'melted', 'softened', 'cubed', 'halved',
+                             'finely', 'roughly', 'thinly', 'packed'}
+        self.trie = IngredientTrie()
+        for canonical, synonyms in (vocabulary or SYNONYMS).items():
+            for phrase in [canonical] + synonyms:
+                self.trie.add(tuple(self._words(phrase)), canonical)
+
+        # Memoize whole inputs and individual items; ingredient names repeat heavily
+        self._parse_text = lru_cache(maxsize=cache_size)(self._parse_text_uncached)
+        self._parse_item = lru_cache(maxsize=cache_size * 4)(self._parse_item_uncached)
+
     def parse_ingredients(self, user_input: str) -> List[str]:
-        """Parse user input to extract ingredient names"""
-        # Convert to lowercase and split by common separators
-        ingredients = re.split(r'[,\n\r]+', user_input.lower())
-        
+        """Parse user input to extract canonical ingredient names"""
+        return list(self._parse_text(user_input))
+
+    def parse_many(self, texts: Iterable[str]) -> List[List[str]]:
+        """Parse a batch of inputs, e.g. every ingredient line of a recipe corpus"""
+        parse = self._parse_text
+        return [list(parse(text)) for text in texts]
+
+    def canonicalize(self, name: str) -> Optional[str]:
+        """Canonical name for a single ingredient, or None if nothing usable remains"""
+        parsed = self._parse_item(name.lower().strip())
+        return parsed[0] if parsed else None
+
+    def in_vocabulary(self, name: str) -> bool:
+        """Whether the whole item, minus quantities, units and descriptors, is a known ingredient phrase"""
+        return self._match_item(name.lower().strip())[0] is not None
+
+    def cache_info(self):
+        return {"texts": self._parse_text.cache_info(), "items": self._parse_item.cache_info()}
+
+    def _parse_text_uncached(self, user_input: str) -> Tuple[str, ...]:
         cleaned_ingredients = []
-        for ingredient in ingredients:
-            # Remove extra whitespace
-            ingredient = ingredient.strip()
-            
-            # Remove numbers and measurements
-            ingredient = re.sub(r'\d+\.?\d*', '', ingredient)
-            
-            # Remove common measurement words
-            words = ingredient.split()
-            filtered_words = [word for word in words if word not in self.cooking_terms]
-            
-            if filtered_words:
-                cleaned_ingredient = ' '.join(filtered_words).strip()
-                if cleaned_ingredient and len(cleaned_ingredient) > 1:
-                    cleaned_ingredients.append(cleaned_ingredient)
-        
-        return cleaned_ingredients
\ No newline at end of file
+        for item in self._ITEM_SEPARATORS.split(user_input.lower()):
+            for ingredient in self._parse_item(item.strip()):
+                if ingredient not in cleaned_ingredients:
+                    cleaned_ingredients.append(ingredient)
+        return tuple(cleaned_ingredients)
+
+    def _parse_item_uncached(self, item: str) -> Tuple[str, ...]:
+        canonical, typed = self._match_item(item)
+        if canonical is not None:
+            return (canonical,)
+        if len(typed) > 1:
+            return (typed,)
+        return ()
+
+    def _match_item(self, item: str) -> Tuple[Optional[str], str]:
+        """Canonical name when the whole item is a vocabulary phrase, and the item as typed without
+        leading/trailing quantities, units and descriptors
+
+        A phrase inside a longer item doesn't count: "peanut butter" is not "butter".
+        """
+        tokens = self._tokens(self._QUANTITIES.sub(' ', item))
+        words = [self._singular(token) for token in tokens]
+        start, end = 0, len(words)
+        while start < end and words[start] in self.cooking_terms:
+            start += 1
+        while end > start and words[end - 1] in self.cooking_terms:
+            end -= 1
+        canonical = self._phrase(words) or self._phrase(words[start:end])
+        return canonical, ' '.join(tokens[start:end])
+
+    def _phrase(self, words: List[str]) -> Optional[str]:
+        if not words:
+            return None
+        canonical, length = self.trie.longest_match(words, 0)
+        return canonical if length == len(words) else None
+
+    def _tokens(self, text: str) -> List[str]:
+        text = unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode('ascii')
+        return self._WORDS.findall(text.replace('-', ' '))
+
+    def _words(self, text: str) -> List[str]:
+        return [self._singular(word) for word in self._tokens(text)]
+
+    def _singular(self, word: str) -> str:
+        """Fold common English plurals so 'tomatoes' and 'tomato' match"""
+        if word in self._IRREGULAR_PLURALS:
+            return self._IRREGULAR_PLURALS[word]
+        if len(word) <= 3 or word in self._NO_FOLD_WORDS or word.endswith(self._NO_FOLD_SUFFIXES):
+            return word
+        if word.endswith('ies'):
+            # "berries" -> "berry", but a short stem is a plain plural: "pies" -> "pie"
+            return word[:-1] if len(word) < 5 else word[:-3] + 'y'
+        if word.endswith(('oes', 'ches', 'shes', 'xes', 'sses')):
+            return word[:-2]
+        if word.endswith('s'):
+            return word[:-1]
+        return word
@@ -0,0 +1,97 @@
+# Canonical ingredient names and the synonyms that should fold into them.
+# Plurals don't need listing; the parser folds them before matching.
+SYNONYMS = {
+    "apple": [],
+    "arugula": ["rocket", "roquette"],
+    "asparagus": [],
+    "avocado": [],
+    "bacon": ["streaky bacon", "bacon rasher"],
+    "baking powder": [],
+    "baking soda": ["bicarbonate of soda", "bicarb", "sodium bicarbonate"],
+    "banana": [],
+    "basil": ["sweet basil", "basil leaf"],
+    "beef": ["beef steak", "stewing beef"],
+    "bell pepper": ["capsicum", "sweet pepper", "red bell pepper", "green bell pepper", "yellow bell pepper"],
+    "black bean": ["black turtle bean"],
+    "black pepper": ["ground black pepper", "peppercorn"],
+    "bread": ["bread slice", "loaf"],
+    "broccoli": ["broccoli floret"],
+    "brown sugar": ["light brown sugar", "dark brown sugar"],
+    "butter": ["unsalted butter", "salted butter"],
+    "cabbage": ["green cabbage", "white cabbage"],
+    "carrot": [],
+    "cauliflower": ["cauliflower floret"],
+    "celery": ["celery stalk", "celery stick"],
+    "cheddar": ["cheddar cheese", "sharp cheddar"],
+    "chicken": ["whole chicken", "chicken meat"],
+    "chicken breast": ["boneless chicken breast", "chicken breast fillet"],
+    "chicken broth": ["chicken stock"],
+    "chicken thigh": ["boneless chicken thigh"],
+    "chickpea": ["garbanzo bean", "garbanzo", "chick pea"],
+    "chili powder": ["chilli powder"],
+    "cilantro": ["coriander leaf", "fresh coriander", "chinese parsley"],
+    "cinnamon": ["ground cinnamon", "cinnamon stick"],
+    "coconut milk": [],
+    "corn": ["sweetcorn", "sweet corn", "corn kernel", "maize"],
+    "cornstarch": ["corn starch", "cornflour"],
+    "cream cheese": [],
+    "cucumber": [],
+    "cumin": ["ground cumin", "cumin seed"],
+    "egg": ["large egg", "whole egg"],
+    "eggplant": ["aubergine", "brinjal"],
+    "flour": ["all purpose flour", "plain flour", "white flour", "ap flour"],
+    "garlic": ["garlic clove", "clove of garlic", "minced garlic"],
+    "ginger": ["ginger root", "fresh ginger"],
+    "green bean": ["string bean", "french bean", "snap bean"],
+    "green onion": ["scallion", "spring onion", "salad onion"],
+    "ground beef": ["minced beef", "beef mince", "hamburger meat"],
+    "ground pork": ["minced pork", "pork mince"],
+    "ham": [],
+    "heavy cream": ["double cream", "whipping cream", "heavy whipping cream"],
+    "honey": [],
+    "jalapeno": ["jalapeno pepper"],
+    "kidney bean": ["red kidney bean"],
+    "lemon": [],
+    "lemon juice": [],
+    "lentil": ["red lentil", "green lentil"],
+    "lettuce": ["romaine", "romaine lettuce", "iceberg lettuce"],
+    "lime": [],
+    "milk": ["whole milk", "skim milk", "semi skimmed milk"],
+    "mozzarella": ["mozzarella cheese"],
+    "mushroom": ["button mushroom", "white mushroom", "cremini", "cremini mushroom"],
+    "noodle": ["egg noodle"],
+    "oat": ["rolled oat", "porridge oat", "oatmeal"],
+    "olive oil": ["extra virgin olive oil", "evoo"],
+    "onion": ["yellow onion", "brown onion", "white onion"],
+    "oregano": ["dried oregano"],
+    "paprika": ["smoked paprika", "sweet paprika"],
+    "parmesan": ["parmesan cheese", "parmigiano reggiano", "parmigiano"],
+    "parsley": ["flat leaf parsley", "italian parsley"],
+    "pasta": [],
+    "pea": ["green pea", "garden pea"],
+    "pork": ["pork loin", "pork shoulder"],
+    "potato": ["russet potato", "yukon gold potato"],
+    "powdered sugar": ["icing sugar", "confectioners sugar", "confectioner's sugar"],
+    "red onion": ["purple onion"],
+    "rice": ["white rice", "long grain rice"],
+    "rosemary": [],
+    "salmon": ["salmon fillet"],
+    "salt": ["sea salt", "kosher salt", "table salt"],
+    "sausage": [],
+    "shrimp": ["prawn", "king prawn", "tiger prawn"],
+    "sour cream": ["soured cream"],
+    "soy sauce": ["soya sauce", "shoyu", "light soy sauce"],
+    "spaghetti": [],
+    "spinach": ["baby spinach"],
+    "sugar": ["white sugar", "granulated sugar", "caster sugar"],
+    "sweet potato": ["kumara"],
+    "thyme": [],
+    "tofu": ["bean curd"],
+    "tomato": ["roma tomato", "plum tomato"],
+    "tomato paste": ["tomato puree"],
+    "tortilla": ["flour tortilla", "corn tortilla"],
+    "turkey": [],
+    "vegetable oil": ["canola oil", "sunflower oil", "rapeseed oil"],
+    "yogurt": ["yoghurt", "plain yogurt", "greek yogurt"],
+    "zucchini": ["courgette"],
+}
@@ -0,0 +1,82 @@
+from typing import Dict, List, Optional
+
+class RecipeFilters:
+    """Sidebar preferences as structured filters for Spoonacular, Chroma and the local index"""
+
+    DIETS = {"Vegetarian": "vegetarian", "Vegan": "vegan"}
+    INTOLERANCES = {"Gluten-Free": ["gluten"], "Dairy-Free": ["dairy"], "Nut-Free": ["peanut", "tree nut"]}
+    # Boolean recipe fields Spoonacular returns and we store as metadata
+    METADATA_FLAGS = {"Vegetarian": "vegetarian", "Vegan": "vegan", "Gluten-Free": "glutenFree", "Dairy-Free": "dairyFree"}
+
+    def __init__(self, dietary_restrictions: List[str] = None, max_ready_time: int = None,
+                 cooking_skill: str = None):
+        self.dietary_restrictions = sorted(set(dietary_restrictions or []))
+        self.max_ready_time = int(max_ready_time) if max_ready_time else None
+        self.cooking_skill = cooking_skill
+
+    @classmethod
+    def from_preferences(cls, preferences: Optional[Dict]) -> "RecipeFilters":
+        preferences = preferences or {}
+        return cls(
+            dietary_restrictions=preferences.get("dietary_restrictions"),
+            max_ready_time=preferences.get("max_ready_time"),
+            cooking_skill=preferences.get("cooking_skill")
+        )
+
+    def is_empty(self) -> bool:
+        """True when no filter affects retrieval"""
+        return not self.dietary_restrictions and self.max_ready_time is None
+
+    def key(self) -> str:
+        """Stable cache key fragment for the retrieval-relevant filters"""
+        return f"diet={'+'.join(self.dietary_restrictions)}|maxReadyTime={self.max_ready_time or ''}"
+
+    def describe(self) -> str:
+        parts = [restriction.lower() for restriction in self.dietary_restrictions]
+        if self.max_ready_time:
+            parts.append(f"ready in {self.max_ready_time} minutes or less")
+        if self.cooking_skill:
+            parts.append(f"{self.cooking_skill.lower()} cook")
+        return ", ".join(parts)
+
+    def to_spoonacular_params(self) -> Dict[str, str]:
+        """complexSearch parameters: diet, intolerances, maxReadyTime"""
+        params = {}
+        diets = [self.DIETS[r] for r in self.dietary_restrictions if r in self.DIETS]
+        if diets:
+            params['diet'] = ','.join(diets)
+        intolerances = [i for r in self.dietary_restrictions for i in self.INTOLERANCES.get(r, [])]
+        if intolerances:
+            params['intolerances'] = ','.join(intolerances)
+        if self.max_ready_time:
+            params['maxReadyTime'] = self.max_ready_time
+        return params
+
+    def required_flags(self) -> List[str]:
+        return [self.METADATA_FLAGS[r] for r in self.dietary_restrictions if r in self.METADATA_FLAGS]
+
+    def metadata_filterable(self) -> bool:
+        """False when a restriction has no stored metadata flag (e.g. Nut-Free)"""
+        return all(r in self.METADATA_FLAGS for r in self.dietary_restrictions)
+
+    def to_chroma_where(self) -> Optional[Dict]:
+        """Chroma metadata filter, or None when nothing needs filtering"""
+        conditions = [{flag: True} for flag in self.required_flags()]
+        if self.max_ready_time:
+            conditions.append({"readyInMinutes": {"$lte": self.max_ready_time}})
+            conditions.append({"readyInMinutes": {"$gte": 0}})
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {"$and": conditions}
+
+    def matches(self, recipe: Dict) -> bool:
+        """Check a recipe or metadata dict; unknown values never match an active filter"""
+        if any(recipe.get(flag) is not True for flag in self.required_flags()):
+            return False
+        if self.max_ready_time:
+            ready = recipe.get('readyInMinutes')
+            if ready is None or ready < 0 or ready > self.max_ready_time:
+                return False
+        return True
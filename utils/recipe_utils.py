@@ -0,0 +1,12 @@
+from typing import Dict, List
+
+def ingredient_names(recipe: Dict) -> List[str]:
+    """Ingredient names from corpus records, findByIngredients results or recipe details"""
+    if recipe.get('ingredients'):
+        return [ing if isinstance(ing, str) else ing.get('name', '') for ing in recipe['ingredients']]
+    if recipe.get('extendedIngredients'):
+        return [ing.get('name', '') for ing in recipe['extendedIngredients']]
+    return [
+        ing.get('name', '')
+        for ing in recipe.get('usedIngredients', []) + recipe.get('missedIngredients', [])
+    ]
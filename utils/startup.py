@@ -0,0 +1,48 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+def process_started_at() -> float:
+    """Wall-clock start of this process, falling back to now where /proc isn't available"""
+    try:
+        with open("/proc/self/stat", encoding="utf-8") as stat:
+            # Fields after the parenthesised command name; starttime (ticks after boot) is field 22 overall
+            fields = stat.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", encoding="utf-8") as uptime:
+            seconds_since_boot = float(uptime.read().split()[0])
+        age = seconds_since_boot - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return time.time() - max(0.0, age)
+    except (OSError, IndexError, ValueError):
+        return time.time()
+
+class StartupTimer:
+    """Milestones (first render, first answer) in seconds since process start, plus phase durations"""
+
+    def __init__(self, started_at: float = None):
+        self.started_at = started_at or process_started_at()
+        self._marks = {}
+        self._durations = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name: str) -> float:
+        """Record a milestone the first time it is reached; later calls keep the first value"""
+        elapsed = time.time() - self.started_at
+        with self._lock:
+            return self._marks.setdefault(name, round(elapsed, 3))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._durations[name] = round(time.perf_counter() - started, 3)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {"seconds_since_start": dict(self._marks), "phase_seconds": dict(self._durations)}
+
+startup = StartupTimer()
@@ -0,0 +1,265 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from config.settings import settings
+
+# (trace, span) the current code is running under; copied into worker threads explicitly
+_current = contextvars.ContextVar("current_span", default=(None, None))
+
+# Span attributes that become metric labels; everything else stays in the trace only
+METRIC_LABELS = ("endpoint", "tool", "path")
+
+class Span:
+    """One timed stage of a request"""
+
+    def __init__(self, tracer: "Tracer", trace: Optional["Trace"], name: str, parent_id: Optional[str], attributes: Dict):
+        self.tracer = tracer
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error = None
+        self.duration = None
+        self._started = time.perf_counter()
+        self._started_at = time.time()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def fail(self, error: BaseException):
+        """Record an error without ending the span"""
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self, error: BaseException = None):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.fail(error)
+        self.tracer._finish(self)
+
+    def to_dict(self, trace_started_at: float) -> Dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "offset_ms": round((self._started_at - trace_started_at) * 1000, 3),
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+class Trace:
+    """All spans of one request"""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self.root = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self, root: Span) -> Dict:
+        with self._lock:
+            spans = [span.to_dict(self.started_at) for span in self.spans]
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round((root.duration or 0.0) * 1000, 3),
+            "attributes": root.attributes,
+            "error": root.error,
+            "spans": spans
+        }
+
+class Metrics:
+    """Prometheus-style counters and histograms kept in process"""
+
+    def __init__(self, prefix: str = "meal_agent", buckets: Tuple[float, ...] = None):
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets or settings.TRACE_HISTOGRAM_BUCKETS))
+        self._counters = defaultdict(float)  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self._counters[(name, self._labels(labels))] += value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, self._labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[i] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, list(values)) for key, values in self._histograms.items())
+
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}_{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{self._format(labels)} {value:g}")
+
+        for (name, labels), values in histograms:
+            metric = f"{self.prefix}_{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            for bound, count in zip(self.buckets, values):
+                lines.append(f"{metric}_bucket{self._format(labels + (('le', f'{bound:g}'),))} {count}")
+            lines.append(f"{metric}_bucket{self._format(labels + (('le', '+Inf'),))} {values[-1]}")
+            lines.append(f"{metric}_sum{self._format(labels)} {values[-2]:.6f}")
+            lines.append(f"{metric}_count{self._format(labels)} {values[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Counters and histogram count/sum/mean keyed by metric and labels"""
+        with self._lock:
+            report = {"counters": {}, "histograms": {}}
+            for (name, labels), value in self._counters.items():
+                report["counters"][f"{name}{self._format(labels)}"] = value
+            for (name, labels), values in self._histograms.items():
+                report["histograms"][f"{name}{self._format(labels)}"] = {
+                    "count": values[-1],
+                    "sum": round(values[-2], 6),
+                    "mean": round(values[-2] / values[-1], 6) if values[-1] else 0.0
+                }
+        return report
+
+    @staticmethod
+    def _labels(labels: Dict) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+    @staticmethod
+    def _format(labels: Tuple[Tuple[str, str], ...]) -> str:
+        if not labels:
+            return ""
+        escaped = (key + '="' + value.replace('\\', '\\\\').replace('"', '\\"') + '"' for key, value in labels)
+        return "{" + ",".join(escaped) + "}"
+
+class Tracer:
+    """Per-request traces exported to JSONL, with stage durations fed into Metrics"""
+
+    def __init__(self, export_path: str = None, recent: int = None, metrics: Metrics = None,
+                 export_max_bytes: int = None):
+        self.export_path = settings.TRACE_EXPORT_PATH if export_path is None else export_path
+        self.export_max_bytes = export_max_bytes or settings.TRACE_EXPORT_MAX_BYTES
+        self.metrics = metrics or Metrics()
+        self._recent = deque(maxlen=recent or settings.TRACE_RECENT_TRACES)
+        self._export_lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Span]:
+        """Start a request trace; nested span() calls attach to it"""
+        root = self.start_trace(name, **attributes)
+        try:
+            with self.activate(root):
+                yield root
+        except Exception as e:
+            root.end(e)
+            raise
+        finally:
+            root.end()
+
+    def start_trace(self, name: str, **attributes) -> Span:
+        """Root span of a new trace, for requests that can't be wrapped in one block (generators)"""
+        trace = Trace(name)
+        trace.root = Span(self, trace, name, None, attributes)
+        return trace.root
+
+    @contextmanager
+    def activate(self, span: Span):
+        """Make span the parent of spans started in this block, e.g. inside a worker thread"""
+        token = _current.set((span.trace, span))
+        try:
+            yield span
+        finally:
+            _current.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """Time a stage; works without an active trace, in which case only metrics are kept"""
+        span = self.start_span(name, **attributes)
+        try:
+            with self.activate(span):
+                yield span
+        except Exception as e:
+            span.end(e)
+            raise
+        finally:
+            span.end()
+
+    def start_span(self, name: str, **attributes) -> Span:
+        """Span that the caller ends explicitly, e.g. from callback start/end hooks"""
+        trace, parent = _current.get()
+        return Span(self, trace, name, parent.span_id if parent is not None else None, attributes)
+
+    def current_trace_id(self) -> Optional[str]:
+        trace, _ = _current.get()
+        return trace.trace_id if trace is not None else None
+
+    def recent_traces(self, session_id: str = None) -> List[Dict]:
+        """Most recent finished traces, newest last; only one session's when session_id is given"""
+        traces = list(self._recent)
+        if session_id is None:
+            return traces
+        return [trace for trace in traces if trace["attributes"].get("session") == session_id]
+
+    def _finish(self, span: Span):
+        labels = {key: span.attributes.get(key) for key in METRIC_LABELS}
+        self.metrics.observe("stage_duration_seconds", span.duration, stage=span.name, **labels)
+        if span.error is not None:
+            self.metrics.inc("stage_errors_total", stage=span.name, **labels)
+        if span.trace is None:
+            return
+        if span is not span.trace.root:
+            span.trace.add(span)
+            return
+
+        # Root span: the request is done
+        self.metrics.inc("requests_total", path=span.attributes.get("path"))
+        record = span.trace.to_dict(span)
+        self._recent.append(record)
+        self._export(record)
+
+    def _export(self, record: Dict):
+        if not self.export_path:
+            return
+        try:
+            with self._export_lock:
+                os.makedirs(os.path.dirname(self.export_path) or ".", exist_ok=True)
+                with open(self.export_path, "a", encoding="utf-8") as traces:
+                    traces.write(json.dumps(record, default=str) + "\n")
+                    size = traces.tell()
+                # One rolled-over file is kept; older traces are dropped
+                if size > self.export_max_bytes:
+                    os.replace(self.export_path, self.export_path + ".1")
+        except OSError as e:
+            print(f"Error exporting trace: {e}")
+
+tracer = Tracer()